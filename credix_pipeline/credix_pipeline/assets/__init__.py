@@ -1,25 +1,14 @@
-from .cnpj_assets import *
-from .installments_assets import *
+from .cdc_tables import cdc_raw_data, cdc_table_assets
 from .elementary_assets import *
-from .gold_assets import *
-#from .dbt_assets import dbt_silver_cnpj_clean, dbt_gold_cnpj_metrics
+from .dbt_assets import dbt_medallion_models, installments_payment_status_refresh
+from .risk_scoring_assets import installments_risk_scores
 
 __all__ = [
-    "cnpj_raw_data",
-    "cnpj_gcs_parquet", 
-    "cnpj_temp_table",
-    "dbt_bronze_cnpj",
-    "dbt_silver_cnpj_clean",
-    "dbt_gold_cnpj_metrics",
-    "cnpj_cdc_checkpoint",
-    "installments_raw_data",
-    "installments_gcs_parquet",
-    "installments_temp_table",
-    "dbt_bronze_installments",
-    "dbt_silver_installments_clean",
-    "installments_cdc_checkpoint",
+    "cdc_raw_data",
+    "cdc_table_assets",
+    "dbt_medallion_models",
+    "installments_payment_status_refresh",
+    "installments_risk_scores",
     "edr_monitor_asset",
     "edr_send_report_asset",
-    "dbt_gold_company_payment_summary",
-    "dbt_gold_payment_analytics_detailed"
 ]
@@ -0,0 +1,82 @@
+from ..utils.data_quality import DataQualityRule
+from .cdc_engine import CdcTable, build_cdc_raw_data_asset, build_cdc_table_assets
+
+# Rows failing these rules are quarantined before landing (formerly the commented-out checks in cnpj_ws_clean)
+CNPJ_QUALITY_RULES = [
+    DataQualityRule("MISSING_TAX_ID", "buyer_tax_id", "not_null"),
+    DataQualityRule("INVALID_CAPITAL", "share_capital", "non_negative", required=True),
+    DataQualityRule("INVALID_ZIPCODE", "zipcode", "exact_length", required=True, value=8),
+    DataQualityRule("MISSING_CNAE", "main_cnae", "not_null"),
+]
+
+# Rows failing these rules are quarantined before landing (same checks as the installments_clean filter)
+INSTALLMENTS_QUALITY_RULES = [
+    DataQualityRule("MISSING_ASSET_ID", "asset_id", "not_null"),
+    DataQualityRule("MISSING_TAX_ID", "buyer_tax_id", "not_null"),
+    DataQualityRule("MISSING_EXPECTED_AMOUNT", "expected_amount_in_cents", "not_null"),
+    DataQualityRule("MISSING_DUE_DATE", "due_date", "not_null"),
+    DataQualityRule("NEGATIVE_ORIGINAL_AMOUNT", "original_amount_in_cents", "non_negative"),
+    DataQualityRule("NEGATIVE_EXPECTED_AMOUNT", "expected_amount_in_cents", "non_negative"),
+    DataQualityRule("NEGATIVE_PAID_AMOUNT", "paid_amount_in_cents", "non_negative"),
+]
+
+CNPJ_WS = CdcTable(
+    name="cnpj_ws",
+    asset_prefix="cnpj",
+    group_name="cnpj_pipeline",
+    source_table="oltp.business_case_cnpj_ws",
+    columns=[
+        "share_capital",
+        "company_size",
+        "legal_nature",
+        "simples_option",
+        "is_mei",
+        "is_main_company",
+        "company_status",
+        "is_active",
+        "zipcode",
+        "main_cnae",
+        "state",
+        "uf",
+        "city",
+        "buyer_tax_id",
+        "created_at",
+        "updated_at",
+    ],
+    key_columns=["buyer_tax_id"],
+    watermark_columns=["updated_at", "created_at"],
+    dbt_model="cnpj_ws_clean",
+    timestamp_columns=["created_at", "updated_at"],
+    quality_rules=CNPJ_QUALITY_RULES,
+)
+
+INSTALLMENTS = CdcTable(
+    name="installments",
+    asset_prefix="installments",
+    group_name="installments_pipeline",
+    source_table="oltp.business_case_installments",
+    columns=[
+        "asset_id",
+        "invoice_id",
+        "buyer_tax_id",
+        "original_amount_in_cents",
+        "expected_amount_in_cents",
+        "paid_amount_in_cents",
+        "due_date",
+        "paid_date",
+        "invoice_issue_date",
+        "buyer_main_tax_id",
+    ],
+    key_columns=["asset_id"],
+    # Installments have no updated_at: new invoices and payments are the changes
+    watermark_columns=["invoice_issue_date", "paid_date"],
+    dbt_model="installments_clean",
+    date_columns=["due_date", "paid_date", "invoice_issue_date"],
+    quality_rules=INSTALLMENTS_QUALITY_RULES,
+)
+
+# Onboarding a table = one entry here (plus its dbt models); the engine builds its assets
+CDC_TABLES = [CNPJ_WS, INSTALLMENTS]
+
+cdc_raw_data = build_cdc_raw_data_asset(CDC_TABLES)
+cdc_table_assets = [table_asset for table in CDC_TABLES for table_asset in build_cdc_table_assets(table)]
@@ -0,0 +1,225 @@
+import shutil
+import time
+from graphlib import TopologicalSorter
+from pathlib import Path
+from typing import Dict, Iterator, Set
+from dagster import AssetExecutionContext, AssetKey, AssetObservation, Config, Output, asset
+from dagster_dbt import dbt_assets, DbtCliResource, get_asset_key_for_model
+from ..project import dbt_project
+from ..resources import GCPResource
+from ..utils.bigquery_stats import estimated_cost_usd, summarize_job_stats
+from ..utils.instrumentation import instrument_step
+
+# Every model of the medallion graph (silver and gold for both sources; bronze tables are dbt sources)
+MEDALLION_MODELS = " ".join([
+    "cnpj_ws_clean",
+    "installments_clean",
+    "payment_analytics_detailed",
+    "company_payment_summary",
+])
+
+# Metadata of the materializations a slim run records for models it didn't rebuild
+SLIM_SKIPPED_METADATA_KEY = "dbt_slim_skipped"
+
+
+class DbtBuildConfig(Config):
+    """Run config for the dbt medallion build."""
+
+    threads: int = 4
+    # Only build models whose code or upstream source data changed since the job's last successful build
+    slim: bool = True
+    # Estimate the bytes each model will scan (BigQuery dry runs of the compiled SQL) before building
+    dry_run: bool = False
+
+
+def get_changed_models(dbt: DbtCliResource, state_dir: Path, target_path: Path) -> Set[str]:
+    """Names of the models modified (code) or downstream of fresher sources (data) since `state_dir`.
+
+    Expects the current source freshness results (`sources.json`) in `target_path`.
+    """
+    invocation = dbt.cli(
+        [
+            "ls",
+            "--resource-type", "model",
+            "--output", "name",
+            "--select", "state:modified+ source_status:fresher+",
+            "--state", str(state_dir),
+        ],
+        manifest=dbt_project.manifest_path,
+        target_path=target_path,
+    )
+    # `dbt ls` prints each node as a PrintEvent (ListCmdOut before dbt 1.8)
+    return {
+        event.raw_event["data"]["msg"]
+        for event in invocation.stream_raw_events()
+        if event.raw_event["info"]["name"] in ("PrintEvent", "ListCmdOut")
+    }
+
+
+def estimate_model_bytes(dbt: DbtCliResource, gcp: GCPResource, models: Set[str], target_path: Path) -> Dict[str, int]:
+    """Bytes the compiled SELECT of each model would scan, most expensive first.
+
+    Compiles the models into `target_path` and dry-runs them. Incremental models are
+    compiled against their current state, so the estimate is the scan of this build.
+    """
+    dbt.cli(
+        ["compile", "--select", " ".join(sorted(models))],
+        manifest=dbt_project.manifest_path,
+        target_path=target_path,
+    ).wait()
+    compiled_paths = {path.stem: path for path in (target_path / "compiled").rglob("*.sql")}
+    estimates = {model: gcp.dry_run_query(compiled_paths[model].read_text()) for model in models if model in compiled_paths}
+    return dict(sorted(estimates.items(), key=lambda item: item[1], reverse=True))
+
+
+def slim_skipped_outputs(
+    context: AssetExecutionContext, asset_keys_by_model: Dict[str, AssetKey], models: Set[str]
+) -> Iterator[Output]:
+    """No-op outputs for the selected models a slim run left unchanged, upstream models first.
+
+    Without an output, the assets downstream of these models (e.g. the CDC checkpoints,
+    which wait for the silver models) would be skipped and never advance. The
+    materializations carry `SLIM_SKIPPED_METADATA_KEY`, so monitors can tell them apart
+    from actual builds.
+    """
+    asset_keys = {asset_keys_by_model[model] for model in models}
+    asset_deps = context.assets_def.asset_deps
+    for asset_key in TopologicalSorter({key: asset_deps[key] & asset_keys for key in asset_keys}).static_order():
+        yield Output(value=None, output_name=asset_key.to_python_identifier(), metadata={SLIM_SKIPPED_METADATA_KEY: True})
+
+
+@dbt_assets(
+    manifest=dbt_project.manifest_path,
+    select=MEDALLION_MODELS,
+    name="dbt_medallion_models",
+    op_tags={"credix/resource": "dbt"},
+)
+def dbt_medallion_models(
+    context: AssetExecutionContext, dbt: DbtCliResource, gcp: GCPResource, config: DbtBuildConfig
+):
+    """dbt bronze, silver and gold layers in a single `dbt build`.
+
+    Only the selected subset of models is built (dagster-dbt passes the selection),
+    and each model still gets its own materialization.
+
+    Slim runs compare against the artifacts of the job's last successful build: selected
+    models whose code did not change and whose upstream sources got no fresher data are
+    excluded (and deferred to), and the build is skipped when nothing changed. Excluded
+    models still get a no-op output (see `slim_skipped_outputs`).
+
+    Each built model gets an observation with the BigQuery statistics of its job
+    (`bigquery_*`: bytes processed/billed, slot time, cache hit, queue time) and, with
+    `dry_run`, one with its estimated scan before the build starts.
+    """
+    with instrument_step(context, "dbt_build", asset_keys=context.selected_asset_keys) as perf:
+        start_time = time.perf_counter()
+        state_dir = Path(dbt_project.state_path) / context.job_name
+        target_path = Path(dbt_project.project_dir) / "target" / f"dagster-{context.run.run_id}"
+        build_args = ["build", "--threads", str(config.threads)]
+        asset_keys_by_model = {asset_key.path[-1]: asset_key for asset_key in context.selected_asset_keys}
+        models_to_build = set(asset_keys_by_model)
+
+        # Source freshness (sources.json) is the data side of the state comparison
+        with perf.waiting("dbt"):
+            dbt.cli(
+                ["source", "freshness"],
+                manifest=dbt_project.manifest_path,
+                target_path=target_path,
+                raise_on_error=False,
+            ).wait()
+
+        # Without previous state or current freshness results, fall back to a full build
+        has_state = all(
+            path.exists()
+            for path in [state_dir / "manifest.json", state_dir / "sources.json", target_path / "sources.json"]
+        )
+        if config.slim and has_state:
+            with perf.waiting("dbt"):
+                changed_models = get_changed_models(dbt, state_dir, target_path) & models_to_build
+            unchanged_models = sorted(models_to_build - changed_models)
+            if not changed_models:
+                context.log.info(f"No model code or source data changed since the last {context.job_name} build, skipping dbt build")
+                yield from slim_skipped_outputs(context, asset_keys_by_model, models_to_build)
+                return
+            context.log.info(f"Slim build of {sorted(changed_models)}, skipping unchanged {unchanged_models}")
+            if unchanged_models:
+                build_args += ["--exclude", " ".join(unchanged_models)]
+            build_args += ["--defer", "--state", str(state_dir)]
+            models_to_build = changed_models
+
+        if config.dry_run:
+            try:
+                with perf.waiting("dbt"):
+                    estimates = estimate_model_bytes(dbt, gcp, models_to_build, target_path)
+            except Exception as e:
+                context.log.warning(f"Could not estimate the bytes scanned by the models, building without estimates: {e}")
+                estimates = {}
+            for model, estimated_bytes in estimates.items():
+                context.log.info(f"Dry run: {model} will scan {estimated_bytes / 1024 ** 2:,.1f} MiB")
+                context.log_event(
+                    AssetObservation(
+                        asset_key=asset_keys_by_model[model],
+                        metadata={
+                            "bigquery_estimated_bytes": estimated_bytes,
+                            "bigquery_estimated_scan_cost_usd": estimated_cost_usd(estimated_bytes),
+                        },
+                    )
+                )
+
+        # Unchanged models are never downstream of changed ones (state:modified+), so their outputs go first
+        yield from slim_skipped_outputs(context, asset_keys_by_model, set(asset_keys_by_model) - models_to_build)
+
+        invocation = dbt.cli(build_args, context=context, target_path=target_path)
+        with perf.waiting("dbt"):
+            yield from invocation.stream()
+
+        # Successful build: its artifacts become the state for the job's next slim run
+        state_dir.mkdir(parents=True, exist_ok=True)
+        for artifact in ["manifest.json", "sources.json"]:
+            if (target_path / artifact).exists():
+                shutil.copy(target_path / artifact, state_dir / artifact)
+
+        run_results = invocation.get_artifact("run_results.json")
+        context.log.info(
+            f"dbt build of {len(run_results.get('results', []))} nodes with {config.threads} threads "
+            f"finished in {time.perf_counter() - start_time:.1f}s "
+            f"(dbt elapsed: {run_results.get('elapsed_time', 0):.1f}s)"
+        )
+
+        # BigQuery statistics of each model's job
+        for result in run_results.get("results", []):
+            model = result["unique_id"].split(".")[-1]
+            if not result["unique_id"].startswith("model.") or model not in asset_keys_by_model:
+                continue
+            stats = gcp.get_dbt_result_stats(result)
+            if stats is None:
+                continue
+            context.log_event(AssetObservation(asset_key=asset_keys_by_model[model], metadata=summarize_job_stats([stats])))
+
+
+@asset(
+    group_name="installments_maintenance",
+    description="Daily refresh of payment_status / days_from_due_date for unpaid installments in silver and payment_analytics_detailed",
+    deps=[
+        get_asset_key_for_model([dbt_medallion_models], "installments_clean"),
+        get_asset_key_for_model([dbt_medallion_models], "payment_analytics_detailed"),
+    ],
+    op_tags={"credix/resource": "dbt"},
+)
+def installments_payment_status_refresh(context: AssetExecutionContext, dbt: DbtCliResource):
+    """Run the `refresh_installments_payment_status` dbt operation.
+
+    The 5-minute incremental build only merges the rows it loads, so the
+    CURRENT_DATE()-dependent columns of the other unpaid rows are updated here once a day.
+    """
+    with instrument_step(context, "dbt_payment_status_refresh") as perf:
+        start_time = time.perf_counter()
+        with perf.waiting("dbt"):
+            dbt.cli(
+                ["run-operation", "refresh_installments_payment_status"],
+                manifest=dbt_project.manifest_path,
+            ).wait()
+
+        refresh_seconds = round(time.perf_counter() - start_time, 1)
+        context.log.info(f"Payment status refresh finished in {refresh_seconds}s")
+        context.add_output_metadata({"refresh_seconds": refresh_seconds})
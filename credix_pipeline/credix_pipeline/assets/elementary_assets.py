@@ -1,30 +1,104 @@
-from dagster import AssetExecutionContext, asset
+from dagster import AssetExecutionContext, AssetKey, AssetRecordsFilter, asset
+import math
+import re
 import subprocess
+import time
+from typing import List, Optional, Tuple
 from ..resources import GCPResource
+from .dbt_assets import SLIM_SKIPPED_METADATA_KEY, dbt_medallion_models
+
+# edr's own default lookback, used before the first monitor run
+DEFAULT_DAYS_BACK = 7
+
+
+def run_edr(context: AssetExecutionContext, args: List[str]) -> Tuple[str, float]:
+    """Run an edr command, returning its stdout and duration in seconds."""
+    start_time = time.perf_counter()
+    result = subprocess.run(["edr", *args], capture_output=True, text=True, check=True)
+    duration = round(time.perf_counter() - start_time, 1)
+    context.log.info(f"edr {args[0]} completed in {duration}s: {result.stdout}")
+    return result.stdout, duration
+
+
+def get_last_run_timestamp(context: AssetExecutionContext, asset_key: str) -> Optional[float]:
+    """Timestamp of the latest materialization of an asset, if any."""
+    event = context.instance.get_latest_materialization_event(AssetKey(asset_key))
+    return event.timestamp if event else None
+
+
+def built_since(context: AssetExecutionContext, asset_key: AssetKey, since: float) -> bool:
+    """Whether a dbt build materialized the model after `since` (no-op slim materializations don't count)."""
+    cursor = None
+    while True:
+        result = context.instance.fetch_materializations(
+            AssetRecordsFilter(asset_key=asset_key, after_timestamp=since), limit=100, cursor=cursor
+        )
+        if any(SLIM_SKIPPED_METADATA_KEY not in record.asset_materialization.metadata for record in result.records):
+            return True
+        if not result.has_more:
+            return False
+        cursor = result.cursor
+
+
+def get_models_materialized_since(context: AssetExecutionContext, since: Optional[float]) -> List[str]:
+    """dbt models built after `since` (all dbt models when there is no previous run)."""
+    if since is None:
+        return sorted(key.path[-1] for key in dbt_medallion_models.keys)
+    return sorted(key.path[-1] for key in dbt_medallion_models.keys if built_since(context, key, since))
+
+
+def get_days_back(since: Optional[float]) -> int:
+    """Whole days covering the window since the previous run."""
+    if since is None:
+        return DEFAULT_DAYS_BACK
+    return max(1, math.ceil((time.time() - since) / 86400))
+
+
+def count_in_output(pattern: str, output: str) -> Optional[int]:
+    """Best-effort count parsed from edr's output (None if edr did not print it)."""
+    match = re.search(pattern, output, re.IGNORECASE)
+    return int(match.group(1)) if match else None
+
 
 @asset(
     group_name="monitoring",
-    description="Run EDR monitoring to analyze data quality"
+    description="Run EDR monitoring over the window since the previous monitor run, if dbt models were materialized since"
 )
 def edr_monitor_asset(context: AssetExecutionContext):
-    """Run EDR monitor command"""
-    context.log.info("Running EDR monitor...")
-    
+    """Run EDR monitor command over the window since the last monitor run.
+
+    edr monitor has no multi-model selection, so every model's results in the window are
+    checked; the changed models only decide whether the run is needed.
+    """
+    last_monitor = get_last_run_timestamp(context, "edr_monitor_asset")
+    changed_models = get_models_materialized_since(context, last_monitor)
+    days_back = get_days_back(last_monitor)
+
+    if not changed_models:
+        context.log.info("No dbt models materialized since the last monitor run, skipping EDR monitor")
+        context.add_output_metadata({
+            "edr_monitor_status": "skipped",
+            "changed_models_count": 0,
+            "monitor_seconds": 0.0,
+        })
+        return ""
+
+    context.log.info(f"Running EDR monitor for the last {days_back} day(s), models changed: {changed_models}")
+
     try:
-        result = subprocess.run(
-            ["edr", "monitor"],
-            capture_output=True,
-            text=True,
-            check=True
-        )
-        context.log.info(f"EDR monitor completed: {result.stdout}")
-        
+        stdout, duration = run_edr(context, ["monitor", "--days-back", str(days_back)])
+
         context.add_output_metadata({
             "edr_monitor_status": "success",
-            "monitoring_timestamp": context.run.created_timestamp
+            "monitoring_timestamp": time.time(),
+            "changed_models_count": len(changed_models),
+            "changed_models": changed_models,
+            "days_back": days_back,
+            "monitor_seconds": duration,
+            "alerts_sent": count_in_output(r"(\d+)\s+alerts?", stdout),
         })
-        
-        return result.stdout
+
+        return stdout
     except subprocess.CalledProcessError as e:
         context.log.error(f"EDR monitor failed: {e.stderr}")
         context.add_output_metadata({
@@ -35,37 +109,42 @@ def edr_monitor_asset(context: AssetExecutionContext):
 
 @asset(
     group_name="monitoring", 
-    description="Send EDR report to GCS bucket",
-    deps=[edr_monitor_asset]
+    description="Send EDR report to GCS bucket (runs alongside the monitor)",
 )
 def edr_send_report_asset(context: AssetExecutionContext, gcp: GCPResource):
-    """Run EDR send-report command"""
+    """Run EDR send-report command over the window since the last report"""
     context.log.info("Sending EDR report...")
     
     bucket_name = "credix-elementary-report"  # Matches terraform bucket name
     report_path = f"reports/{context.run.run_id}/index.html"
+    days_back = get_days_back(get_last_run_timestamp(context, "edr_send_report_asset"))
     
     try:
-        result = subprocess.run([
-            "edr", "send-report",
-            "--google-service-account-path", gcp.service_account_key_path,
+        # Without a key file, edr uses the application default credentials
+        credentials_args = ["--google-service-account-path", gcp.credentials_path] if gcp.credentials_path else []
+        stdout, duration = run_edr(context, [
+            "send-report",
+            *credentials_args,
             "--gcs-bucket-name", bucket_name,
             "--bucket-file-path", report_path,
-            "--update-bucket-website", "true"
-        ], capture_output=True, text=True, check=True)
+            "--update-bucket-website", "true",
+            "--days-back", str(days_back),
+        ])
         
         report_url = f"gs://{bucket_name}/{report_path}"
-        context.log.info(f"EDR send-report completed: {result.stdout}")
         context.log.info(f"Report available at: {report_url}")
         
         context.add_output_metadata({
             "edr_report_status": "success",
             "report_location": report_url,
             "bucket_name": bucket_name,
-            "report_path": report_path
+            "report_path": report_path,
+            "days_back": days_back,
+            "send_report_seconds": duration,
+            "tests_in_report": count_in_output(r"(\d+)\s+tests?", stdout),
         })
         
-        return result.stdout
+        return stdout
     except subprocess.CalledProcessError as e:
         context.log.error(f"EDR send-report failed: {e.stderr}")
         context.add_output_metadata({
@@ -0,0 +1,51 @@
+import os
+from pathlib import Path
+
+from dagster import AssetExecutionContext, AssetIn, asset
+
+from ..utils.instrumentation import instrument_step
+
+# Engine state between runs. Point it at persistent storage when run workers are ephemeral.
+RISK_SNAPSHOT_PATH = Path(os.getenv("CREDIX_RISK_SNAPSHOT_PATH", "risk_scoring/installments_risk_scores.npz"))
+
+
+@asset(
+    group_name="installments_pipeline",
+    description="In-memory buyer risk scores (payment_tier / risk_score of company_payment_summary), updated from each installments CDC batch",
+    ins={"raw_data": AssetIn("installments_raw_data")},
+)
+def installments_risk_scores(context: AssetExecutionContext, raw_data) -> str:
+    """Apply the batch to the `RiskScoringEngine` snapshot and write the snapshot back.
+
+    The engine is restored from `RISK_SNAPSHOT_PATH` (empty on the first run), moved to
+    today's date (PENDING -> OVERDUE) and updated with the batch. Re-applying a batch is
+    harmless: every installment replaces its previous version.
+    """
+    # numpy/pyarrow are only needed when the asset runs
+    from ..utils.risk_scoring import RiskScoringEngine, utc_today
+
+    with instrument_step(context, "installments_risk_scoring") as perf:
+        if RISK_SNAPSHOT_PATH.exists():
+            engine = RiskScoringEngine.restore(str(RISK_SNAPSHOT_PATH))
+            engine.advance_to(max(engine.as_of, utc_today()))
+        else:
+            context.log.info(f"No risk scoring snapshot at {RISK_SNAPSHOT_PATH}, starting from an empty engine")
+            engine = RiskScoringEngine()
+
+        applied = engine.apply_batch(raw_data) if len(raw_data) > 0 else 0
+        perf.rows = applied
+
+        RISK_SNAPSHOT_PATH.parent.mkdir(parents=True, exist_ok=True)
+        engine.snapshot(str(RISK_SNAPSHOT_PATH))
+        perf.bytes_written = RISK_SNAPSHOT_PATH.stat().st_size
+        context.log.info(f"Applied {applied} installments, {len(engine)} buyers scored as of {engine.as_of}")
+
+        context.add_output_metadata(
+            {
+                "installments_applied": applied,
+                "buyers_scored": len(engine),
+                "scores_as_of": str(engine.as_of),
+                "snapshot_path": str(RISK_SNAPSHOT_PATH),
+            }
+        )
+        return str(RISK_SNAPSHOT_PATH)
@@ -1,16 +1,23 @@
-import os
-from dagster import Definitions, load_assets_from_modules, RunRequest, schedule
-from dagster_dbt import DbtCliResource
+import time
 
-from credix_pipeline import assets  # noqa: TID252
-from credix_pipeline.jobs import cnpj_pipeline_job, installments_pipeline_job, full_data_pipeline_job, monitoring_job
-from credix_pipeline.resources import PostgresResource, GCPResource
+# Taken before the other imports on purpose: the code-location load time includes them
+_LOAD_START = time.perf_counter()
+
+import os  # noqa: E402
+from dagster import Definitions, load_assets_from_modules, RunRequest, schedule, get_dagster_logger  # noqa: E402
+from dagster_dbt import DbtCliResource  # noqa: E402
+
+from credix_pipeline import assets  # noqa: TID252, E402
+from credix_pipeline.jobs import cnpj_pipeline_job, installments_pipeline_job, full_data_pipeline_job, monitoring_job, installments_maintenance_job  # noqa: E402
+from credix_pipeline.project import dbt_project  # noqa: E402
+from credix_pipeline.resources import PostgresResource, GCPResource, LocalGCPResource, MemoryBudgetResource  # noqa: E402
+from credix_pipeline.sensors import installments_change_sensor  # noqa: E402
 
 # Load all assets from the assets modules
 all_assets = load_assets_from_modules([assets])
 
-DBT_PROJECT_DIR = "/Users/jemzin/Github/credix-data-pipeline/dbt/business_case"
-DBT_PROFILES_DIR = "/Users/jemzin/Github/credix-data-pipeline/dbt"
+# CREDIX_GCP_BACKEND=local swaps GCS/BigQuery for a local directory + DuckDB (offline runs, CI)
+local_backend = os.getenv("CREDIX_GCP_BACKEND") == "local"
 
 # Define resources
 resources = {
@@ -21,31 +28,45 @@ resources = {
         user=os.getenv("POSTGRES_USER", "postgres"),
         password=os.getenv("POSTGRES_PASSWORD", "postgres123"),
     ),
-    "gcp": GCPResource(
+    "gcp": LocalGCPResource(
+        root_dir=os.getenv("CREDIX_LOCAL_GCP_DIR", ".local_gcp"),
+    ) if local_backend else GCPResource(
         project_id=os.getenv("GCP_PROJECT", "product-reliability-analyzer"),
         credentials_path=os.getenv("GOOGLE_APPLICATION_CREDENTIALS", ""),
     ),
     "dbt": DbtCliResource(
-        project_dir=DBT_PROJECT_DIR,
-        profiles_dir=DBT_PROFILES_DIR,
+        project_dir=dbt_project,
+        profiles_dir=str(dbt_project.profiles_dir),
+        # `local` is the DuckDB target of the dbt project
+        target="local" if local_backend else None,
+    ),
+    "memory_budget": MemoryBudgetResource(
+        budget_mb=int(os.getenv("CREDIX_MEMORY_BUDGET_MB", "0")),
+        spill_dir=os.getenv("CREDIX_SPILL_DIR", ""),
     ),
 }
 
-@schedule(job=installments_pipeline_job, cron_schedule="*/5 * * * *")
-def installments_5_minute_schedule():
-    return RunRequest()
-
 @schedule(job=cnpj_pipeline_job, cron_schedule="0 0 * * *")
 def cnpj_daily_schedule():
     return RunRequest()
 
+@schedule(job=installments_maintenance_job, cron_schedule="30 0 * * *")
+def installments_status_daily_schedule():
+    return RunRequest()
+
 @schedule(job=monitoring_job, cron_schedule="@daily")
 def edr_daily_schedule():
     return RunRequest()
 
+# Code-location load time (imports + manifest load), reported so daemon/webserver reloads stay fast
+code_location_load_seconds = round(time.perf_counter() - _LOAD_START, 3)
+get_dagster_logger().info(f"credix_pipeline code location loaded in {code_location_load_seconds}s")
+
 defs = Definitions(
     assets=all_assets,
-    jobs=[cnpj_pipeline_job, installments_pipeline_job, monitoring_job, full_data_pipeline_job],
-    schedules=[installments_5_minute_schedule, cnpj_daily_schedule, edr_daily_schedule],
+    jobs=[cnpj_pipeline_job, installments_pipeline_job, monitoring_job, full_data_pipeline_job, installments_maintenance_job],
+    schedules=[cnpj_daily_schedule, installments_status_daily_schedule, edr_daily_schedule],
+    sensors=[installments_change_sensor],
     resources=resources,
-)
\ No newline at end of file
+    metadata={"code_location_load_seconds": code_location_load_seconds},
+)
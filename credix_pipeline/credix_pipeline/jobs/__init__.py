@@ -1,3 +1,3 @@
-from .data_pipeline_jobs import cnpj_pipeline_job, installments_pipeline_job, full_data_pipeline_job, monitoring_job
+from .data_pipeline_jobs import cnpj_pipeline_job, installments_pipeline_job, full_data_pipeline_job, monitoring_job, installments_maintenance_job
 
-__all__ = ["cnpj_pipeline_job", "installments_pipeline_job", "full_data_pipeline_job", "monitoring_job"]
+__all__ = ["cnpj_pipeline_job", "installments_pipeline_job", "full_data_pipeline_job", "monitoring_job", "installments_maintenance_job"]
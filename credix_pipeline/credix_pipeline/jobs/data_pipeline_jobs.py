@@ -1,10 +1,34 @@
 from dagster import define_asset_job, AssetSelection
 
+# Multiprocess execution: independent branches (CNPJ / installments) run in parallel, while
+# steps tagged with `credix/resource` are capped per backend so the OLTP database,
+# BigQuery and dbt are never hit by more than `limit` steps of a run at once
+RESOURCE_CONCURRENCY_LIMITS = {
+    "postgres": 1,
+    "bigquery": 2,
+    "dbt": 1,
+}
+
+PIPELINE_EXECUTION_CONFIG = {
+    "execution": {
+        "config": {
+            "multiprocess": {
+                "max_concurrent": 4,
+                "tag_concurrency_limits": [
+                    {"key": "credix/resource", "value": resource, "limit": limit}
+                    for resource, limit in RESOURCE_CONCURRENCY_LIMITS.items()
+                ],
+            }
+        }
+    }
+}
+
 # Job for CNPJ data pipeline
 cnpj_pipeline_job = define_asset_job(
     name="cnpj_data_pipeline",
     description="Extract CNPJ data from PostgreSQL, store in GCS, and load to BigQuery bronze layer",
     selection=AssetSelection.groups("cnpj_pipeline"),
+    config=PIPELINE_EXECUTION_CONFIG,
 )
 
 # Job for installments data pipeline
@@ -12,6 +36,7 @@ installments_pipeline_job = define_asset_job(
     name="installments_data_pipeline",
     description="Extract installments data from PostgreSQL, store in GCS, and load to BigQuery bronze layer",
     selection=AssetSelection.groups("installments_pipeline"),
+    config=PIPELINE_EXECUTION_CONFIG,
 )
 
 # Combined job for full pipeline
@@ -19,6 +44,14 @@ full_data_pipeline_job = define_asset_job(
     name="full_data_pipeline",
     description="Run both CNPJ and installments pipelines",
     selection=AssetSelection.groups("cnpj_pipeline", "installments_pipeline", "gold_layer"),
+    config=PIPELINE_EXECUTION_CONFIG,
+)
+
+# Daily refresh of the date-dependent installment columns
+installments_maintenance_job = define_asset_job(
+    name="installments_maintenance",
+    description="Refresh payment status of unpaid installments in the silver and gold layers",
+    selection=AssetSelection.groups("installments_maintenance"),
 )
 
 monitoring_job = define_asset_job(
@@ -0,0 +1,26 @@
+import os
+from pathlib import Path
+from dagster_dbt import DbtProject
+
+# Repository layout: <repo>/credix_pipeline/credix_pipeline/project.py and <repo>/dbt/business_case
+REPO_ROOT = Path(__file__).resolve().parents[2]
+
+DBT_PROJECT_DIR = Path(os.getenv("DBT_PROJECT_DIR", REPO_ROOT / "dbt" / "business_case"))
+DBT_PROFILES_DIR = Path(os.getenv("DBT_PROFILES_DIR", REPO_ROOT / "dbt"))
+# Artifacts (manifest + source freshness) of the last successful build of each job, for slim runs.
+# Point it at persistent storage when run workers are ephemeral.
+DBT_STATE_DIR = Path(os.getenv("DBT_STATE_DIR", DBT_PROJECT_DIR / "state"))
+
+# Single dbt project handle shared by the dbt assets and the dbt resource.
+# The manifest is prepared once at build time with
+#   dagster-dbt project prepare-and-package --file credix_pipeline/project.py
+# which parses the project and copies it into `dbt-project/` inside the package.
+# Code-location loads then only read the cached manifest; `dagster dev` re-parses
+# on reload so model changes are picked up during development.
+dbt_project = DbtProject(
+    project_dir=DBT_PROJECT_DIR,
+    profiles_dir=DBT_PROFILES_DIR,
+    packaged_project_dir=Path(__file__).resolve().parent / "dbt-project",
+    state_path=DBT_STATE_DIR.resolve(),
+)
+dbt_project.prepare_if_dev()
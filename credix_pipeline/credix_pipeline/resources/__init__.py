@@ -1,4 +1,6 @@
 from .postgres_resource import PostgresResource
 from .gcp_resource import GCPResource
+from .local_gcp_resource import LocalGCPResource
+from .memory_budget_resource import MemoryBudgetResource
 
-__all__ = ["PostgresResource", "GCPResource"]
+__all__ = ["PostgresResource", "GCPResource", "LocalGCPResource", "MemoryBudgetResource"]
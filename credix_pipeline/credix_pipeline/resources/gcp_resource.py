@@ -1,7 +1,30 @@
 from dagster import ConfigurableResource
-from google.cloud import storage
-from google.cloud import bigquery
+import contextlib
 import os
+from typing import Iterable, List, Mapping, Optional, Union
+
+from ..utils.bigquery_stats import BigQueryJobStats, job_stats, stats_from_adapter_response
+from ..utils.instrumentation import record_bigquery_job, waits_on
+
+# google-cloud-storage / google-cloud-bigquery are imported lazily inside the methods
+# that use them, so runs that never touch GCP don't pay for importing the client libraries
+
+# Request size of streamed (resumable) uploads, a multiple of 256 KiB
+UPLOAD_CHUNK_SIZE = 8 * 1024 * 1024
+
+
+def latest_rows_query(source: str, key_columns: List[str], order_columns: List[str]) -> str:
+    """Rows of `source` keeping only the newest version of each key (highest of the `order_columns`).
+
+    Each column is coalesced with the others, so a NULL column (e.g. an unpaid `paid_date`)
+    doesn't make the row's watermark NULL. Valid in BigQuery and DuckDB.
+    """
+    watermarks = [f"COALESCE({', '.join([column] + [c for c in order_columns if c != column])})" for column in order_columns]
+    return f"""SELECT *
+    FROM {source}
+    QUALIFY ROW_NUMBER() OVER (PARTITION BY {", ".join(key_columns)} ORDER BY GREATEST({", ".join(watermarks)}) DESC) = 1
+    """
+
 
 class GCPResource(ConfigurableResource):
     """Resource for GCP services (Storage and BigQuery)."""
@@ -11,16 +34,21 @@ class GCPResource(ConfigurableResource):
     
     def get_storage_client(self):
         """Get Google Cloud Storage client."""
+        from google.cloud import storage
+
         if self.credentials_path:
             os.environ['GOOGLE_APPLICATION_CREDENTIALS'] = self.credentials_path
         return storage.Client(project=self.project_id)
     
     def get_bigquery_client(self):
         """Get BigQuery client."""
+        from google.cloud import bigquery
+
         if self.credentials_path:
             os.environ['GOOGLE_APPLICATION_CREDENTIALS'] = self.credentials_path
         return bigquery.Client(project=self.project_id)
     
+    @waits_on("gcs")
     def upload_to_gcs(self, bucket_name: str, blob_name: str, data: bytes):
         """Upload data to Google Cloud Storage."""
         client = self.get_storage_client()
@@ -28,9 +56,42 @@ class GCPResource(ConfigurableResource):
         blob = bucket.blob(blob_name)
         blob.upload_from_string(data)
         return f"gs://{bucket_name}/{blob_name}"
+
+    @waits_on("gcs")
+    def upload_file_to_gcs(self, bucket_name: str, blob_name: str, file_path: str):
+        """Upload a local file to Google Cloud Storage (read from disk in chunks, not loaded in memory)."""
+        client = self.get_storage_client()
+        blob = client.bucket(bucket_name).blob(blob_name, chunk_size=UPLOAD_CHUNK_SIZE)
+        blob.upload_from_filename(str(file_path))
+        return f"gs://{bucket_name}/{blob_name}"
+
+    def upload_stream_to_gcs(self, bucket_name: str, blob_name: str, chunks: Iterable[bytes]):
+        """Upload a stream of byte chunks as one object (resumable upload).
+
+        Data is sent in `UPLOAD_CHUNK_SIZE` requests while the chunks are produced. The object
+        is only created once the stream ends: if it raises, the upload session is cancelled.
+        Not counted as a `gcs` wait, as the caller consumes its own stream meanwhile.
+        """
+        client = self.get_storage_client()
+        blob = client.bucket(bucket_name).blob(blob_name)
+        writer = blob.open("wb", chunk_size=UPLOAD_CHUNK_SIZE, ignore_flush=True)
+        try:
+            for chunk in chunks:
+                writer.write(chunk)
+        except BaseException:
+            # The writer is never closed on failure: closing it would upload the buffered rest and
+            # finalize a partial object. The session is cancelled instead of left to expire.
+            with contextlib.suppress(Exception):
+                writer.terminate()
+            raise
+        writer.close()
+        return f"gs://{bucket_name}/{blob_name}"
     
-    def load_to_bigquery(self, dataset_id: str, table_id: str, gcs_uri: str):
-        """Load data from GCS to BigQuery."""
+    @waits_on("bigquery")
+    def load_to_bigquery(self, dataset_id: str, table_id: str, gcs_uri: Union[str, List[str]]):
+        """Load data from GCS to BigQuery (one or many source URIs in a single load job)."""
+        from google.cloud import bigquery
+
         client = self.get_bigquery_client()
         
         table_ref = client.dataset(dataset_id).table(table_id)
@@ -45,10 +106,14 @@ class GCPResource(ConfigurableResource):
         )
         
         load_job.result()  # Wait for job to complete
+        record_bigquery_job(job_stats(load_job))
         return f"{dataset_id}.{table_id}"
     
-    def load_to_bigquery_with_schema(self, dataset_id: str, table_id: str, gcs_uri: str, schema: list):
+    @waits_on("bigquery")
+    def load_to_bigquery_with_schema(self, dataset_id: str, table_id: str, gcs_uri: Union[str, List[str]], schema: list):
         """Load data from GCS to BigQuery with explicit schema definition."""
+        from google.cloud import bigquery
+
         client = self.get_bigquery_client()
         
         table_ref = client.dataset(dataset_id).table(table_id)
@@ -64,10 +129,14 @@ class GCPResource(ConfigurableResource):
         )
         
         load_job.result()  # Wait for job to complete
+        record_bigquery_job(job_stats(load_job))
         return f"{dataset_id}.{table_id}"
     
-    def load_to_bigquery_truncate(self, dataset_id: str, table_id: str, gcs_uri: str, schema: list):
+    @waits_on("bigquery")
+    def load_to_bigquery_truncate(self, dataset_id: str, table_id: str, gcs_uri: Union[str, List[str]], schema: list):
         """Load data from GCS to BigQuery with WRITE_TRUNCATE mode."""
+        from google.cloud import bigquery
+
         client = self.get_bigquery_client()
         
         table_ref = client.dataset(dataset_id).table(table_id)
@@ -83,8 +152,64 @@ class GCPResource(ConfigurableResource):
         )
         
         load_job.result()  # Wait for job to complete
+        record_bigquery_job(job_stats(load_job))
         return f"{dataset_id}.{table_id}"
     
+    @waits_on("bigquery")
+    def keep_latest_rows(self, dataset_id: str, table_id: str, key_columns: List[str], order_columns: List[str]):
+        """Rewrite a table with only the newest row per key (query job writing over its own table)."""
+        from google.cloud import bigquery
+
+        client = self.get_bigquery_client()
+
+        table_ref = client.dataset(dataset_id).table(table_id)
+
+        job_config = bigquery.QueryJobConfig(
+            destination=table_ref,
+            write_disposition=bigquery.WriteDisposition.WRITE_TRUNCATE,
+        )
+
+        query_job = client.query(
+            latest_rows_query(f"`{self.project_id}.{dataset_id}.{table_id}`", key_columns, order_columns),
+            job_config=job_config,
+        )
+
+        query_job.result()  # Wait for job to complete
+        record_bigquery_job(job_stats(query_job))
+        return f"{dataset_id}.{table_id}"
+
+    @waits_on("bigquery")
+    def dry_run_query(self, sql: str) -> int:
+        """Bytes a query would scan (BigQuery dry run: free, nothing is executed)."""
+        from google.cloud import bigquery
+
+        client = self.get_bigquery_client()
+        job_config = bigquery.QueryJobConfig(dry_run=True, use_query_cache=False)
+        return client.query(sql, job_config=job_config).total_bytes_processed or 0
+
+    @waits_on("bigquery")
+    def get_dbt_result_stats(self, run_result: Mapping) -> Optional[BigQueryJobStats]:
+        """Statistics of the query job of a dbt node result (`run_results.json`), None if it ran no job.
+
+        The job is fetched for the cache hit and queue time, which dbt doesn't report.
+        """
+        adapter_response = run_result.get("adapter_response") or {}
+        partial_stats = stats_from_adapter_response(adapter_response)
+        if partial_stats is None:
+            return None
+        client = self.get_bigquery_client()
+        try:
+            job = client.get_job(
+                partial_stats.job_id,
+                project=adapter_response.get("project_id"),
+                location=adapter_response.get("location"),
+            )
+        except Exception:
+            # Job metadata can be missing (e.g. no bigquery.jobs.get permission): keep what dbt reported
+            return partial_stats
+        return job_stats(job)
+
+    @waits_on("gcs")
     def copy_gcs_file(self, source_bucket: str, source_blob: str, dest_bucket: str, dest_blob: str):
         """Copy a file from one GCS bucket to another."""
         client = self.get_storage_client()
@@ -99,6 +224,7 @@ class GCPResource(ConfigurableResource):
         
         return f"gs://{dest_bucket}/{dest_blob}"
     
+    @waits_on("gcs")
     def delete_gcs_file(self, bucket_name: str, blob_name: str):
         """Delete a file from GCS."""
         client = self.get_storage_client()
@@ -107,6 +233,26 @@ class GCPResource(ConfigurableResource):
         blob.delete()
         return True
     
+    @waits_on("gcs")
+    def list_gcs_blobs(self, bucket_name: str, prefix: str, match_glob: str = None):
+        """List files under a prefix as (gs:// URI, size in bytes, creation time) tuples."""
+        client = self.get_storage_client()
+        blobs = client.list_blobs(bucket_name, prefix=f"{prefix}/", match_glob=match_glob)
+        return [(f"gs://{bucket_name}/{blob.name}", blob.size, blob.time_created) for blob in blobs]
+    
+    @waits_on("gcs")
+    def find_gcs_blob(self, bucket_name: str, prefix: str, file_name: str):
+        """Find a file by name anywhere under a prefix (e.g. any ingestion_dt partition).
+
+        Returns the gs:// URI of the first match, or None if the file does not exist.
+        """
+        client = self.get_storage_client()
+        blobs = client.list_blobs(bucket_name, prefix=f"{prefix}/", match_glob=f"{prefix}/**/{file_name}")
+        for blob in blobs:
+            return f"gs://{bucket_name}/{blob.name}"
+        return None
+    
+    @waits_on("gcs")
     def move_blob(self, source_bucket: str, source_blob: str, dest_bucket: str, dest_blob: str):
         """Move a file from one GCS bucket to another (copy then delete)."""
         # First copy the file
@@ -118,6 +264,7 @@ class GCPResource(ConfigurableResource):
         return dest_uri
     
 
+    @waits_on("bigquery")
     def get_table_schema(self, dataset_id: str, table_id: str):
         """Get the schema of an existing BigQuery table."""
         client = self.get_bigquery_client()
@@ -130,6 +277,11 @@ class GCPResource(ConfigurableResource):
             # If table doesn't exist, return None
             return None
         
+    def table_exists(self, dataset_id: str, table_id: str) -> bool:
+        """Check whether a BigQuery table exists."""
+        return self.get_table_schema(dataset_id, table_id) is not None
+
+    @waits_on("bigquery")
     def delete_temp_table(self, dataset_id: str, table_id: str):
         """Delete a temporary table."""
         client = self.get_bigquery_client()
@@ -0,0 +1,294 @@
+import os
+import re
+import shutil
+import time
+import uuid
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Iterable, List, Mapping, NamedTuple, Optional, Union
+
+from .gcp_resource import GCPResource, latest_rows_query
+from ..utils.bigquery_stats import BigQueryJobStats, local_job_stats
+from ..utils.instrumentation import record_bigquery_job, waits_on
+
+# duckdb is imported lazily (and is only needed for local runs: pip install -e ".[local]")
+
+# BigQuery <-> DuckDB column types
+BIGQUERY_TO_DUCKDB_TYPES = {
+    "STRING": "VARCHAR",
+    "INTEGER": "BIGINT",
+    "INT64": "BIGINT",
+    "FLOAT": "DOUBLE",
+    "FLOAT64": "DOUBLE",
+    "NUMERIC": "DECIMAL(38, 9)",
+    "BOOLEAN": "BOOLEAN",
+    "BOOL": "BOOLEAN",
+    "TIMESTAMP": "TIMESTAMP",
+    "DATETIME": "TIMESTAMP",
+    "DATE": "DATE",
+}
+DUCKDB_TO_BIGQUERY_TYPES = {
+    "VARCHAR": "STRING",
+    "BIGINT": "INTEGER",
+    "INTEGER": "INTEGER",
+    "SMALLINT": "INTEGER",
+    "TINYINT": "INTEGER",
+    "DOUBLE": "FLOAT",
+    "FLOAT": "FLOAT",
+    "BOOLEAN": "BOOLEAN",
+    "DATE": "DATE",
+}
+INTEGER_DUCKDB_TYPES = {"BIGINT", "INTEGER", "SMALLINT", "TINYINT"}
+
+# Dummy scan size per row affected by a dbt model on the local target (DuckDB reports no bytes)
+LOCAL_DBT_BYTES_PER_ROW = 100
+
+
+class LocalSchemaField(NamedTuple):
+    """Minimal stand-in for `google.cloud.bigquery.SchemaField` (what the assets use of it)."""
+
+    name: str
+    field_type: str
+    mode: str = "NULLABLE"
+
+
+def duckdb_to_bigquery_type(duckdb_type: str) -> str:
+    if duckdb_type.startswith("DECIMAL"):
+        return "NUMERIC"
+    if duckdb_type.startswith("TIMESTAMP"):
+        return "TIMESTAMP"
+    return DUCKDB_TO_BIGQUERY_TYPES.get(duckdb_type, "STRING")
+
+
+def glob_to_regex(pattern: str) -> re.Pattern:
+    """GCS `match_glob` semantics: `**` spans directories, `*` and `?` do not."""
+    regex = ""
+    i = 0
+    while i < len(pattern):
+        if pattern.startswith("**/", i):
+            regex += "(?:.*/)?"
+            i += 3
+        elif pattern.startswith("**", i):
+            regex += ".*"
+            i += 2
+        elif pattern[i] == "*":
+            regex += "[^/]*"
+            i += 1
+        elif pattern[i] == "?":
+            regex += "[^/]"
+            i += 1
+        else:
+            regex += re.escape(pattern[i])
+            i += 1
+    return re.compile(f"^{regex}$")
+
+
+class LocalGCPResource(GCPResource):
+    """Drop-in, offline implementation of `GCPResource` for local and CI runs.
+
+    GCS buckets are directories under `<root_dir>/gcs/<bucket>/` (URIs keep the gs:// form)
+    and BigQuery tables are Parquet files under `<root_dir>/bigquery/<dataset>/<table>.parquet`,
+    written through DuckDB with the same load semantics (truncate, schema enforcement).
+    Every `GCPResource` method that uses a GCS or BigQuery client is overridden, so no
+    client is ever created.
+    """
+
+    root_dir: str = ".local_gcp"
+
+    def _blob_path(self, bucket_name: str, blob_name: str) -> Path:
+        return Path(self.root_dir) / "gcs" / bucket_name / blob_name
+
+    def _uri_path(self, gcs_uri: str) -> Path:
+        bucket_name, blob_name = gcs_uri.replace("gs://", "").split("/", 1)
+        return self._blob_path(bucket_name, blob_name)
+
+    def _table_path(self, dataset_id: str, table_id: str) -> Path:
+        return Path(self.root_dir) / "bigquery" / dataset_id / f"{table_id}.parquet"
+
+    @waits_on("gcs")
+    def upload_to_gcs(self, bucket_name: str, blob_name: str, data: bytes):
+        """Write the object to the bucket directory."""
+        path = self._blob_path(bucket_name, blob_name)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_bytes(data)
+        return f"gs://{bucket_name}/{blob_name}"
+
+    @waits_on("gcs")
+    def upload_file_to_gcs(self, bucket_name: str, blob_name: str, file_path: str):
+        """Copy a local file to the bucket directory."""
+        path = self._blob_path(bucket_name, blob_name)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        shutil.copyfile(file_path, path)
+        return f"gs://{bucket_name}/{blob_name}"
+
+    def upload_stream_to_gcs(self, bucket_name: str, blob_name: str, chunks: Iterable[bytes]):
+        """Write the chunks to a partial file, renamed to the object once the stream ends."""
+        path = self._blob_path(bucket_name, blob_name)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        partial_path = path.with_name(f"{path.name}.partial")
+        try:
+            with open(partial_path, "wb") as f:
+                for chunk in chunks:
+                    f.write(chunk)
+        except BaseException:
+            partial_path.unlink(missing_ok=True)
+            raise
+        os.replace(partial_path, path)
+        return f"gs://{bucket_name}/{blob_name}"
+
+    @waits_on("gcs")
+    def copy_gcs_file(self, source_bucket: str, source_blob: str, dest_bucket: str, dest_blob: str):
+        """Copy a file from one bucket directory to another."""
+        dest_path = self._blob_path(dest_bucket, dest_blob)
+        dest_path.parent.mkdir(parents=True, exist_ok=True)
+        shutil.copyfile(self._blob_path(source_bucket, source_blob), dest_path)
+        return f"gs://{dest_bucket}/{dest_blob}"
+
+    @waits_on("gcs")
+    def delete_gcs_file(self, bucket_name: str, blob_name: str):
+        """Delete a file from a bucket directory."""
+        self._blob_path(bucket_name, blob_name).unlink()
+        return True
+
+    @waits_on("gcs")
+    def list_gcs_blobs(self, bucket_name: str, prefix: str, match_glob: str = None):
+        """List files under a prefix as (gs:// URI, size in bytes, creation time) tuples."""
+        bucket_path = self._blob_path(bucket_name, "")
+        prefix_path = self._blob_path(bucket_name, prefix)
+        pattern = glob_to_regex(match_glob) if match_glob else None
+        blobs = []
+        for path in sorted(prefix_path.rglob("*")) if prefix_path.is_dir() else []:
+            blob_name = path.relative_to(bucket_path).as_posix()
+            if not path.is_file() or (pattern and not pattern.match(blob_name)):
+                continue
+            stat = path.stat()
+            created = datetime.fromtimestamp(stat.st_mtime, tz=timezone.utc)
+            blobs.append((f"gs://{bucket_name}/{blob_name}", stat.st_size, created))
+        return blobs
+
+    @waits_on("gcs")
+    def find_gcs_blob(self, bucket_name: str, prefix: str, file_name: str):
+        """Find a file by name anywhere under a prefix. Returns its gs:// URI or None."""
+        for uri, _, _ in self.list_gcs_blobs(bucket_name, prefix, match_glob=f"{prefix}/**/{file_name}"):
+            return uri
+        return None
+
+    @waits_on("gcs")
+    def move_blob(self, source_bucket: str, source_blob: str, dest_bucket: str, dest_blob: str):
+        """Move a file from one bucket directory to another."""
+        dest_path = self._blob_path(dest_bucket, dest_blob)
+        dest_path.parent.mkdir(parents=True, exist_ok=True)
+        shutil.move(self._blob_path(source_bucket, source_blob), dest_path)
+        return f"gs://{dest_bucket}/{dest_blob}"
+
+    def _load(self, dataset_id: str, table_id: str, gcs_uri: Union[str, List[str]], schema: Optional[list]):
+        """Replace the table with the Parquet source files (WRITE_TRUNCATE), cast to `schema` if given."""
+        import duckdb
+
+        start = time.perf_counter()
+        uris = [gcs_uri] if isinstance(gcs_uri, str) else list(gcs_uri)
+        source_paths = [str(self._uri_path(uri)) for uri in uris]
+        table_path = self._table_path(dataset_id, table_id)
+        table_path.parent.mkdir(parents=True, exist_ok=True)
+
+        with duckdb.connect() as connection:
+            source = f"read_parquet({source_paths!r}, union_by_name = true, hive_partitioning = false)"
+            if schema:
+                source_types = {
+                    name: column_type for name, column_type, *_ in connection.execute(f"DESCRIBE SELECT * FROM {source}").fetchall()
+                }
+                columns = ", ".join(self._cast_column(field, source_types.get(field.name)) for field in schema)
+            else:
+                columns = "*"
+            # Write next to the table and swap it in, so a failed load leaves the previous table intact
+            tmp_path = table_path.with_suffix(".parquet.tmp")
+            connection.execute(f"COPY (SELECT {columns} FROM {source}) TO '{tmp_path}' (FORMAT parquet)")
+        os.replace(tmp_path, table_path)
+        input_bytes = sum(os.path.getsize(path) for path in source_paths)
+        record_bigquery_job(
+            local_job_stats(f"local_load_{uuid.uuid4().hex[:12]}", input_bytes, time.perf_counter() - start, billed=False)
+        )
+        return f"{dataset_id}.{table_id}"
+
+    @staticmethod
+    def _cast_column(field, source_type: Optional[str]) -> str:
+        target_type = BIGQUERY_TO_DUCKDB_TYPES.get(field.field_type.upper(), "VARCHAR")
+        if source_type is None:
+            # Schema columns missing from the files load as NULL, like in BigQuery
+            return f'CAST(NULL AS {target_type}) AS "{field.name}"'
+        if target_type == "TIMESTAMP" and source_type in INTEGER_DUCKDB_TYPES:
+            # prepare_dataframe_for_bigquery writes timestamps as epoch microseconds
+            return f'make_timestamp("{field.name}") AS "{field.name}"'
+        return f'CAST("{field.name}" AS {target_type}) AS "{field.name}"'
+
+    @waits_on("bigquery")
+    def load_to_bigquery(self, dataset_id: str, table_id: str, gcs_uri: Union[str, List[str]]):
+        """Load Parquet files into a local table (WRITE_TRUNCATE, schema from the files)."""
+        return self._load(dataset_id, table_id, gcs_uri, None)
+
+    @waits_on("bigquery")
+    def load_to_bigquery_with_schema(self, dataset_id: str, table_id: str, gcs_uri: Union[str, List[str]], schema: list):
+        """Load Parquet files into a local table with explicit schema (WRITE_TRUNCATE_DATA)."""
+        return self._load(dataset_id, table_id, gcs_uri, schema)
+
+    @waits_on("bigquery")
+    def load_to_bigquery_truncate(self, dataset_id: str, table_id: str, gcs_uri: Union[str, List[str]], schema: list):
+        """Load Parquet files into a local table with WRITE_TRUNCATE mode."""
+        return self._load(dataset_id, table_id, gcs_uri, schema)
+
+    @waits_on("bigquery")
+    def keep_latest_rows(self, dataset_id: str, table_id: str, key_columns: List[str], order_columns: List[str]):
+        """Rewrite a local table with only the newest row per key."""
+        import duckdb
+
+        start = time.perf_counter()
+        table_path = self._table_path(dataset_id, table_id)
+        tmp_path = table_path.with_suffix(".parquet.tmp")
+        with duckdb.connect() as connection:
+            query = latest_rows_query(f"read_parquet('{table_path}')", key_columns, order_columns)
+            connection.execute(f"COPY ({query}) TO '{tmp_path}' (FORMAT parquet)")
+        input_bytes = table_path.stat().st_size
+        os.replace(tmp_path, table_path)
+        record_bigquery_job(local_job_stats(f"local_query_{uuid.uuid4().hex[:12]}", input_bytes, time.perf_counter() - start))
+        return f"{dataset_id}.{table_id}"
+
+    def dry_run_query(self, sql: str) -> int:
+        """Size of the local tables the query references (`dataset.table`), as a stand-in scan estimate."""
+        estimate = 0
+        for table_path in (Path(self.root_dir) / "bigquery").glob("*/*.parquet"):
+            table_ref = f"{table_path.parent.name}.{table_path.stem}"
+            if re.search(rf"\b{re.escape(table_ref)}\b", sql.replace("`", "")):
+                estimate += table_path.stat().st_size
+        return estimate
+
+    def get_dbt_result_stats(self, run_result: Mapping) -> Optional[BigQueryJobStats]:
+        """Dummy statistics of a dbt node result on the local target, from its affected rows and time."""
+        rows_affected = (run_result.get("adapter_response") or {}).get("rows_affected")
+        if rows_affected is None or rows_affected < 0:
+            return None
+        return local_job_stats(
+            f"local_{run_result.get('unique_id', '')}",
+            rows_affected * LOCAL_DBT_BYTES_PER_ROW,
+            run_result.get("execution_time") or 0.0,
+        )
+
+    @waits_on("bigquery")
+    def get_table_schema(self, dataset_id: str, table_id: str):
+        """Schema of a local table as SchemaField-like tuples, or None if it doesn't exist."""
+        import duckdb
+
+        table_path = self._table_path(dataset_id, table_id)
+        if not table_path.exists():
+            return None
+        with duckdb.connect() as connection:
+            columns = connection.execute(f"DESCRIBE SELECT * FROM read_parquet('{table_path}')").fetchall()
+        return [LocalSchemaField(name, duckdb_to_bigquery_type(column_type)) for name, column_type, *_ in columns]
+
+    @waits_on("bigquery")
+    def delete_temp_table(self, dataset_id: str, table_id: str):
+        """Delete a local table."""
+        try:
+            self._table_path(dataset_id, table_id).unlink()
+            return f"Deleted table: {dataset_id}.{table_id}"
+        except Exception as e:
+            return f"Failed to delete table {dataset_id}.{table_id}: {e}"
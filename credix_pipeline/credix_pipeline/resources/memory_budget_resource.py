@@ -0,0 +1,18 @@
+from dagster import ConfigurableResource
+
+from ..utils.memory_budget import MemoryBudget
+
+
+class MemoryBudgetResource(ConfigurableResource):
+    """Memory budget of each step of a run (0 = unlimited).
+
+    Set per deployment (`CREDIX_MEMORY_BUDGET_MB`) or per run with
+    `resources: {memory_budget: {config: {budget_mb: 2048}}}`. Spill files go to
+    `spill_dir` (the system temp directory by default).
+    """
+
+    budget_mb: int = 0
+    spill_dir: str = ""
+
+    def get_budget(self) -> MemoryBudget:
+        return MemoryBudget(self.budget_mb * 1024 ** 2, self.spill_dir)
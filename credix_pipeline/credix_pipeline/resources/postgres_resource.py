@@ -1,7 +1,22 @@
+from __future__ import annotations
+
+import functools
+from typing import TYPE_CHECKING, Callable, Iterator, Optional, Union
 from dagster import ConfigurableResource
-import psycopg2
-import pandas as pd
-from sqlalchemy import create_engine
+
+from ..utils.instrumentation import waits_on
+
+# psycopg2, SQLAlchemy and pandas are imported lazily: only extraction runs need them
+if TYPE_CHECKING:
+    import pandas as pd
+
+@functools.lru_cache(maxsize=None)
+def _create_engine(connection_string: str):
+    # One engine per process: its connection pool is shared by the CDC extraction threads
+    from sqlalchemy import create_engine
+
+    return create_engine(connection_string)
+
 
 class PostgresResource(ConfigurableResource):
     """Resource for PostgreSQL database connections."""
@@ -14,6 +29,8 @@ class PostgresResource(ConfigurableResource):
     
     def get_connection(self):
         """Get a psycopg2 connection."""
+        import psycopg2
+
         return psycopg2.connect(
             host=self.host,
             port=self.port,
@@ -23,11 +40,51 @@ class PostgresResource(ConfigurableResource):
         )
     
     def get_engine(self):
-        """Get SQLAlchemy engine."""
+        """Get the (process-wide, pooled) SQLAlchemy engine."""
         connection_string = f"postgresql://{self.user}:{self.password}@{self.host}:{self.port}/{self.database}"
-        return create_engine(connection_string)
+        return _create_engine(connection_string)
     
+    @waits_on("postgres")
     def execute_query(self, query: str) -> pd.DataFrame:
         """Execute a query and return results as DataFrame."""
+        import pandas as pd
+
         engine = self.get_engine()
         return pd.read_sql(query, engine)
+
+    def iter_query(self, query: str, chunk_rows: Union[int, Callable[[], int]]) -> Iterator[pd.DataFrame]:
+        """Execute a query and yield its results as DataFrames of up to `chunk_rows` rows.
+
+        Rows are read through a server-side cursor, so the next chunk is only fetched when
+        the consumer asks for it. `chunk_rows` can be a callable (e.g. an adaptive batch
+        sizer), asked before every fetch. Yields one empty DataFrame if there are no rows.
+        Not counted as a `postgres` wait (it is a generator).
+        """
+        import pandas as pd
+        from sqlalchemy import text
+
+        next_rows = chunk_rows if callable(chunk_rows) else lambda: chunk_rows
+        with self.get_engine().connect().execution_options(stream_results=True) as connection:
+            result = connection.execute(text(query))
+            columns = list(result.keys())
+            empty = True
+            while True:
+                rows = result.fetchmany(next_rows())
+                if not rows:
+                    break
+                empty = False
+                # Same conversion as pd.read_sql
+                yield pd.DataFrame.from_records(rows, columns=columns, coerce_float=True)
+            if empty:
+                yield pd.DataFrame(columns=columns)
+
+    @waits_on("postgres")
+    def fetch_one(self, query: str) -> Optional[tuple]:
+        """Execute a query and return its first row, without pandas/SQLAlchemy (for cheap probes)."""
+        connection = self.get_connection()
+        try:
+            with connection.cursor() as cursor:
+                cursor.execute(query)
+                return cursor.fetchone()
+        finally:
+            connection.close()
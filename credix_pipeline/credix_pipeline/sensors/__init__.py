@@ -0,0 +1,3 @@
+from .change_probe_sensors import installments_change_sensor
+
+__all__ = ["installments_change_sensor"]
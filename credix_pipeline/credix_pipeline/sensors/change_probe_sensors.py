@@ -0,0 +1,142 @@
+import json
+import time
+from datetime import date, datetime
+from typing import Optional
+from dagster import DagsterRunStatus, RunRequest, RunsFilter, SensorEvaluationContext, SkipReason, sensor
+
+from ..assets.cdc_engine import build_change_predicate
+from ..assets.cdc_tables import INSTALLMENTS
+from ..jobs import installments_pipeline_job, full_data_pipeline_job
+from ..resources import PostgresResource
+from ..utils.cdc_helpers import get_cdc_last_processed_key, get_cdc_last_processed_time
+
+# Max of each watermark column separately: with btree indexes on invoice_issue_date and
+# paid_date both are index-only lookups, unlike the GREATEST(...) expression of the extraction query
+INSTALLMENTS_PROBE_QUERY = """SELECT GREATEST(MAX(invoice_issue_date), MAX(paid_date))
+    FROM oltp.business_case_installments
+"""
+
+# Backlog size (same change predicate as the extraction query, `build_change_predicate`)
+INSTALLMENTS_BACKLOG_QUERY = """SELECT COUNT(*)
+    FROM oltp.business_case_installments
+    WHERE {change_predicate}
+"""
+
+# Jobs that process the installments table (at most one of them in flight at a time)
+INSTALLMENTS_JOB_NAMES = [installments_pipeline_job.name, full_data_pipeline_job.name]
+
+IN_FLIGHT_STATUSES = [
+    DagsterRunStatus.QUEUED,
+    DagsterRunStatus.NOT_STARTED,
+    DagsterRunStatus.STARTING,
+    DagsterRunStatus.STARTED,
+    DagsterRunStatus.CANCELING,
+]
+
+# Micro-batch window: wait about as long as the last run took before starting the next one
+# (amortizes the fixed run cost over a bigger batch), bounded to keep freshness predictable.
+# A backlog of MAX_BATCH_ROWS or more starts a run right away.
+MIN_BATCH_WINDOW_SECONDS = 60
+MAX_BATCH_WINDOW_SECONDS = 300
+MAX_BATCH_ROWS = 50_000
+
+
+def to_datetime(value) -> datetime:
+    """Normalize a probed DATE/TIMESTAMP value or a checkpoint string to a datetime."""
+    if isinstance(value, datetime):
+        return value
+    if isinstance(value, date):
+        return datetime(value.year, value.month, value.day)
+    return datetime.fromisoformat(str(value))
+
+
+def compute_batch_window(last_run_duration: Optional[float], backlog_rows: int) -> float:
+    """Seconds to wait after the last run before starting the next micro-batch."""
+    if backlog_rows >= MAX_BATCH_ROWS:
+        return 0.0
+    if last_run_duration is None:
+        return MIN_BATCH_WINDOW_SECONDS
+    return min(max(last_run_duration, MIN_BATCH_WINDOW_SECONDS), MAX_BATCH_WINDOW_SECONDS)
+
+
+def get_latest_run_record(instance, statuses):
+    """Most recently created run of any installments job with one of the given statuses."""
+    run_records = [
+        record
+        for job_name in INSTALLMENTS_JOB_NAMES
+        for record in instance.get_run_records(RunsFilter(job_name=job_name, statuses=statuses), limit=1)
+    ]
+    return max(run_records, key=lambda record: record.create_timestamp, default=None)
+
+
+@sensor(
+    job=installments_pipeline_job,
+    minimum_interval_seconds=30,
+    description="Micro-batch the installments pipeline: one run in flight, adaptive batch window",
+)
+def installments_change_sensor(context: SensorEvaluationContext, postgres: PostgresResource):
+    """Probe the source watermark and request a run when it is ahead of the CDC checkpoint.
+
+    - No new run while an installments run is in flight; the ticks in between are
+      coalesced into the next run, which extracts everything past the checkpoint.
+    - The next run waits for the batch window (see `compute_batch_window`) after the
+      previous one finished, unless the backlog is already large.
+    """
+    cursor = json.loads(context.cursor) if context.cursor else {}
+    coalesced_ticks = cursor.get("coalesced_ticks", 0)
+
+    in_flight = get_latest_run_record(context.instance, IN_FLIGHT_STATUSES)
+    if in_flight:
+        context.update_cursor(json.dumps({"coalesced_ticks": coalesced_ticks + 1}))
+        return SkipReason(f"Run {in_flight.dagster_run.run_id} in flight, coalescing tick into the next run")
+
+    start_time = time.perf_counter()
+    (source_watermark,) = postgres.fetch_one(INSTALLMENTS_PROBE_QUERY)
+    probe_ms = round((time.perf_counter() - start_time) * 1000, 1)
+
+    checkpoint_name = INSTALLMENTS.asset_name("cdc_checkpoint")
+    last_processed_time = get_cdc_last_processed_time(context, checkpoint_name)
+    last_processed_key = get_cdc_last_processed_key(context, checkpoint_name)
+    context.log.info(
+        f"Installments probe took {probe_ms}ms: source watermark {source_watermark}, checkpoint {last_processed_time}"
+    )
+
+    # A capped run that split the tie group at the checkpoint watermark leaves rows at that same watermark
+    if source_watermark is None or to_datetime(source_watermark) < to_datetime(last_processed_time) or (
+        to_datetime(source_watermark) == to_datetime(last_processed_time) and not last_processed_key
+    ):
+        return SkipReason(f"No installments changes past {last_processed_time} (probe took {probe_ms}ms)")
+
+    change_predicate = build_change_predicate(INSTALLMENTS, last_processed_time, last_processed_key)
+    (backlog_rows,) = postgres.fetch_one(INSTALLMENTS_BACKLOG_QUERY.format(change_predicate=change_predicate))
+    if backlog_rows == 0:
+        return SkipReason(f"No installments changes past {last_processed_time} and key {last_processed_key}")
+
+    last_run = get_latest_run_record(context.instance, [DagsterRunStatus.SUCCESS, DagsterRunStatus.FAILURE])
+    last_run_duration = (
+        last_run.end_time - last_run.start_time
+        if last_run and last_run.start_time and last_run.end_time
+        else None
+    )
+    batch_window = compute_batch_window(last_run_duration, backlog_rows)
+    since_last_run = time.time() - last_run.end_time if last_run and last_run.end_time else None
+
+    if since_last_run is not None and since_last_run < batch_window:
+        context.update_cursor(json.dumps({"coalesced_ticks": coalesced_ticks + 1}))
+        return SkipReason(
+            f"{backlog_rows} pending rows, batching for {batch_window - since_last_run:.0f}s more "
+            f"(window {batch_window:.0f}s)"
+        )
+
+    context.update_cursor(json.dumps({"coalesced_ticks": 0}))
+    return RunRequest(
+        # Unique per (source watermark, previous run): dedupes ticks, but a failed run can be retried
+        run_key=f"installments_{source_watermark}_{last_run.dagster_run.run_id if last_run else 'first'}",
+        tags={
+            "source_watermark": str(source_watermark),
+            "probe_latency_ms": str(probe_ms),
+            "backlog_rows": str(backlog_rows),
+            "batch_window_seconds": str(round(batch_window)),
+            "coalesced_ticks": str(coalesced_ticks),
+        },
+    )
@@ -0,0 +1,120 @@
+import math
+import threading
+from collections import deque
+from typing import Deque, Dict, Optional
+
+# Standard library only: the docker data-loader image copies this module as is
+
+# Bounds of one adjustment, so a single noisy batch can't swing the size too far
+MAX_GROWTH = 2.0
+MIN_SHRINK = 0.25
+
+
+class AdaptiveBatchSizer:
+    """Picks the number of rows of the next batch from what the previous batches measured.
+
+    Each batch reports its rows, latency and sizes (`observe`). Bytes per row and seconds
+    per row are tracked as moving averages, and `next_rows` returns the largest batch that
+    meets every configured target:
+
+    - `target_output_bytes`: size of the encoded batch (e.g. ~128 MB Parquet row groups/files)
+    - `target_latency_seconds`: p95 latency of the last `window` batches
+    - `memory_ceiling_bytes`: in-memory size of the `batches_in_memory` batches held at once
+
+    Wide tables (CNPJ) get fewer rows per batch than narrow ones (installments) for the
+    same targets, without per-table tuning. Thread-safe: stages of a streaming pipeline can
+    report to the same sizer.
+    """
+
+    def __init__(
+        self,
+        initial_rows: int = 20_000,
+        min_rows: int = 1_000,
+        max_rows: int = 1_000_000,
+        target_output_bytes: Optional[int] = None,
+        target_latency_seconds: Optional[float] = None,
+        memory_ceiling_bytes: Optional[int] = None,
+        batches_in_memory: int = 1,
+        window: int = 20,
+        smoothing: float = 0.3,
+    ):
+        self.min_rows = max(1, min_rows)
+        self.max_rows = max(self.min_rows, max_rows)
+        self.target_output_bytes = target_output_bytes
+        self.target_latency_seconds = target_latency_seconds
+        self.memory_ceiling_bytes = memory_ceiling_bytes
+        self.batches_in_memory = max(1, batches_in_memory)
+        self.smoothing = smoothing
+        self.batches = 0
+        self.memory_bytes_per_row: Optional[float] = None
+        self.output_bytes_per_row: Optional[float] = None
+        self.seconds_per_row: Optional[float] = None
+        self._latencies: Deque[float] = deque(maxlen=window)
+        self._rows = self._clamp(initial_rows)
+        self._lock = threading.Lock()
+
+    def _clamp(self, rows: float) -> int:
+        return int(min(self.max_rows, max(self.min_rows, rows)))
+
+    def _average(self, current: Optional[float], value: float) -> float:
+        return value if current is None else current + self.smoothing * (value - current)
+
+    def p95_latency(self) -> Optional[float]:
+        if not self._latencies:
+            return None
+        latencies = sorted(self._latencies)
+        return latencies[max(0, math.ceil(0.95 * len(latencies)) - 1)]
+
+    def observe(
+        self,
+        rows: int,
+        seconds: Optional[float] = None,
+        memory_bytes: Optional[int] = None,
+        output_bytes: Optional[int] = None,
+    ):
+        """Report a finished batch (any of its measurements can be left out) and resize."""
+        if rows <= 0:
+            return
+        with self._lock:
+            self.batches += 1
+            if seconds is not None:
+                self._latencies.append(seconds)
+                self.seconds_per_row = self._average(self.seconds_per_row, seconds / rows)
+            if memory_bytes is not None:
+                self.memory_bytes_per_row = self._average(self.memory_bytes_per_row, memory_bytes / rows)
+            if output_bytes is not None:
+                self.output_bytes_per_row = self._average(self.output_bytes_per_row, output_bytes / rows)
+            self._rows = self._resize()
+
+    def _resize(self) -> int:
+        targets = [self.max_rows]
+        if self.target_output_bytes and self.output_bytes_per_row:
+            targets.append(self.target_output_bytes / self.output_bytes_per_row)
+        if self.target_latency_seconds and self.seconds_per_row:
+            targets.append(self.target_latency_seconds / self.seconds_per_row)
+            p95 = self.p95_latency()
+            if p95 and p95 > self.target_latency_seconds:
+                # The tail is over target even if the average isn't: shrink proportionally
+                targets.append(self._rows * self.target_latency_seconds / p95)
+        rows = min(max(min(targets), self._rows * MIN_SHRINK), self._rows * MAX_GROWTH)
+
+        # The memory ceiling is a hard limit, applied at once
+        if self.memory_ceiling_bytes and self.memory_bytes_per_row:
+            rows = min(rows, self.memory_ceiling_bytes / (self.memory_bytes_per_row * self.batches_in_memory))
+        return self._clamp(rows)
+
+    def next_rows(self) -> int:
+        """Rows of the next batch."""
+        with self._lock:
+            return self._rows
+
+    def stats(self) -> Dict:
+        """Current size and measurements (e.g. for asset metadata)."""
+        with self._lock:
+            return {
+                "rows": self._rows,
+                "batches": self.batches,
+                "memory_bytes_per_row": round(self.memory_bytes_per_row or 0, 1),
+                "output_bytes_per_row": round(self.output_bytes_per_row or 0, 1),
+                "p95_latency_seconds": round(self.p95_latency() or 0, 3),
+            }
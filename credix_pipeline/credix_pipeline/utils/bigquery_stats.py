@@ -0,0 +1,116 @@
+from typing import Mapping, NamedTuple, Optional, Sequence
+
+# On-demand query pricing (US multi-region), for the estimated cost in metadata and reports
+ON_DEMAND_USD_PER_TIB = 6.25
+
+# BigQuery bills at least 10 MiB per table referenced by a query
+MIN_BILLED_BYTES = 10 * 1024 ** 2
+
+
+class BigQueryJobStats(NamedTuple):
+    """What a finished BigQuery job (load or query) reported."""
+
+    job_id: str
+    bytes_processed: int = 0
+    bytes_billed: int = 0
+    slot_ms: int = 0
+    cache_hit: bool = False
+    # Time between the job's creation and its start (waiting for slots or other jobs)
+    queue_seconds: float = 0.0
+
+
+def _int(value) -> int:
+    # The REST API returns int64 statistics as strings
+    return int(value) if value not in (None, "") else 0
+
+
+def job_stats_from_resource(resource: Mapping) -> BigQueryJobStats:
+    """Statistics of a job from its REST resource (`jobs.get`).
+
+    Load jobs report the bytes of their source files as processed and are not billed
+    (they run on the free shared slot pool).
+    """
+    statistics = resource.get("statistics", {})
+    query = statistics.get("query", {})
+    load = statistics.get("load", {})
+    if load:
+        bytes_processed, bytes_billed = _int(load.get("inputFileBytes")), 0
+    else:
+        bytes_processed = _int(query.get("totalBytesProcessed", statistics.get("totalBytesProcessed")))
+        bytes_billed = _int(query.get("totalBytesBilled"))
+    created, started = _int(statistics.get("creationTime")), _int(statistics.get("startTime"))
+    return BigQueryJobStats(
+        job_id=resource.get("jobReference", {}).get("jobId", ""),
+        bytes_processed=bytes_processed,
+        bytes_billed=bytes_billed,
+        slot_ms=_int(statistics.get("totalSlotMs")),
+        cache_hit=bool(query.get("cacheHit", False)),
+        queue_seconds=max(0, started - created) / 1000 if created and started else 0.0,
+    )
+
+
+def job_stats(job) -> BigQueryJobStats:
+    """Statistics of a finished google-cloud-bigquery job object (`LoadJob` or `QueryJob`).
+
+    Read from the job's public properties. Each is None when the job didn't report it
+    (and load jobs have no billing, slot or cache properties), which counts as 0 / False.
+    """
+    input_file_bytes = getattr(job, "input_file_bytes", None)
+    if input_file_bytes is not None:
+        bytes_processed = _int(input_file_bytes)
+    else:
+        bytes_processed = _int(getattr(job, "total_bytes_processed", None))
+    created, started = getattr(job, "created", None), getattr(job, "started", None)
+    return BigQueryJobStats(
+        job_id=job.job_id or "",
+        bytes_processed=bytes_processed,
+        bytes_billed=_int(getattr(job, "total_bytes_billed", None)),
+        slot_ms=_int(getattr(job, "slot_millis", None)),
+        cache_hit=bool(getattr(job, "cache_hit", None)),
+        queue_seconds=max(0.0, (started - created).total_seconds()) if created and started else 0.0,
+    )
+
+
+def local_job_stats(job_id: str, bytes_processed: int, seconds: float, billed: bool = True) -> BigQueryJobStats:
+    """Stand-in statistics for jobs run by the offline backends (DuckDB / local files).
+
+    Bytes are the local data sizes, billed like an on-demand query (with the 10 MiB
+    minimum) unless `billed` is False (loads), and slot time is the wall time.
+    """
+    return BigQueryJobStats(
+        job_id=job_id,
+        bytes_processed=bytes_processed,
+        bytes_billed=max(bytes_processed, MIN_BILLED_BYTES) if billed and bytes_processed else 0,
+        slot_ms=int(seconds * 1000),
+    )
+
+
+def estimated_cost_usd(bytes_billed: int) -> float:
+    return round(bytes_billed / 1024 ** 4 * ON_DEMAND_USD_PER_TIB, 6)
+
+
+def summarize_job_stats(stats: Sequence[BigQueryJobStats]) -> dict:
+    """Totals of one or more jobs as flat `bigquery_*` metadata entries."""
+    bytes_billed = sum(s.bytes_billed for s in stats)
+    return {
+        "bigquery_jobs": len(stats),
+        "bigquery_job_ids": ", ".join(s.job_id for s in stats if s.job_id),
+        "bigquery_bytes_processed": sum(s.bytes_processed for s in stats),
+        "bigquery_bytes_billed": bytes_billed,
+        "bigquery_slot_ms": sum(s.slot_ms for s in stats),
+        "bigquery_cache_hits": sum(1 for s in stats if s.cache_hit),
+        "bigquery_queue_seconds": round(sum(s.queue_seconds for s in stats), 3),
+        "bigquery_estimated_cost_usd": estimated_cost_usd(bytes_billed),
+    }
+
+
+def stats_from_adapter_response(adapter_response: Mapping) -> Optional[BigQueryJobStats]:
+    """Partial statistics from a dbt-bigquery adapter response (no cache hit or queue time)."""
+    if not adapter_response.get("job_id"):
+        return None
+    return BigQueryJobStats(
+        job_id=adapter_response["job_id"],
+        bytes_processed=_int(adapter_response.get("bytes_processed")),
+        bytes_billed=_int(adapter_response.get("bytes_billed")),
+        slot_ms=_int(adapter_response.get("slot_ms")),
+    )
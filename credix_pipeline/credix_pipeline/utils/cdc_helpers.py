@@ -1,6 +1,10 @@
-import pandas as pd
+from __future__ import annotations
+
 from dagster import AssetExecutionContext, AssetKey
-from typing import Optional
+from typing import TYPE_CHECKING, List, Optional
+
+if TYPE_CHECKING:
+    import pandas as pd
 
 def get_cdc_last_processed_time(context: AssetExecutionContext, checkpoint_asset_key: str) -> str:
     """Get the last processed timestamp from CDC checkpoint."""
@@ -20,6 +24,16 @@ def get_cdc_last_processed_time(context: AssetExecutionContext, checkpoint_asset
     return default_time
 
 
+def get_cdc_last_processed_key(context: AssetExecutionContext, checkpoint_asset_key: str) -> Optional[List[str]]:
+    """Key of the last processed row at the checkpoint watermark, if a capped batch stopped inside its tie group."""
+    checkpoint_cursor = context.instance.get_latest_materialization_event(AssetKey(checkpoint_asset_key))
+    if checkpoint_cursor and checkpoint_cursor.asset_materialization:
+        boundary_key = checkpoint_cursor.asset_materialization.metadata.get("cdc_boundary_key")
+        if boundary_key and boundary_key.value:
+            return [str(value) for value in boundary_key.value]
+    return None
+
+
 def process_cdc_results(context: AssetExecutionContext, df: pd.DataFrame, last_processed_time: str) -> dict:
     """Process CDC query results and return metadata."""
     if len(df) > 0:
@@ -36,3 +50,50 @@ def process_cdc_results(context: AssetExecutionContext, df: pd.DataFrame, last_p
             "records_extracted": 0,
             "batch_max_updated_at": last_processed_time
         }
+
+
+def get_batch_watermark(df: pd.DataFrame, watermark_columns: List[str]) -> Optional[pd.Timestamp]:
+    """Return the max timestamp across the given watermark columns, or None if there is none."""
+    import pandas as pd
+
+    max_ts = None
+    for col in watermark_columns:
+        if col in df.columns:
+            s = pd.to_datetime(df[col], errors="coerce")
+            if s.notna().any():
+                cur_max = s.max()
+                max_ts = cur_max if max_ts is None or cur_max > max_ts else max_ts
+    return max_ts
+
+
+def get_batch_boundary_key(df: pd.DataFrame, watermark_columns: List[str], key_columns: List[str]) -> Optional[List[str]]:
+    """Key of the last row (in batch order) whose row watermark is the batch watermark.
+
+    The row watermark is the greatest non-null watermark column, like GREATEST(...) in the
+    CDC queries. Batches are ordered by their key columns in the database, so the last of
+    these rows has the highest key in the database's own collation.
+    """
+    import pandas as pd
+
+    if len(df) == 0:
+        return None
+    row_watermarks = pd.concat(
+        [pd.to_datetime(df[col], errors="coerce") for col in watermark_columns if col in df.columns], axis=1
+    ).max(axis=1)
+    at_boundary = df[row_watermarks == row_watermarks.max()]
+    if len(at_boundary) == 0:
+        return None
+    return [str(value) for value in at_boundary.iloc[-1][list(key_columns)]]
+
+
+def get_run_materialization_metadata(context: AssetExecutionContext, asset_key: str) -> Optional[dict]:
+    """Metadata values of the latest materialization of an asset, if it happened in this run.
+
+    Materializations of the run this one re-executes (parent or root run) also count, as
+    re-executions reuse their outputs.
+    """
+    event = context.instance.get_latest_materialization_event(AssetKey(asset_key))
+    lineage = {context.run.run_id, context.run.parent_run_id, context.run.root_run_id}
+    if not event or not event.asset_materialization or event.run_id not in lineage:
+        return None
+    return {key: getattr(value, "value", value) for key, value in event.asset_materialization.metadata.items()}
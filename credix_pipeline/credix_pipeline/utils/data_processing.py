@@ -1,7 +1,13 @@
-import pandas as pd
-import pyarrow as pa
-import pyarrow.parquet as pq
-from typing import List, Optional
+from __future__ import annotations
+
+import hashlib
+import io
+from typing import TYPE_CHECKING, Iterable, Iterator, List, Optional
+
+# pandas/pyarrow are imported at the point of use to keep code-location and run-worker startup fast
+if TYPE_CHECKING:
+    import pandas as pd
+    import pyarrow as pa
 
 def prepare_dataframe_for_bigquery(
     df: pd.DataFrame,
@@ -16,6 +22,8 @@ def prepare_dataframe_for_bigquery(
     - Timestamps are output as timezone-naive datetime64[ns] (interpreted as UTC) for Parquet->BigQuery.
     - Dates are output as date objects -> Parquet date32, matching BigQuery DATE.
     """
+    import pandas as pd
+
     df_copy = df.copy()
 
     # Normalize dates (ensure Parquet DATE logical type)
@@ -34,13 +42,146 @@ def prepare_dataframe_for_bigquery(
     return df_copy
 
 
-def dataframe_to_parquet_bytes(df: pd.DataFrame) -> bytes:
-    """Convert DataFrame to Parquet bytes."""
-    table = pa.Table.from_pandas(df, preserve_index=False)
+def dataframe_to_arrow_table(df: pd.DataFrame) -> pa.Table:
+    """Convert DataFrame to an Arrow table (without the pandas index)."""
+    import pyarrow as pa
+
+    return pa.Table.from_pandas(df, preserve_index=False)
+
+
+def arrow_table_to_parquet_bytes(table: pa.Table) -> bytes:
+    """Convert Arrow table to Parquet bytes."""
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
     parquet_buffer = pa.BufferOutputStream()
     pq.write_table(table, parquet_buffer, coerce_timestamps="us", allow_truncated_timestamps=True)
     return parquet_buffer.getvalue().to_pybytes()
 
+
+def dataframe_to_parquet_bytes(df: pd.DataFrame) -> bytes:
+    """Convert DataFrame to Parquet bytes."""
+    return arrow_table_to_parquet_bytes(dataframe_to_arrow_table(df))
+
+
+class _ParquetChunkSink(io.RawIOBase):
+    """Write-only file that hands out the bytes written so far (tracking the file offset for the writer)."""
+
+    def __init__(self):
+        super().__init__()
+        self._position = 0
+        self._parts: List[bytes] = []
+
+    def writable(self) -> bool:
+        return True
+
+    def write(self, data) -> int:
+        self._parts.append(bytes(data))
+        self._position += len(data)
+        return len(data)
+
+    def tell(self) -> int:
+        return self._position
+
+    def drain(self) -> bytes:
+        data = b"".join(self._parts)
+        self._parts = []
+        return data
+
+
+def arrow_tables_to_parquet_chunks(tables: Iterable[pa.Table]) -> Iterator[bytes]:
+    """Encode a stream of Arrow tables as one Parquet file, yielding its bytes as they are written.
+
+    Each table becomes a row group. The file schema is the first schema without null-typed
+    columns (tables are held back until a column that is all null so far gets a type), and
+    later tables are cast to it. Concatenated, the chunks are a complete Parquet file.
+    """
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    sink = _ParquetChunkSink()
+    writer = None
+    schema = None
+    pending: List[pa.Table] = []
+    try:
+        for table in tables:
+            if writer is None:
+                pending.append(table)
+                schema = pa.unify_schemas([t.schema for t in pending], promote_options="permissive")
+                if any(pa.types.is_null(field.type) for field in schema):
+                    continue
+                writer = pq.ParquetWriter(sink, schema, coerce_timestamps="us", allow_truncated_timestamps=True)
+                for pending_table in pending:
+                    writer.write_table(pending_table.cast(schema))
+                pending = []
+            else:
+                writer.write_table(table.cast(schema))
+            yield sink.drain()
+
+        if pending:
+            # Some column is null in every row: keep the null type
+            writer = pq.ParquetWriter(sink, schema, coerce_timestamps="us", allow_truncated_timestamps=True)
+            for pending_table in pending:
+                writer.write_table(pending_table.cast(schema))
+        if writer is not None:
+            writer.close()
+            writer = None
+            yield sink.drain()
+    finally:
+        if writer is not None:
+            writer.close()
+
+
+# Row checksums: pandas dtypes that hash as float64 (so 1 and 1.0 are the same value)
+_NUMERIC_KINDS = {"integer", "floating", "mixed-integer-float", "decimal", "boolean"}
+_DATETIME_KINDS = {"datetime64", "datetime"}
+_NULL_HASH = 0x9E3779B97F4A7C15
+_ROW_HASH_MULTIPLIER = 0x100000001B3
+
+
+class DataFrameChecksum:
+    """Incremental checksum of the rows of a stream of DataFrames (e.g. a chunked extraction).
+
+    Rows are hashed one by one and fed in order, so the checksum doesn't depend on how the
+    rows were split into chunks, nor on the dtype pandas inferred for each chunk (an integer
+    column with nulls in one chunk only, or all null in another, hashes the same).
+    """
+
+    def __init__(self):
+        self._hash = hashlib.sha256()
+
+    @staticmethod
+    def _column_hashes(series: pd.Series):
+        import numpy as np
+        import pandas as pd
+        from pandas.util import hash_array
+
+        kind = pd.api.types.infer_dtype(series, skipna=True)
+        nulls = series.isna().to_numpy()
+        if kind == "empty":
+            return np.full(len(series), _NULL_HASH, dtype="uint64")
+        if kind in _NUMERIC_KINDS:
+            values = series.astype("float64").to_numpy()
+        elif kind in _DATETIME_KINDS:
+            values = pd.to_datetime(series, utc=True).dt.tz_localize(None).astype("datetime64[ns]").to_numpy().view("int64")
+        else:
+            values = series.to_numpy(dtype=object)
+        hashes = hash_array(values)
+        hashes[nulls] = _NULL_HASH
+        return hashes
+
+    def update(self, df: pd.DataFrame):
+        import numpy as np
+
+        row_hashes = np.zeros(len(df), dtype="uint64")
+        for column in df.columns:
+            row_hashes = row_hashes * np.uint64(_ROW_HASH_MULTIPLIER) + self._column_hashes(df[column])
+        self._hash.update(row_hashes.tobytes())
+
+    def hexdigest(self) -> str:
+        return self._hash.hexdigest()
+
+
 def filter_schema_columns(schema: List, excluded_columns: List[str] = None) -> List:
     """Filter out metadata columns from schema."""
     if excluded_columns is None:
@@ -0,0 +1,106 @@
+from __future__ import annotations
+
+from typing import TYPE_CHECKING, Dict, List, NamedTuple, Optional, Tuple
+
+# pyarrow is imported at the point of use to keep code-location and run-worker startup fast
+if TYPE_CHECKING:
+    import pyarrow as pa
+
+REASON_CODES_COLUMN = "_dq_reason_codes"
+REASON_CODES_SEPARATOR = "|"
+
+
+class DataQualityRule(NamedTuple):
+    """A declarative row-level check on one column.
+
+    `check` names one of the vectorized kernels in `RULE_CHECKS`; rows failing the check
+    are tagged with `reason_code`. `required` makes a null value fail the rule as well.
+    """
+
+    reason_code: str
+    column: str
+    check: str
+    required: bool = False
+    value: Optional[int] = None
+
+
+def _not_null(column: pa.ChunkedArray, rule: DataQualityRule) -> pa.ChunkedArray:
+    import pyarrow.compute as pc
+
+    return pc.is_null(column)
+
+
+def _non_negative(column: pa.ChunkedArray, rule: DataQualityRule) -> pa.ChunkedArray:
+    import pyarrow.compute as pc
+
+    return pc.less(column, 0)
+
+
+def _exact_length(column: pa.ChunkedArray, rule: DataQualityRule) -> pa.ChunkedArray:
+    import pyarrow as pa
+    import pyarrow.compute as pc
+
+    return pc.not_equal(pc.utf8_length(pc.cast(column, pa.string())), rule.value)
+
+
+# Kernels return a boolean mask that is true for invalid rows (null where the value is null)
+RULE_CHECKS = {
+    "not_null": _not_null,
+    "non_negative": _non_negative,
+    "exact_length": _exact_length,
+}
+
+
+def evaluate_rule(table: pa.Table, rule: DataQualityRule) -> pa.ChunkedArray:
+    """Boolean mask of the rows of `table` failing `rule`."""
+    import pyarrow.compute as pc
+
+    invalid = RULE_CHECKS[rule.check](table.column(rule.column), rule)
+    return pc.fill_null(invalid, rule.required or rule.check == "not_null")
+
+
+def validate_arrow_table(
+    table: pa.Table,
+    rules: List[DataQualityRule],
+) -> Tuple[pa.Table, pa.Table, Dict[str, int]]:
+    """Split a batch into valid and quarantined rows.
+
+    Returns (valid rows, quarantined rows, failing row count per reason code). Quarantined
+    rows keep all their columns plus `_dq_reason_codes` with every failed reason code
+    (joined with "|"). Rules on columns missing from the table are skipped.
+    """
+    import pyarrow as pa
+    import pyarrow.compute as pc
+
+    rule_counts: Dict[str, int] = {}
+    reason_masks = []
+    for rule in rules:
+        if rule.column not in table.column_names:
+            continue
+        invalid = evaluate_rule(table, rule)
+        failed = pc.sum(invalid).as_py() or 0
+        rule_counts[rule.reason_code] = rule_counts.get(rule.reason_code, 0) + failed
+        reason_masks.append((rule.reason_code, invalid))
+
+    if not reason_masks:
+        quarantine_table = table.slice(0, 0).append_column(REASON_CODES_COLUMN, pa.array([], pa.string()))
+        return table, quarantine_table, rule_counts
+
+    any_invalid = reason_masks[0][1]
+    for _, invalid in reason_masks[1:]:
+        any_invalid = pc.or_(any_invalid, invalid)
+
+    valid_table = table.filter(pc.invert(any_invalid))
+    quarantine_table = table.filter(any_invalid)
+
+    # Reason codes only need to be built for the (usually few) quarantined rows
+    reason_columns = [
+        pc.if_else(pc.filter(invalid, any_invalid), reason_code, None)
+        for reason_code, invalid in reason_masks
+    ]
+    reason_codes = pc.binary_join_element_wise(
+        *reason_columns, REASON_CODES_SEPARATOR, null_handling="skip"
+    )
+    quarantine_table = quarantine_table.append_column(REASON_CODES_COLUMN, reason_codes)
+
+    return valid_table, quarantine_table, rule_counts
@@ -1,19 +1,46 @@
-import pandas as pd
-from typing import Tuple
+from datetime import datetime
+from typing import List, Optional, Tuple
 import hashlib
-import time
+import re
 
-def generate_gcs_path(bucket_name: str, table_name: str, prefix: str = "business_case/landing") -> Tuple[str, str, str]:
-    """Generate GCS path with date partition and timestamp."""
-    current_date = pd.Timestamp.now().strftime("%Y-%m-%d")
-    timestamp = pd.Timestamp.now().strftime("%Y%m%d_%H%M%S")
-    blob_name = f"{prefix}/ingestion_dt={current_date}/{table_name}_{timestamp}.parquet"
-    
-    return blob_name, current_date, timestamp
+BATCH_ID_LENGTH = 16
+BATCH_ID_PATTERN = re.compile(rf"_([0-9a-f]{{{BATCH_ID_LENGTH}}})\.parquet$")
+
+# Limits for coalescing pending landing files into one BigQuery load job
+# (BigQuery allows up to 10,000 source URIs per load job)
+MAX_LOAD_FILES = 10_000
+MAX_LOAD_BYTES = 10 * 1024 ** 3
+
+def generate_batch_id(table_name: str, watermark_start: str, watermark_end: str, data_checksum: str) -> str:
+    """Generate a content-addressed batch ID.
+
+    The ID only depends on the table, the source watermark range and the checksum
+    of the extracted data, so a retried run produces the same ID for the same rows.
+    """
+    hash_input = f"{table_name}|{watermark_start}|{watermark_end}|{data_checksum}"
+    return hashlib.sha256(hash_input.encode()).hexdigest()[:BATCH_ID_LENGTH]
+
+def parse_batch_id(gcs_uri: str) -> Optional[str]:
+    """Extract the batch ID from a landing/archive URI, if it has one."""
+    match = BATCH_ID_PATTERN.search(gcs_uri or "")
+    return match.group(1) if match else None
+
+def generate_gcs_path(
+    bucket_name: str,
+    table_name: str,
+    prefix: str = "business_case/landing",
+    batch_id: Optional[str] = None,
+) -> Tuple[str, str, str]:
+    """Generate GCS path with date partition and batch ID (or timestamp if no batch ID is given)."""
+    current_date = datetime.now().strftime("%Y-%m-%d")
+    file_suffix = batch_id or datetime.now().strftime("%Y%m%d_%H%M%S")
+    blob_name = f"{prefix}/ingestion_dt={current_date}/{table_name}_{file_suffix}.parquet"
+
+    return blob_name, current_date, file_suffix
 
 def generate_no_changes_path(bucket_name: str, prefix: str = "business_case/landing") -> str:
     """Generate placeholder path for no changes case."""
-    current_date = pd.Timestamp.now().strftime("%Y-%m-%d")
+    current_date = datetime.now().strftime("%Y-%m-%d")
     return f"gs://{bucket_name}/{prefix}/ingestion_dt={current_date}/no_changes"
 
 def parse_gcs_uri(gcs_uri: str) -> Tuple[str, str]:
@@ -29,12 +56,53 @@ def generate_archive_fail_paths(source_bucket: str, source_blob: str) -> Tuple[s
     archive_blob = source_blob.replace('landing/', 'archive/')
     fail_bucket = source_bucket
     fail_blob = source_blob.replace('landing/', 'failed/')
-    
+
     return archive_bucket, archive_blob, fail_bucket, fail_blob
 
+def is_archived_uri(gcs_uri: str) -> bool:
+    """Whether a URI points to an already loaded (archived) batch file."""
+    _, blob_name = parse_gcs_uri(gcs_uri)
+    return '/archive/' in f"/{blob_name}"
+
 def generate_unique_table_name(base_name: str, gcs_uri: str = None) -> str:
-    """Generate unique table name with hash suffix."""
-    timestamp = str(int(time.time()))
-    hash_input = f"{timestamp}_{gcs_uri or ''}"
-    hash_suffix = hashlib.md5(hash_input.encode()).hexdigest()[:12]
+    """Generate deterministic temp table name for a batch.
+
+    Uses the batch ID embedded in the file name so retries (and the archived copy
+    of the same file) map to the same temp table. Falls back to a hash of the URI.
+    """
+    batch_id = parse_batch_id(gcs_uri)
+    if batch_id is None:
+        batch_id = hashlib.md5((gcs_uri or '').encode()).hexdigest()[:12]
+    return f"{base_name}_{batch_id}"
+
+def generate_coalesced_table_name(base_name: str, gcs_uris: List[str]) -> str:
+    """Generate deterministic temp table name for a set of coalesced batch files."""
+    if len(gcs_uris) == 1:
+        return generate_unique_table_name(base_name, gcs_uris[0])
+    batch_ids = sorted(parse_batch_id(uri) or uri for uri in gcs_uris)
+    hash_suffix = hashlib.sha256("|".join(batch_ids).encode()).hexdigest()[:BATCH_ID_LENGTH]
     return f"{base_name}_{hash_suffix}"
+
+def select_pending_batch(
+    pending_files: List[Tuple[str, int, object]],
+    required_uri: Optional[str] = None,
+    max_files: int = MAX_LOAD_FILES,
+    max_bytes: int = MAX_LOAD_BYTES,
+) -> List[str]:
+    """Pick the pending landing files to load together in a single load job.
+
+    `pending_files` are (uri, size, created) tuples as returned by `GCPResource.list_gcs_blobs`.
+    `required_uri` (the current run's batch) is always included, then the oldest pending
+    files are added while the batch stays within the file count and size limits.
+    """
+    sizes = {uri: size or 0 for uri, size, _ in pending_files}
+    selected = [required_uri] if required_uri else []
+    total_bytes = sizes.get(required_uri, 0)
+    for uri, size, _ in sorted(pending_files, key=lambda f: (f[2], f[0])):
+        if uri == required_uri:
+            continue
+        if selected and (len(selected) >= max_files or total_bytes + sizes[uri] > max_bytes):
+            break
+        selected.append(uri)
+        total_bytes += sizes[uri]
+    return selected
@@ -0,0 +1,223 @@
+from __future__ import annotations
+
+import functools
+import json
+import os
+import threading
+import time
+from contextlib import contextmanager
+from typing import TYPE_CHECKING, Dict, Iterator, List, Optional, Sequence
+
+from dagster import AssetExecutionContext, AssetKey, AssetObservation
+
+from .bigquery_stats import BigQueryJobStats, summarize_job_stats
+
+# resource (peak RSS) is Unix-only
+try:
+    import resource
+except ImportError:  # pragma: no cover
+    resource = None
+
+if TYPE_CHECKING:
+    import pandas as pd
+
+    from .memory_budget import MemoryBudget
+
+# When set, every instrumented step appends its metrics as a JSON line to this file
+PERF_METRICS_FILE_ENV = "CREDIX_PERF_METRICS_FILE"
+
+# Recorder of the step running in this process (steps run one per process, or sequentially in-process).
+# Threads started by the step (extraction pool, stream stages) record into it as well.
+_active_recorder: Optional["PerformanceRecorder"] = None
+
+
+class PerformanceRecorder:
+    """Collects wall/CPU time, throughput, peak RSS and external wait times of one step."""
+
+    def __init__(self, stage: str):
+        self.stage = stage
+        self.rows: Optional[int] = None
+        self.bytes_read: Optional[int] = None
+        self.bytes_written: Optional[int] = None
+        self.wait_seconds: Dict[str, float] = {}
+        self.phase_seconds: Dict[str, float] = {}
+        # Set by steps that run within a memory budget, to report their peak memory against it
+        self.memory_budget: Optional[MemoryBudget] = None
+        # Finished BigQuery jobs of the step (`record_bigquery_job`), reported as `bigquery_*` totals
+        self.bigquery_jobs: List[BigQueryJobStats] = []
+        # Systems each thread is waiting on, and the number of threads waiting per system
+        self._thread_waits = threading.local()
+        self._waiters: Dict[str, int] = {}
+        self._waits_started: Dict[str, float] = {}
+        self._lock = threading.Lock()
+        self._start_wall = time.perf_counter()
+        self._start_cpu = _cpu_seconds()
+        self._end_wall: Optional[float] = None
+        self._end_cpu: Optional[float] = None
+
+    @contextmanager
+    def waiting(self, system: str) -> Iterator[None]:
+        """Time spent blocked on an external system (postgres, gcs, bigquery, dbt).
+
+        Nested waits on the same system in a thread (e.g. `move_blob` calling `copy_gcs_file`)
+        are counted once. Waits of concurrent threads (extraction pool, stream stages) count
+        the union of their intervals: the time at least one thread was waiting on the system.
+        """
+        waiting_on = getattr(self._thread_waits, "systems", None)
+        if waiting_on is None:
+            waiting_on = self._thread_waits.systems = set()
+        if system in waiting_on:
+            yield
+            return
+        waiting_on.add(system)
+        with self._lock:
+            if not self._waiters.get(system):
+                self._waits_started[system] = time.perf_counter()
+            self._waiters[system] = self._waiters.get(system, 0) + 1
+        try:
+            yield
+        finally:
+            waiting_on.discard(system)
+            with self._lock:
+                self._waiters[system] -= 1
+                if not self._waiters[system]:
+                    elapsed = time.perf_counter() - self._waits_started.pop(system)
+                    self.wait_seconds[system] = self.wait_seconds.get(system, 0.0) + elapsed
+
+    @contextmanager
+    def phase(self, name: str) -> Iterator[None]:
+        """Time spent in an in-process phase of the step (e.g. prepare, parquet_encode)."""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            elapsed = time.perf_counter() - start
+            with self._lock:
+                self.phase_seconds[name] = self.phase_seconds.get(name, 0.0) + elapsed
+
+    def stop(self):
+        self._end_wall = time.perf_counter()
+        self._end_cpu = _cpu_seconds()
+
+    def metrics(self) -> dict:
+        """Metrics as flat `perf_*` (and `bigquery_*`) metadata entries."""
+        wall_seconds = (self._end_wall or time.perf_counter()) - self._start_wall
+        cpu_seconds = (self._end_cpu or _cpu_seconds()) - self._start_cpu
+        metrics = {
+            "perf_wall_seconds": round(wall_seconds, 3),
+            "perf_cpu_seconds": round(cpu_seconds, 3),
+        }
+        peak_rss_mb = _peak_rss_mb()
+        if peak_rss_mb is not None:
+            metrics["perf_peak_rss_mb"] = peak_rss_mb
+        if self.rows is not None:
+            metrics["perf_rows"] = self.rows
+            metrics["perf_rows_per_second"] = round(self.rows / wall_seconds) if wall_seconds else 0
+        if self.bytes_read is not None:
+            metrics["perf_bytes_read"] = self.bytes_read
+        if self.bytes_written is not None:
+            metrics["perf_bytes_written"] = self.bytes_written
+        for system, seconds in sorted(self.wait_seconds.items()):
+            metrics[f"perf_wait_{system}_seconds"] = round(seconds, 3)
+        for name, seconds in self.phase_seconds.items():
+            metrics[f"perf_{name}_seconds"] = round(seconds, 3)
+        if self.memory_budget is not None:
+            metrics.update(self.memory_budget.report())
+        if self.bigquery_jobs:
+            metrics.update(summarize_job_stats(self.bigquery_jobs))
+        return metrics
+
+
+def _cpu_seconds() -> float:
+    """CPU time of this process and its finished children (e.g. the dbt subprocess)."""
+    times = os.times()
+    return times.user + times.system + times.children_user + times.children_system
+
+
+def _peak_rss_mb() -> Optional[float]:
+    if resource is None:
+        return None
+    # ru_maxrss is in KiB on Linux
+    return round(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024, 1)
+
+
+def dataframe_bytes(df: pd.DataFrame) -> int:
+    """In-memory size of a DataFrame (including string contents)."""
+    return int(df.memory_usage(index=False, deep=True).sum())
+
+
+def waits_on(system: str):
+    """Decorator for resource methods: count the call as waiting on `system` in the active step."""
+
+    def decorator(func):
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            recorder = _active_recorder
+            if recorder is None:
+                return func(*args, **kwargs)
+            with recorder.waiting(system):
+                return func(*args, **kwargs)
+
+        return wrapper
+
+    return decorator
+
+
+def record_bigquery_job(stats: BigQueryJobStats):
+    """Add a finished BigQuery job to the statistics of the active step (if any)."""
+    recorder = _active_recorder
+    if recorder is not None:
+        with recorder._lock:
+            recorder.bigquery_jobs.append(stats)
+
+
+@contextmanager
+def instrument_step(
+    context: AssetExecutionContext,
+    stage: str,
+    asset_keys: Optional[Sequence[AssetKey]] = None,
+) -> Iterator[PerformanceRecorder]:
+    """Record the performance of an asset step.
+
+    On success the metrics are added to the asset's output metadata, or reported as
+    observations of `asset_keys` for multi-assets that stream their outputs (dbt).
+    Metrics are also appended to the `CREDIX_PERF_METRICS_FILE` file when it is set,
+    for failed steps too.
+    """
+    global _active_recorder
+
+    recorder = PerformanceRecorder(stage)
+    previous_recorder, _active_recorder = _active_recorder, recorder
+    status = "failed"
+    try:
+        yield recorder
+        status = "success"
+    finally:
+        _active_recorder = previous_recorder
+        recorder.stop()
+        metrics = recorder.metrics()
+        context.log.info(f"Performance of {stage}: {metrics}")
+        if status == "success":
+            if asset_keys is None:
+                context.add_output_metadata(metrics)
+            else:
+                for asset_key in asset_keys:
+                    context.log_event(AssetObservation(asset_key=asset_key, metadata=metrics))
+        write_metrics_file(context, stage, status, metrics)
+
+
+def write_metrics_file(context: AssetExecutionContext, stage: str, status: str, metrics: dict):
+    """Append the step metrics as a JSON line to the local metrics file, if configured."""
+    path = os.getenv(PERF_METRICS_FILE_ENV)
+    if not path:
+        return
+    record = {
+        "timestamp": time.time(),
+        "run_id": context.run.run_id,
+        "job_name": context.job_name,
+        "stage": stage,
+        "status": status,
+        **metrics,
+    }
+    with open(path, "a") as f:
+        f.write(json.dumps(record) + "\n")
@@ -0,0 +1,94 @@
+import os
+import shutil
+import tempfile
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Iterator, Optional
+
+# resource (peak RSS) is Unix-only
+try:
+    import resource
+except ImportError:  # pragma: no cover
+    resource = None
+
+# Fallback size of a row when no previous batch measured it
+DEFAULT_BYTES_PER_ROW = 1024
+
+
+def current_rss_bytes() -> Optional[int]:
+    """Resident memory of this process right now (Linux), or None if it can't be read."""
+    try:
+        with open("/proc/self/statm") as f:
+            resident_pages = int(f.read().split()[1])
+        return resident_pages * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, IndexError):
+        return None
+
+
+def peak_rss_bytes() -> Optional[int]:
+    """Peak resident memory of this process so far."""
+    if resource is None:
+        return None
+    # ru_maxrss is in KiB on Linux
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024
+
+
+class MemoryBudget:
+    """Memory budget of the steps of a run (one step per process with the multiprocess executor).
+
+    Steps ask it before holding a batch in memory: `fits` tells whether a working set
+    still fits next to what the process already uses, and `rows_within` how many rows do.
+    When the batch doesn't fit, a step works in chunks and spills to files under
+    `spill_dir` (`spill_path`), so a large backlog gets slower instead of running out of
+    memory. Without a budget (`budget_bytes=None`) everything fits.
+    """
+
+    def __init__(self, budget_bytes: Optional[int] = None, spill_dir: Optional[str] = None):
+        self.budget_bytes = budget_bytes or None
+        self.spill_dir = spill_dir or None
+        self.spilled = False
+
+    @property
+    def enabled(self) -> bool:
+        return self.budget_bytes is not None
+
+    def available_bytes(self) -> Optional[int]:
+        """Budget left next to the memory the process already uses (None without a budget)."""
+        if not self.enabled:
+            return None
+        return max(0, self.budget_bytes - (current_rss_bytes() or 0))
+
+    def fits(self, working_bytes: int) -> bool:
+        available = self.available_bytes()
+        return available is None or working_bytes <= available
+
+    def rows_within(self, bytes_per_row: float, copies: int = 1) -> Optional[int]:
+        """Rows whose `copies` in-memory copies fit in the available budget (None without a budget).
+
+        At least one row, so a step that is already over its budget still makes progress.
+        """
+        available = self.available_bytes()
+        if available is None:
+            return None
+        return max(1, int(available / (max(bytes_per_row, 1.0) * copies)))
+
+    @contextmanager
+    def spill_path(self, name: str) -> Iterator[Path]:
+        """Path of a spill file in a temporary directory, removed with its contents on exit."""
+        self.spilled = True
+        directory = tempfile.mkdtemp(prefix="credix_spill_", dir=self.spill_dir)
+        try:
+            yield Path(directory) / name
+        finally:
+            shutil.rmtree(directory, ignore_errors=True)
+
+    def report(self) -> dict:
+        """Peak memory of the process against the budget, as flat `perf_*` metadata entries."""
+        if not self.enabled:
+            return {}
+        peak_bytes = peak_rss_bytes() or 0
+        return {
+            "perf_memory_budget_mb": round(self.budget_bytes / 1024 ** 2, 1),
+            "perf_memory_budget_used_pct": round(peak_bytes / self.budget_bytes * 100, 1),
+            "perf_memory_spilled": self.spilled,
+        }
@@ -0,0 +1,426 @@
+from __future__ import annotations
+
+import os
+from datetime import date, datetime, timedelta, timezone
+from typing import TYPE_CHECKING, Dict, List, NamedTuple, Optional, Union
+
+import numpy as np
+
+# pandas/pyarrow are imported at the point of use (this module is not on the code-location import path)
+if TYPE_CHECKING:
+    import pandas as pd
+    import pyarrow as pa
+
+EPOCH = date(1970, 1, 1)
+
+# Row status codes (payment_status of installments_clean)
+REMOVED, PAID, OVERDUE, PENDING = 0, 1, 2, 3
+
+# Tiers of the payment_tier CASE in macros/company_payment_summary.sql, in order of evaluation
+PAYMENT_TIERS = ["EXCELLENT", "GOOD", "FAIR", "POOR", "HIGH_RISK"]
+NO_HISTORY = "NO_HISTORY"
+
+# Per-buyer aggregates (payment_aggregations CTE). Amounts are kept in cents so updates are exact.
+BUYER_AGGREGATES = {
+    "total_installments": np.int64,
+    "paid_installments": np.int64,
+    "overdue_installments": np.int64,
+    "pending_installments": np.int64,
+    "total_original_cents": np.int64,
+    "total_expected_cents": np.int64,
+    "total_paid_cents": np.int64,
+    "total_overdue_cents": np.int64,
+    "paid_days_sum": np.int64,
+    "best_payment_days": np.int64,
+    "worst_payment_days": np.int64,
+}
+# Per-installment state, needed to retract a row's previous contribution when CDC sends a new version
+ROW_FIELDS = {
+    "buyer": np.int32,
+    "status": np.int8,
+    "due_date": np.int32,
+    "days_from_due_date": np.int32,
+    "original_cents": np.int64,
+    "expected_cents": np.int64,
+    "paid_cents": np.int64,
+}
+# Scores derived from the aggregates, cached for lookups and recomputed for the buyers a batch touches
+BUYER_SCORES = {
+    "payment_completion_rate": np.float64,
+    "overdue_rate": np.float64,
+    "avg_payment_days": np.float64,
+    "risk_score": np.float64,
+    "payment_tier": np.int8,
+}
+
+NO_PAID_DAYS_MIN = np.iinfo(np.int64).max
+NO_PAID_DAYS_MAX = np.iinfo(np.int64).min
+
+
+class BuyerScore(NamedTuple):
+    """Payment metrics and risk assessment of one buyer, as in `gold.company_payment_summary`."""
+
+    buyer_tax_id: str
+    total_installments: int
+    paid_installments: int
+    overdue_installments: int
+    pending_installments: int
+    total_original_amount: float
+    total_expected_amount: float
+    total_paid_amount: float
+    total_overdue_amount: float
+    payment_completion_rate: float
+    overdue_rate: float
+    avg_payment_days: Optional[float]
+    best_payment_days: Optional[int]
+    worst_payment_days: Optional[int]
+    payment_tier: str
+    risk_score: float
+
+
+def round_half_away_from_zero(values: np.ndarray, decimals: int) -> np.ndarray:
+    """ROUND(x, decimals) as in BigQuery (halves round away from zero, unlike np.round)."""
+    scale = 10.0 ** decimals
+    return np.sign(values) * np.floor(np.abs(values) * scale + 0.5) / scale
+
+
+def score_aggregates(
+    total_installments: np.ndarray,
+    paid_installments: np.ndarray,
+    overdue_installments: np.ndarray,
+    paid_days_sum: np.ndarray,
+) -> Dict[str, np.ndarray]:
+    """Rates, payment_tier and risk_score of the company_payment_summary SQL, vectorized over buyers.
+
+    avg_payment_days is NaN for buyers without paid installments, which fails every comparison
+    like NULL does in the SQL CASE expressions.
+    """
+    has_rows = total_installments > 0
+    safe_total = np.where(has_rows, total_installments, 1)
+    completion_rate = np.where(has_rows, round_half_away_from_zero(paid_installments * 100.0 / safe_total, 2), 0.0)
+    overdue_rate = np.where(has_rows, round_half_away_from_zero(overdue_installments * 100.0 / safe_total, 2), 0.0)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        avg_payment_days = np.where(paid_installments > 0, paid_days_sum / paid_installments, np.nan)
+
+    tier_conditions = [
+        (completion_rate >= 95) & (avg_payment_days <= 5) & (overdue_rate <= 5),
+        (completion_rate >= 85) & (avg_payment_days <= 15) & (overdue_rate <= 15),
+        (completion_rate >= 70) & (avg_payment_days <= 30) & (overdue_rate <= 25),
+        (completion_rate >= 50) & (overdue_rate <= 40),
+    ]
+    payment_tier = np.select(tier_conditions, np.arange(len(tier_conditions)), default=len(tier_conditions))
+
+    payment_days_points = np.select(
+        [avg_payment_days <= 0, avg_payment_days <= 10, avg_payment_days <= 30], [30, 20, 10], default=0
+    )
+    risk_score = round_half_away_from_zero(
+        np.clip(completion_rate * 0.4 + payment_days_points + (100 - overdue_rate) * 0.3, 0, 100), 2
+    )
+    # Buyers without (valid) installments are left-joined in the SQL: NO_HISTORY, risk_score 0
+    return {
+        "payment_completion_rate": completion_rate,
+        "overdue_rate": overdue_rate,
+        "avg_payment_days": avg_payment_days,
+        "risk_score": np.where(has_rows, risk_score, 0.0),
+        "payment_tier": np.where(has_rows, payment_tier, -1).astype(np.int8),
+    }
+
+
+def utc_today() -> date:
+    """CURRENT_DATE() as evaluated by BigQuery."""
+    return datetime.now(timezone.utc).date()
+
+
+def _allocate(fields: Dict[str, type], capacity: int = 1024, fill: Optional[Dict[str, int]] = None) -> Dict[str, np.ndarray]:
+    return {name: np.full(capacity, (fill or {}).get(name, 0), dtype=dtype) for name, dtype in fields.items()}
+
+
+def _grow(arrays: Dict[str, np.ndarray], size: int, fill: Optional[Dict[str, int]] = None) -> Dict[str, np.ndarray]:
+    """Return the arrays with a capacity of at least `size` (doubling), new slots set to `fill` or 0."""
+    capacity = len(next(iter(arrays.values())))
+    if size <= capacity:
+        return arrays
+    new_capacity = max(size, capacity * 2, 1024)
+    grown = {}
+    for name, values in arrays.items():
+        new_values = np.full(new_capacity, (fill or {}).get(name, 0), dtype=values.dtype)
+        new_values[:capacity] = values
+        grown[name] = new_values
+    return grown
+
+
+class RiskScoringEngine:
+    """In-memory risk scoring of buyers, kept up to date from the installments CDC batches.
+
+    Reproduces `payment_tier` and `risk_score` of `gold.company_payment_summary` (and the
+    installments_clean rules they are computed on) without a warehouse query. Aggregates
+    live in NumPy arrays indexed by buyer (`buyer_tax_id` -> slot), and every installment
+    keeps its last contribution so a new version of the row replaces it exactly.
+
+    Unlike the gold table, which only lists buyers with a CNPJ row, every buyer with
+    installments is scored. OVERDUE/PENDING depend on the date: call `advance_to` once
+    a day, like the `refresh_installments_payment_status` operation.
+    """
+
+    def __init__(self, as_of: Optional[date] = None):
+        self.as_of = as_of or utc_today()
+        self._buyer_slots: Dict[str, int] = {}
+        self._buyer_ids: List[str] = []
+        self._row_slots: Dict[str, int] = {}
+        self._buyers = _allocate(BUYER_AGGREGATES, fill=self._buyer_fill())
+        self._scores = _allocate(BUYER_SCORES)
+        self._rows = _allocate(ROW_FIELDS)
+        # Buyer slots ordered by risk_score (descending, then ascending), built on the first top_n query
+        self._rankings: Dict[bool, np.ndarray] = {}
+
+    @staticmethod
+    def _buyer_fill() -> Dict[str, int]:
+        return {"best_payment_days": NO_PAID_DAYS_MIN, "worst_payment_days": NO_PAID_DAYS_MAX}
+
+    def __len__(self) -> int:
+        return len(self._buyer_ids)
+
+    def _as_of_days(self) -> int:
+        return (self.as_of - EPOCH).days
+
+    def _slots(self, keys: np.ndarray, slots: Dict[str, int], ids: Optional[List[str]] = None) -> np.ndarray:
+        """Slot of every key, allocating new slots for unseen keys."""
+        result = np.empty(len(keys), dtype=np.int64)
+        for i, key in enumerate(keys.tolist()):
+            slot = slots.get(key)
+            if slot is None:
+                slot = slots[key] = len(slots)
+                if ids is not None:
+                    ids.append(key)
+            result[i] = slot
+        return result
+
+    def apply_batch(self, batch: Union[pa.Table, pd.DataFrame]) -> int:
+        """Apply a CDC batch of `business_case_installments` rows (latest version per asset_id).
+
+        Rows failing the installments_clean filters (missing keys, negative amounts) remove the
+        installment from the aggregates. Returns the number of installments applied.
+        """
+        import pyarrow as pa
+        import pyarrow.compute as pc
+
+        if not isinstance(batch, pa.Table):
+            batch = pa.Table.from_pandas(batch, preserve_index=False)
+        if batch.num_rows == 0:
+            return 0
+
+        # Keep the last version of every asset_id in the batch
+        asset_ids = batch["asset_id"].to_numpy(zero_copy_only=False)
+        present = ~pc.is_null(batch["asset_id"]).to_numpy(zero_copy_only=False)
+        _, last_from_end = np.unique(asset_ids[present][::-1], return_index=True)
+        keep = np.flatnonzero(present)[::-1][last_from_end]
+        batch = batch.take(pa.array(keep))
+        asset_ids = asset_ids[keep]
+
+        def cents(column: str) -> np.ndarray:
+            return pc.fill_null(batch[column], 0).to_numpy().astype(np.int64)
+
+        def days(column: str) -> np.ndarray:
+            values = pc.cast(batch[column], pa.date32()) if batch[column].type != pa.date32() else batch[column]
+            return pc.fill_null(pc.cast(values, pa.int32()), 0).to_numpy().astype(np.int32)
+
+        def is_null(column: str) -> np.ndarray:
+            return pc.is_null(batch[column]).to_numpy(zero_copy_only=False)
+
+        original_null, paid_null = is_null("original_amount_in_cents"), is_null("paid_amount_in_cents")
+        original, expected, paid_amount = cents("original_amount_in_cents"), cents("expected_amount_in_cents"), cents("paid_amount_in_cents")
+        due_date, paid_date = days("due_date"), days("paid_date")
+        is_paid = ~is_null("paid_date")
+
+        # WHERE clause of installments_clean
+        valid = (
+            ~is_null("buyer_tax_id")
+            & ~is_null("expected_amount_in_cents")
+            & ~is_null("due_date")
+            & (original_null | (original >= 0))
+            & (expected >= 0)
+            & (paid_null | (paid_amount >= 0))
+        )
+        status = np.where(is_paid, PAID, np.where(due_date < self._as_of_days(), OVERDUE, PENDING)).astype(np.int8)
+        status[~valid] = REMOVED
+
+        rows = self._slots(asset_ids, self._row_slots)
+        self._rows = _grow(self._rows, len(self._row_slots))
+        buyer_ids = np.where(valid, pc.fill_null(batch["buyer_tax_id"], "").to_numpy(zero_copy_only=False), "")
+        buyers = np.zeros(len(rows), dtype=np.int64)
+        buyers[valid] = self._slots(buyer_ids[valid], self._buyer_slots, self._buyer_ids)
+        self._buyers = _grow(self._buyers, len(self._buyer_ids), self._buyer_fill())
+        self._scores = _grow(self._scores, len(self._buyer_ids))
+
+        # Retract the previous version of the installments, then add the new one
+        previous = self._rows["status"][rows] != REMOVED
+        touched = np.concatenate([self._rows["buyer"][rows][previous], buyers[valid]])
+        removed_paid_buyers = self._accumulate(rows, -1)
+        new_values = {
+            "buyer": buyers,
+            "status": status,
+            "due_date": due_date,
+            "days_from_due_date": np.where(is_paid, paid_date - due_date, 0),
+            "original_cents": original,
+            "expected_cents": expected,
+            "paid_cents": paid_amount,
+        }
+        for name, values in new_values.items():
+            self._rows[name][rows] = values
+        self._accumulate(rows, 1)
+        self._recompute_payment_days(removed_paid_buyers)
+
+        self._update_scores(np.unique(touched))
+        return len(rows)
+
+    def _accumulate(self, rows: np.ndarray, sign: int) -> np.ndarray:
+        """Add (sign=1) or retract (sign=-1) the contribution of `rows` to their buyers' aggregates.
+
+        Returns the buyers that lost a paid installment (their best/worst days need a recompute).
+        """
+        status = self._rows["status"][rows]
+        rows = rows[status != REMOVED]
+        status = status[status != REMOVED]
+        buyers = self._rows["buyer"][rows]
+        num_buyers = len(self._buyer_ids)
+
+        def add(name: str, weights: Optional[np.ndarray] = None, mask: Optional[np.ndarray] = None):
+            selected = buyers if mask is None else buyers[mask]
+            if weights is not None and mask is not None:
+                weights = weights[mask]
+            delta = np.bincount(selected, weights=weights, minlength=num_buyers)
+            self._buyers[name][:num_buyers] += sign * np.rint(delta).astype(np.int64)
+
+        is_paid, is_overdue = status == PAID, status == OVERDUE
+        expected = self._rows["expected_cents"][rows]
+        add("total_installments")
+        add("paid_installments", mask=is_paid)
+        add("overdue_installments", mask=is_overdue)
+        add("pending_installments", mask=status == PENDING)
+        add("total_original_cents", self._rows["original_cents"][rows])
+        add("total_expected_cents", expected)
+        add("total_paid_cents", self._rows["paid_cents"][rows])
+        add("total_overdue_cents", expected, mask=is_overdue)
+        paid_days = self._rows["days_from_due_date"][rows]
+        add("paid_days_sum", paid_days, mask=is_paid)
+
+        if sign > 0:
+            np.minimum.at(self._buyers["best_payment_days"], buyers[is_paid], paid_days[is_paid])
+            np.maximum.at(self._buyers["worst_payment_days"], buyers[is_paid], paid_days[is_paid])
+            return np.zeros(0, dtype=np.int64)
+        return np.unique(buyers[is_paid])
+
+    def _recompute_payment_days(self, buyers: np.ndarray):
+        """Best/worst payment days can't be retracted: rebuild them from the paid rows of `buyers`."""
+        if len(buyers) == 0:
+            return
+        self._buyers["best_payment_days"][buyers] = NO_PAID_DAYS_MIN
+        self._buyers["worst_payment_days"][buyers] = NO_PAID_DAYS_MAX
+        num_rows = len(self._row_slots)
+        row_buyers = self._rows["buyer"][:num_rows]
+        paid = (self._rows["status"][:num_rows] == PAID) & np.isin(row_buyers, buyers)
+        paid_days = self._rows["days_from_due_date"][:num_rows][paid]
+        np.minimum.at(self._buyers["best_payment_days"], row_buyers[paid], paid_days)
+        np.maximum.at(self._buyers["worst_payment_days"], row_buyers[paid], paid_days)
+
+    def _update_scores(self, buyers: np.ndarray):
+        buyers = buyers.astype(np.int64)
+        scores = score_aggregates(
+            self._buyers["total_installments"][buyers],
+            self._buyers["paid_installments"][buyers],
+            self._buyers["overdue_installments"][buyers],
+            self._buyers["paid_days_sum"][buyers],
+        )
+        for name, values in scores.items():
+            self._scores[name][buyers] = values
+        self._rankings = {}
+
+    def advance_to(self, as_of: Optional[date] = None):
+        """Move the scoring date forward: unpaid installments due before it become OVERDUE."""
+        as_of = as_of or utc_today()
+        if as_of < self.as_of:
+            raise ValueError(f"Cannot move the scoring date back from {self.as_of} to {as_of}")
+        num_rows = len(self._row_slots)
+        status = self._rows["status"][:num_rows]
+        now_overdue = np.flatnonzero((status == PENDING) & (self._rows["due_date"][:num_rows] < (as_of - EPOCH).days))
+        if len(now_overdue):
+            self._accumulate(now_overdue, -1)
+            self._rows["status"][now_overdue] = OVERDUE
+            self._accumulate(now_overdue, 1)
+            self._update_scores(np.unique(self._rows["buyer"][now_overdue]))
+        self.as_of = as_of
+
+    def score(self, buyer_tax_id: str) -> Optional[BuyerScore]:
+        """Metrics and risk assessment of one buyer, or None if it has never had installments."""
+        slot = self._buyer_slots.get(buyer_tax_id)
+        return None if slot is None else self._buyer_score(slot)
+
+    def top_n(self, n: int = 10, riskiest: bool = False) -> List[BuyerScore]:
+        """The `n` buyers with the highest risk_score (best payers), or the lowest with `riskiest`.
+
+        Buyers without installments are left out. Ties are broken by buyer_tax_id.
+        """
+        ranking = self._rankings.get(riskiest)
+        if ranking is None:
+            num_buyers = len(self._buyer_ids)
+            scored = np.flatnonzero(self._buyers["total_installments"][:num_buyers] > 0)
+            ids = np.array(self._buyer_ids, dtype=str)[scored]
+            risk_scores = self._scores["risk_score"][scored]
+            ranking = self._rankings[riskiest] = scored[np.lexsort((ids, risk_scores if riskiest else -risk_scores))]
+        return [self._buyer_score(slot) for slot in ranking[:n]]
+
+    def _buyer_score(self, slot: int) -> BuyerScore:
+        buyer, scores = self._buyers, self._scores
+        total = int(buyer["total_installments"][slot])
+        has_paid_days = bool(buyer["paid_installments"][slot])
+        tier = int(scores["payment_tier"][slot])
+        return BuyerScore(
+            buyer_tax_id=self._buyer_ids[slot],
+            total_installments=total,
+            paid_installments=int(buyer["paid_installments"][slot]),
+            overdue_installments=int(buyer["overdue_installments"][slot]),
+            pending_installments=int(buyer["pending_installments"][slot]),
+            total_original_amount=int(buyer["total_original_cents"][slot]) / 100,
+            total_expected_amount=int(buyer["total_expected_cents"][slot]) / 100,
+            total_paid_amount=int(buyer["total_paid_cents"][slot]) / 100,
+            total_overdue_amount=int(buyer["total_overdue_cents"][slot]) / 100,
+            payment_completion_rate=float(scores["payment_completion_rate"][slot]),
+            overdue_rate=float(scores["overdue_rate"][slot]),
+            avg_payment_days=float(scores["avg_payment_days"][slot]) if has_paid_days else None,
+            best_payment_days=int(buyer["best_payment_days"][slot]) if has_paid_days else None,
+            worst_payment_days=int(buyer["worst_payment_days"][slot]) if has_paid_days else None,
+            payment_tier=PAYMENT_TIERS[tier] if total else NO_HISTORY,
+            risk_score=float(scores["risk_score"][slot]),
+        )
+
+    def snapshot(self, path: str):
+        """Write the engine state to `path` (NumPy .npz), replacing any previous snapshot atomically."""
+        num_buyers, num_rows = len(self._buyer_ids), len(self._row_slots)
+        arrays = {f"buyer_{name}": values[:num_buyers] for name, values in self._buyers.items()}
+        arrays.update({f"row_{name}": values[:num_rows] for name, values in self._rows.items()})
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, "wb") as f:
+            np.savez(
+                f,
+                as_of=np.array(self._as_of_days()),
+                buyer_ids=np.array(self._buyer_ids, dtype=str),
+                asset_ids=np.array(list(self._row_slots), dtype=str),
+                **arrays,
+            )
+        os.replace(tmp_path, path)
+
+    @classmethod
+    def restore(cls, path: str) -> "RiskScoringEngine":
+        """Load an engine from a `snapshot` file."""
+        with np.load(path) as snapshot:
+            engine = cls(as_of=EPOCH + timedelta(days=int(snapshot["as_of"])))
+            engine._buyer_ids = snapshot["buyer_ids"].tolist()
+            engine._buyer_slots = {buyer_id: slot for slot, buyer_id in enumerate(engine._buyer_ids)}
+            engine._row_slots = {asset_id: slot for slot, asset_id in enumerate(snapshot["asset_ids"].tolist())}
+            engine._buyers = {name: snapshot[f"buyer_{name}"].copy() for name in BUYER_AGGREGATES}
+            engine._rows = {name: snapshot[f"row_{name}"].copy() for name in ROW_FIELDS}
+        engine._buyers = _grow(engine._buyers, 1, engine._buyer_fill())
+        engine._rows = _grow(engine._rows, 1)
+        engine._scores = _allocate(BUYER_SCORES, len(engine._buyers["total_installments"]))
+        engine._update_scores(np.arange(len(engine._buyer_ids)))
+        return engine
@@ -0,0 +1,144 @@
+import queue
+import threading
+import time
+from typing import Callable, Dict, Iterable, Iterator, List, Optional, Sequence, Tuple
+
+# A stage consumes the items of the previous stage and yields items for the next one
+StageFunction = Callable[[Iterator], Iterable]
+
+# How often threads blocked on a queue check whether the pipeline was cancelled
+_POLL_SECONDS = 0.1
+
+_END = object()
+
+
+class PipelineCancelled(Exception):
+    """Raised inside a stage when another stage of the pipeline failed."""
+
+
+class StagePipeline:
+    """Runs a source and a chain of stages concurrently, connected by bounded queues.
+
+    Each stage runs in its own thread and is a generator function over the items of the
+    previous stage (which it must consume to the end), so a stage can batch, split or flush
+    items at the end of the stream.
+
+    Queues hold at most `queue_size` items: a slow stage blocks the ones before it
+    (backpressure) instead of buffering the whole batch. If any stage fails, the others are
+    cancelled (blocked threads wake up and `PipelineCancelled` is raised inside the stage
+    generators, so their cleanup runs) and the first error is re-raised by `run`.
+
+    `busy_seconds` has the time each stage spent working (excluding waiting on its input
+    or output queue), so the slowest stage bounds the end-to-end time.
+    """
+
+    def __init__(self, queue_size: int = 2):
+        self.queue_size = max(1, queue_size)
+        self.busy_seconds: Dict[str, float] = {}
+        self._cancelled = threading.Event()
+        self._errors: List[BaseException] = []
+        self._lock = threading.Lock()
+
+    def _fail(self, error: BaseException):
+        with self._lock:
+            if not isinstance(error, PipelineCancelled):
+                self._errors.append(error)
+        self._cancelled.set()
+
+    def _put(self, output: queue.Queue, item) -> float:
+        """Put an item, waiting while the queue is full. Returns the time spent waiting."""
+        start = time.perf_counter()
+        while True:
+            if self._cancelled.is_set():
+                raise PipelineCancelled()
+            try:
+                output.put(item, timeout=_POLL_SECONDS)
+                return time.perf_counter() - start
+            except queue.Full:
+                continue
+
+    def _iter_queue(self, source: queue.Queue, waits: List[float]) -> Iterator:
+        """Items of a queue until the end marker, recording the time spent waiting in `waits`."""
+        while True:
+            start = time.perf_counter()
+            while True:
+                if self._cancelled.is_set():
+                    raise PipelineCancelled()
+                try:
+                    item = source.get(timeout=_POLL_SECONDS)
+                    break
+                except queue.Empty:
+                    continue
+            waits[0] += time.perf_counter() - start
+            if item is _END:
+                return
+            yield item
+
+    def _run_stage(
+        self,
+        name: str,
+        items: Iterable,
+        output: Optional[queue.Queue],
+        input_waits: List[float],
+        results: List,
+    ):
+        """Feed the items of a stage to the next stage's queue (or to `results` for the last stage)."""
+        start = time.perf_counter()
+        output_wait = 0.0
+        iterator = iter(items)
+        try:
+            for item in iterator:
+                if output is None:
+                    results.append(item)
+                else:
+                    output_wait += self._put(output, item)
+            if output is not None:
+                output_wait += self._put(output, _END)
+        except BaseException as e:
+            self._fail(e)
+        finally:
+            close = getattr(iterator, "close", None)
+            if close is not None:
+                try:
+                    close()
+                except BaseException as e:
+                    self._fail(e)
+            self.busy_seconds[name] = time.perf_counter() - start - output_wait - input_waits[0]
+
+    def run(self, source_name: str, source: Iterable, stages: Sequence[Tuple[str, StageFunction]]) -> List:
+        """Run the pipeline to completion and return the items yielded by the last stage."""
+        names = [source_name] + [name for name, _ in stages]
+        queues = [queue.Queue(maxsize=self.queue_size) for _ in names]
+        waits = {name: [0.0] for name in names}
+        results: List = []
+
+        threads = [
+            threading.Thread(
+                target=self._run_stage,
+                args=(source_name, source, queues[0], waits[source_name], results),
+                name=f"stream_{source_name}",
+                daemon=True,
+            )
+        ]
+        for index, (name, function) in enumerate(stages):
+            output = queues[index + 1] if index + 1 < len(stages) else None
+            items = function(self._iter_queue(queues[index], waits[name]))
+            threads.append(
+                threading.Thread(
+                    target=self._run_stage,
+                    args=(name, items, output, waits[name], results),
+                    name=f"stream_{name}",
+                    daemon=True,
+                )
+            )
+
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        if self._errors:
+            raise self._errors[0]
+        if self._cancelled.is_set():
+            raise PipelineCancelled()
+        return results
@@ -0,0 +1,138 @@
+"""BigQuery cost report: the most expensive dbt models and CDC batches.
+
+Reads the `bigquery_*` job statistics recorded in the Dagster event log over a time
+window (observations of the dbt models, metadata of the `*_temp_table` load steps)
+and ranks them. Models are summed over their builds in the window, with their latest
+dry-run estimate when there is one; each CDC batch load is ranked on its own. Needs
+DAGSTER_HOME pointing at the instance that ran the jobs:
+
+    python -m credix_pipeline_benchmarks.bigquery_costs --hours 168 --top 10
+"""
+import argparse
+import json
+import sys
+import time
+from typing import Dict, List
+
+SORT_KEYS = ["bytes_billed", "slot_ms", "bytes_processed"]
+
+# Event records fetched per page
+FETCH_LIMIT = 1000
+
+
+def fetch_cost_entries(instance, since: float) -> List[dict]:
+    """One entry per asset event with BigQuery statistics since the `since` timestamp."""
+    from dagster import AssetRecordsFilter
+
+    entries = []
+    for asset_key in instance.get_asset_keys():
+        for fetch, is_observation in [(instance.fetch_observations, True), (instance.fetch_materializations, False)]:
+            cursor = None
+            while True:
+                result = fetch(
+                    AssetRecordsFilter(asset_key=asset_key, after_timestamp=float(since)), limit=FETCH_LIMIT, cursor=cursor
+                )
+                for record in result.records:
+                    metadata = {key: value.value for key, value in record.asset_event.metadata.items()}
+                    if "bigquery_jobs" not in metadata and "bigquery_estimated_bytes" not in metadata:
+                        continue
+                    entries.append(
+                        {
+                            "asset": asset_key.to_user_string(),
+                            "run_id": record.run_id,
+                            "timestamp": record.timestamp,
+                            "is_observation": is_observation,
+                            **metadata,
+                        }
+                    )
+                if not result.has_more:
+                    break
+                cursor = result.cursor
+    return sorted(entries, key=lambda entry: entry["timestamp"])
+
+
+def rank_models(entries: List[dict], sort_by: str) -> List[dict]:
+    """dbt model statistics summed per model, with the latest dry-run estimate."""
+    models: Dict[str, dict] = {}
+    for entry in entries:
+        if not entry["is_observation"]:
+            continue
+        model = models.setdefault(
+            entry["asset"],
+            {"name": entry["asset"], "builds": 0, "bytes_processed": 0, "bytes_billed": 0, "slot_ms": 0, "cache_hits": 0, "estimated_bytes": None},
+        )
+        if "bigquery_estimated_bytes" in entry:
+            model["estimated_bytes"] = entry["bigquery_estimated_bytes"]
+            continue
+        model["builds"] += 1
+        for key in ["bytes_processed", "bytes_billed", "slot_ms", "cache_hits"]:
+            model[key] += entry.get(f"bigquery_{key}", 0)
+    return sorted(models.values(), key=lambda model: model[sort_by], reverse=True)
+
+
+def rank_batches(entries: List[dict], sort_by: str) -> List[dict]:
+    """Statistics of each CDC batch load (the load jobs of one `*_temp_table` step)."""
+    batches = [
+        {
+            "name": f"{entry['asset']}:{entry.get('temp_table_name', entry['run_id'])}",
+            "bytes_processed": entry.get("bigquery_bytes_processed", 0),
+            "bytes_billed": entry.get("bigquery_bytes_billed", 0),
+            "slot_ms": entry.get("bigquery_slot_ms", 0),
+            "queue_seconds": entry.get("bigquery_queue_seconds", 0.0),
+            "jobs": entry.get("bigquery_jobs", 0),
+        }
+        for entry in entries
+        if not entry["is_observation"] and "bigquery_jobs" in entry
+    ]
+    return sorted(batches, key=lambda batch: batch[sort_by], reverse=True)
+
+
+def format_bytes(num_bytes) -> str:
+    """Human-readable size (MiB)."""
+    return "-" if num_bytes is None else f"{num_bytes / 1024 ** 2:,.1f} MiB"
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--hours", type=float, default=24 * 7, help="Time window to report on")
+    parser.add_argument("--top", type=int, default=10)
+    parser.add_argument("--sort-by", choices=SORT_KEYS, default="bytes_billed")
+    parser.add_argument("--output", help="Optional path to write the rankings as JSON")
+    args = parser.parse_args()
+
+    from dagster import DagsterInstance
+
+    from credix_pipeline.utils.bigquery_stats import estimated_cost_usd
+
+    entries = fetch_cost_entries(DagsterInstance.get(), time.time() - args.hours * 3600)
+    if not entries:
+        print(f"No BigQuery statistics recorded in the last {args.hours:g} hours", file=sys.stderr)
+        return 1
+    models = rank_models(entries, args.sort_by)[: args.top]
+    batches = rank_batches(entries, args.sort_by)[: args.top]
+
+    print(f"Most expensive dbt models (last {args.hours:g} hours, by {args.sort_by})")
+    print(f"{'model':<40} {'builds':>6} {'processed':>14} {'billed':>14} {'cost':>9} {'slot s':>9} {'cache':>5} {'estimate':>14}")
+    for model in models:
+        print(
+            f"{model['name']:<40} {model['builds']:>6} {format_bytes(model['bytes_processed']):>14} "
+            f"{format_bytes(model['bytes_billed']):>14} {estimated_cost_usd(model['bytes_billed']):>8.3f}$ "
+            f"{model['slot_ms'] / 1000:>9.1f} {model['cache_hits']:>5} {format_bytes(model['estimated_bytes']):>14}"
+        )
+    print()
+    print(f"Most expensive CDC batch loads (by {args.sort_by})")
+    print(f"{'batch':<60} {'jobs':>4} {'processed':>14} {'billed':>14} {'slot s':>9} {'queue s':>8}")
+    for batch in batches:
+        print(
+            f"{batch['name']:<60} {batch['jobs']:>4} {format_bytes(batch['bytes_processed']):>14} "
+            f"{format_bytes(batch['bytes_billed']):>14} {batch['slot_ms'] / 1000:>9.1f} {batch['queue_seconds']:>8.1f}"
+        )
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump({"models": models, "batches": batches}, f, indent=2)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
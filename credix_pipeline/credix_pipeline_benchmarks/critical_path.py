@@ -0,0 +1,71 @@
+"""Critical-path timing report for a finished Dagster run.
+
+Combines the run's execution plan (step dependencies) with its step timings and prints
+the chain of steps that determined the run's duration, next to the wall-clock time and
+the summed step time (how much the run was parallelized). Needs DAGSTER_HOME pointing
+at the instance that executed the run:
+
+    python -m credix_pipeline_benchmarks.critical_path <run_id>
+"""
+import argparse
+import sys
+from typing import Dict, List, Tuple
+
+
+def critical_path(step_deps: Dict[str, List[str]], step_times: Dict[str, Tuple[float, float]]) -> List[str]:
+    """Walk back from the last step to finish, always through the upstream step that finished last."""
+    step_key = max(step_times, key=lambda key: step_times[key][1])
+    path = [step_key]
+    while True:
+        upstream = [dep for dep in step_deps.get(step_key, []) if dep in step_times]
+        if not upstream:
+            break
+        step_key = max(upstream, key=lambda key: step_times[key][1])
+        path.append(step_key)
+    return list(reversed(path))
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("run_id")
+    args = parser.parse_args()
+
+    from dagster import DagsterInstance
+
+    instance = DagsterInstance.get()
+    run = instance.get_run_by_id(args.run_id)
+    if run is None:
+        print(f"Run {args.run_id} not found", file=sys.stderr)
+        return 1
+
+    plan = instance.get_execution_plan_snapshot(run.execution_plan_snapshot_id)
+    step_deps = {
+        step.key: sorted({handle.step_key for step_input in step.inputs for handle in step_input.upstream_output_handles})
+        for step in plan.steps
+    }
+    step_times = {
+        stats.step_key: (stats.start_time, stats.end_time)
+        for stats in instance.get_run_step_stats(args.run_id)
+        if stats.start_time and stats.end_time
+    }
+    if not step_times:
+        print(f"Run {args.run_id} has no finished steps", file=sys.stderr)
+        return 1
+
+    path = critical_path(step_deps, step_times)
+    run_start = min(start for start, _ in step_times.values())
+    run_end = max(end for _, end in step_times.values())
+
+    print(f"Run {run.run_id} ({run.job_name})")
+    print(f"{'step':<40} {'start':>8} {'duration':>9}")
+    for step_key in path:
+        start, end = step_times[step_key]
+        print(f"{step_key:<40} {start - run_start:>7.1f}s {end - start:>8.1f}s")
+    print(f"critical path: {sum(step_times[key][1] - step_times[key][0] for key in path):.1f}s")
+    print(f"wall clock:    {run_end - run_start:.1f}s")
+    print(f"summed steps:  {sum(end - start for start, end in step_times.values()):.1f}s")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
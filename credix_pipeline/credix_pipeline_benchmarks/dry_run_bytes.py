@@ -0,0 +1,64 @@
+"""BigQuery dry-run bytes-processed report for the compiled dbt models.
+
+Dry-runs the SELECT of every compiled model (`dbt compile` output) and reports the
+bytes each one would scan, optionally against a previous report. Run it from
+`credix_pipeline/` before and after a change to the physical layout:
+
+    dbt compile --project-dir ../dbt/business_case --profiles-dir ../dbt
+    python -m credix_pipeline_benchmarks.dry_run_bytes --output before.json
+    # ... apply the change, full-refresh the models, compile again ...
+    python -m credix_pipeline_benchmarks.dry_run_bytes --output after.json --compare before.json
+"""
+import argparse
+import json
+import os
+import sys
+from pathlib import Path
+from typing import Dict
+
+DEFAULT_COMPILED_DIR = Path(__file__).resolve().parents[2] / "dbt" / "business_case" / "target" / "compiled" / "business_case" / "models"
+
+
+def dry_run_bytes(compiled_dir: Path, project_id: str) -> Dict[str, int]:
+    """Dry-run each compiled model and return the bytes processed per model name."""
+    from credix_pipeline.resources import GCPResource
+
+    gcp = GCPResource(project_id=project_id)
+    return {sql_path.stem: gcp.dry_run_query(sql_path.read_text()) for sql_path in sorted(compiled_dir.rglob("*.sql"))}
+
+
+def format_bytes(num_bytes: int) -> str:
+    """Human-readable size (MiB)."""
+    return f"{num_bytes / 1024 ** 2:,.1f} MiB"
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--compiled-dir", type=Path, default=DEFAULT_COMPILED_DIR)
+    parser.add_argument("--project-id", default=os.getenv("GCP_PROJECT", "product-reliability-analyzer"))
+    parser.add_argument("--output", help="Optional path to write the report as JSON")
+    parser.add_argument("--compare", help="Previous JSON report to compare against")
+    args = parser.parse_args()
+
+    report = dry_run_bytes(args.compiled_dir, args.project_id)
+    baseline = {}
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = json.load(f)
+
+    for model, num_bytes in report.items():
+        line = f"{model:<40} {format_bytes(num_bytes):>16}"
+        if model in baseline:
+            before = baseline[model]
+            change = (num_bytes - before) / before * 100 if before else 0.0
+            line += f"   before {format_bytes(before):>16} ({change:+.1f}%)"
+        print(line)
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(report, f, indent=2)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,80 @@
+"""Import-time benchmark for the credix_pipeline code location.
+
+Runs `python -X importtime -c "import credix_pipeline.definitions"` in a fresh
+interpreter and fails (exit code 1) if a heavy dependency is imported eagerly or
+the total import time exceeds the budget. Run it from `credix_pipeline/`:
+
+    python -m credix_pipeline_benchmarks.import_time --max-seconds 5
+"""
+import argparse
+import json
+import subprocess
+import sys
+from typing import Dict
+
+# Heavy dependencies that must only be imported at the point of use
+LAZY_MODULES = [
+    "pandas",
+    "pyarrow",
+    "pyarrow.parquet",
+    "google.cloud.storage",
+    "google.cloud.bigquery",
+    "sqlalchemy",
+    "psycopg2",
+]
+
+
+def measure_import_times(module: str = "credix_pipeline.definitions") -> Dict[str, int]:
+    """Import `module` in a fresh interpreter and return cumulative import time (us) per module."""
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    import_times = {}
+    for line in result.stderr.splitlines():
+        # Format: "import time: <self us> | <cumulative us> | <indented module name>"
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        _, cumulative, name = line[len("import time:"):].split("|")
+        import_times[name.strip()] = int(cumulative)
+    return import_times
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--module", default="credix_pipeline.definitions")
+    parser.add_argument("--max-seconds", type=float, default=10.0, help="Budget for the total import time")
+    parser.add_argument("--output", help="Optional path to write the results as JSON")
+    args = parser.parse_args()
+
+    import_times = measure_import_times(args.module)
+    total_seconds = import_times.get(args.module, 0) / 1e6
+    eager_modules = [name for name in LAZY_MODULES if name in import_times]
+    slowest = sorted(import_times.items(), key=lambda item: item[1], reverse=True)[:15]
+
+    report = {
+        "module": args.module,
+        "total_seconds": round(total_seconds, 3),
+        "max_seconds": args.max_seconds,
+        "eager_heavy_modules": eager_modules,
+        "slowest_imports_us": dict(slowest),
+    }
+    print(json.dumps(report, indent=2))
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(report, f, indent=2)
+
+    failed = False
+    if eager_modules:
+        print(f"FAIL: heavy modules imported eagerly: {', '.join(eager_modules)}", file=sys.stderr)
+        failed = True
+    if total_seconds > args.max_seconds:
+        print(f"FAIL: import took {total_seconds:.2f}s (budget {args.max_seconds:.2f}s)", file=sys.stderr)
+        failed = True
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,281 @@
+"""End-to-end stage benchmark of the ingestion path on synthetic data.
+
+Generates (or reuses) a synthetic dataset with `synthetic_data`, then times each stage
+of the CNPJ and installments ingestion on a single box:
+
+- postgres_load: COPY of the whole table into the local docker Postgres (`oltp` schema)
+- cdc_extract: the CDC query of the table's registry entry (`assets/cdc_tables.py`), with the
+  checkpoint `--cdc-hours` before the end of the dataset (a typical incremental run)
+- prepare: `prepare_dataframe_for_bigquery` with the registry's type hints
+- parquet_encode: Arrow conversion and Parquet encoding
+- gcs_upload: upload to a fake GCS (fake-gcs-server through `STORAGE_EMULATOR_HOST`)
+- streamed: extract to upload again, with the stages overlapping (`stream_table`, the
+  streaming mode of the extraction step), to compare against the sum of the stages above
+
+Results are written as JSON (with the git commit) and can be compared with a previous
+run. Run it from `credix_pipeline/`:
+
+    docker compose up -d postgres
+    docker compose --profile benchmark up -d fake_gcs
+    export STORAGE_EMULATOR_HOST=http://localhost:4443
+    python -m credix_pipeline_benchmarks.pipeline_stages --installments-rows 10000000 --output before.json
+    # ... apply the change ...
+    python -m credix_pipeline_benchmarks.pipeline_stages --installments-rows 10000000 --skip-load --output after.json --compare before.json
+"""
+import argparse
+import io
+import json
+import os
+import subprocess
+import sys
+import time
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import Callable, Dict
+
+import pyarrow.csv as pacsv
+import pyarrow.parquet as pq
+
+from credix_pipeline_benchmarks.synthetic_data import (
+    CNPJ_TABLE,
+    DEFAULT_END,
+    INSTALLMENTS_TABLE,
+    generate_dataset,
+)
+
+BENCHMARK_BUCKET = "data_lake_credix_benchmark"
+
+POSTGRES_DDL = {
+    CNPJ_TABLE: """
+        share_capital DOUBLE PRECISION,
+        company_size TEXT,
+        legal_nature TEXT,
+        simples_option BOOLEAN,
+        is_mei BOOLEAN,
+        is_main_company BOOLEAN,
+        company_status TEXT,
+        is_active BOOLEAN,
+        zipcode TEXT,
+        main_cnae TEXT,
+        state TEXT,
+        uf TEXT,
+        city TEXT,
+        buyer_tax_id TEXT,
+        created_at TIMESTAMP,
+        updated_at TIMESTAMP
+    """,
+    INSTALLMENTS_TABLE: """
+        asset_id TEXT,
+        invoice_id TEXT,
+        buyer_tax_id TEXT,
+        original_amount_in_cents BIGINT,
+        expected_amount_in_cents BIGINT,
+        paid_amount_in_cents BIGINT,
+        due_date TIMESTAMP,
+        paid_date TIMESTAMP,
+        invoice_issue_date TIMESTAMP,
+        buyer_main_tax_id TEXT
+    """,
+}
+
+# Registry entry (`CdcTable`) name of each synthetic table
+PIPELINES = {
+    CNPJ_TABLE: "CNPJ_WS",
+    INSTALLMENTS_TABLE: "INSTALLMENTS",
+}
+
+
+def timed(stage: Callable, rows: Callable = len) -> Dict:
+    """Run a stage and return its result with the elapsed time and throughput."""
+    start = time.perf_counter()
+    result = stage()
+    seconds = time.perf_counter() - start
+    num_rows = rows(result)
+    return {
+        "result": result,
+        "seconds": round(seconds, 3),
+        "rows": num_rows,
+        "rows_per_second": round(num_rows / seconds) if seconds else None,
+    }
+
+
+def get_postgres():
+    from credix_pipeline.resources import PostgresResource
+
+    return PostgresResource(
+        host=os.getenv("POSTGRES_HOST", "localhost"),
+        port=int(os.getenv("POSTGRES_PORT", "5432")),
+        database=os.getenv("POSTGRES_DB", "credix_transactions"),
+        user=os.getenv("POSTGRES_USER", "postgres"),
+        password=os.getenv("POSTGRES_PASSWORD", "postgres123"),
+    )
+
+
+def load_postgres(postgres, table: str, parquet_path: Path) -> int:
+    """(Re)create `oltp.<table>` and COPY the Parquet file into it, one row group at a time."""
+    connection = postgres.get_connection()
+    num_rows = 0
+    try:
+        with connection.cursor() as cursor:
+            cursor.execute("CREATE SCHEMA IF NOT EXISTS oltp")
+            cursor.execute(f"DROP TABLE IF EXISTS oltp.{table}")
+            cursor.execute(f"CREATE TABLE oltp.{table} ({POSTGRES_DDL[table]})")
+            parquet_file = pq.ParquetFile(parquet_path)
+            columns = ", ".join(parquet_file.schema_arrow.names)
+            for batch in parquet_file.iter_batches():
+                buffer = io.BytesIO()
+                pacsv.write_csv(batch, buffer, pacsv.WriteOptions(include_header=False))
+                buffer.seek(0)
+                cursor.copy_expert(f"COPY oltp.{table} ({columns}) FROM STDIN WITH (FORMAT csv)", buffer)
+                num_rows += batch.num_rows
+            cursor.execute(f"ANALYZE oltp.{table}")
+        connection.commit()
+    finally:
+        connection.close()
+    return num_rows
+
+
+def get_cdc_table(table: str):
+    from credix_pipeline.assets import cdc_tables
+
+    return getattr(cdc_tables, PIPELINES[table])
+
+
+def upload_fake_gcs(table: str, parquet_bytes: bytes) -> str:
+    """Upload the batch to the fake GCS bucket (created on first use)."""
+    from credix_pipeline.resources import GCPResource
+    from credix_pipeline.utils.gcs_operations import generate_gcs_path
+
+    gcp = GCPResource()
+    client = gcp.get_storage_client()
+    if client.lookup_bucket(BENCHMARK_BUCKET) is None:
+        client.create_bucket(BENCHMARK_BUCKET)
+    blob_name, _, _ = generate_gcs_path(BENCHMARK_BUCKET, get_cdc_table(table).name)
+    return gcp.upload_to_gcs(BENCHMARK_BUCKET, blob_name, parquet_bytes)
+
+
+def stream_fake_gcs(postgres, table: str, watermark: str):
+    """Extract and land the batch on the fake GCS with the streaming pipeline."""
+    from credix_pipeline.assets.cdc_engine import BUCKET_NAME, stream_table
+    from credix_pipeline.resources import GCPResource
+
+    gcp = GCPResource()
+    client = gcp.get_storage_client()
+    for bucket_name in (BUCKET_NAME, f"{BUCKET_NAME}_archive"):
+        if client.lookup_bucket(bucket_name) is None:
+            client.create_bucket(bucket_name)
+    return stream_table(get_cdc_table(table), postgres, gcp, watermark)
+
+
+def benchmark_table(postgres, table: str, parquet_path: Path, watermark: str, skip_load: bool, upload: bool) -> Dict:
+    """Time every stage of one table's ingestion path."""
+    from credix_pipeline.assets.cdc_engine import extract_table
+    from credix_pipeline.utils.data_processing import (
+        arrow_table_to_parquet_bytes,
+        dataframe_to_arrow_table,
+        prepare_dataframe_for_bigquery,
+    )
+
+    cdc_table = get_cdc_table(table)
+
+    stages = {}
+    if not skip_load:
+        stages["postgres_load"] = timed(lambda: load_postgres(postgres, table, parquet_path), rows=lambda n: n)
+    stages["cdc_extract"] = timed(lambda: extract_table(cdc_table, postgres, watermark)[0])
+    raw_data = stages["cdc_extract"]["result"]
+    stages["prepare"] = timed(
+        lambda: prepare_dataframe_for_bigquery(
+            raw_data, timestamp_columns=list(cdc_table.timestamp_columns), date_columns=list(cdc_table.date_columns)
+        )
+    )
+    df_processed = stages["prepare"]["result"]
+    stages["parquet_encode"] = timed(
+        lambda: arrow_table_to_parquet_bytes(dataframe_to_arrow_table(df_processed)), rows=lambda _: len(df_processed)
+    )
+    parquet_bytes = stages["parquet_encode"]["result"]
+    stages["parquet_encode"]["bytes"] = len(parquet_bytes)
+    if upload:
+        stages["gcs_upload"] = timed(lambda: upload_fake_gcs(table, parquet_bytes), rows=lambda _: len(df_processed))
+        stages["gcs_upload"]["bytes"] = len(parquet_bytes)
+        stages["streamed"] = timed(lambda: stream_fake_gcs(postgres, table, watermark), rows=lambda r: len(r.batch))
+        stages["streamed"]["bytes"] = stages["streamed"]["result"].bytes_written
+
+    for stage in stages.values():
+        stage.pop("result")
+    return stages
+
+
+def git_commit() -> str:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown"
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--installments-rows", type=int, default=1_000_000)
+    parser.add_argument("--cnpj-rows", type=int, help="Number of companies (default: installments rows / 20)")
+    parser.add_argument("--data-dir", type=Path, default=Path("benchmark_data"), help="Reused if the files exist")
+    parser.add_argument("--end", default=DEFAULT_END, help="End (the 'now') of the synthetic dataset")
+    parser.add_argument("--cdc-hours", type=float, default=24, help="CDC window before --end extracted by the run")
+    parser.add_argument("--skip-load", action="store_true", help="Reuse the data already loaded into Postgres")
+    parser.add_argument("--output", help="Optional path to write the results as JSON")
+    parser.add_argument("--compare", help="Previous JSON results to compare against")
+    args = parser.parse_args()
+
+    parquet_paths = {table: args.data_dir / f"{table}.parquet" for table in PIPELINES}
+    if all(path.exists() for path in parquet_paths.values()):
+        generation = None
+    else:
+        generation = timed(
+            lambda: generate_dataset(args.data_dir, args.installments_rows, args.cnpj_rows, end=args.end),
+            rows=lambda paths: sum(pq.ParquetFile(path).metadata.num_rows for path in paths.values()),
+        )
+        generation.pop("result")
+
+    watermark = str(datetime.fromisoformat(args.end) - timedelta(hours=args.cdc_hours))
+    upload = bool(os.getenv("STORAGE_EMULATOR_HOST"))
+    if not upload:
+        print("STORAGE_EMULATOR_HOST is not set, skipping the gcs_upload stage", file=sys.stderr)
+
+    postgres = get_postgres()
+    results = {
+        "git_commit": git_commit(),
+        "created_at": datetime.now().isoformat(timespec="seconds"),
+        "params": {
+            "installments_rows": pq.ParquetFile(parquet_paths[INSTALLMENTS_TABLE]).metadata.num_rows,
+            "cnpj_rows": pq.ParquetFile(parquet_paths[CNPJ_TABLE]).metadata.num_rows,
+            "cdc_watermark": watermark,
+        },
+        "generation": generation,
+        "stages": {
+            f"{get_cdc_table(table).name}.{stage}": stats
+            for table, path in parquet_paths.items()
+            for stage, stats in benchmark_table(postgres, table, path, watermark, args.skip_load, upload).items()
+        },
+    }
+
+    baseline = {}
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = json.load(f)["stages"]
+
+    for stage, stats in results["stages"].items():
+        line = f"{stage:<32} {stats['seconds']:>9.3f}s {stats['rows']:>12,} rows {stats['rows_per_second'] or 0:>12,} rows/s"
+        if stage in baseline:
+            before = baseline[stage]["seconds"]
+            change = (stats["seconds"] - before) / before * 100 if before else 0.0
+            line += f"   before {before:>9.3f}s ({change:+.1f}%)"
+        print(line)
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(results, f, indent=2)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,290 @@
+"""Synthetic `business_case_cnpj_ws` / `business_case_installments` data generator.
+
+Generates both source tables at any scale (1M to 100M+ installments) in fixed-size
+chunks, so memory stays bounded, and writes them as Parquet files named after the
+Postgres tables (the layout `docker/data-loader/parquet_to_postgres.py` expects).
+Buyers are drawn from a Zipf distribution, so a few companies own most installments,
+like in the real portfolio. A small share of rows breaks the data-quality rules.
+Output is deterministic for a given seed. Run it from `credix_pipeline/`:
+
+    python -m credix_pipeline_benchmarks.synthetic_data --installments-rows 10000000 --output-dir ../data
+
+With `--bronze-dir`, the tables are also written as dbt bronze sources (one directory per
+`oltp_*` table, with `_loaded_at`) for the `local` DuckDB target of the dbt project.
+"""
+import argparse
+import sys
+from datetime import datetime
+from pathlib import Path
+from typing import Iterator, Optional
+
+import numpy as np
+import pyarrow as pa
+import pyarrow.compute as pc
+import pyarrow.parquet as pq
+
+CNPJ_TABLE = "business_case_cnpj_ws"
+INSTALLMENTS_TABLE = "business_case_installments"
+
+DEFAULT_CHUNK_ROWS = 1_000_000
+DEFAULT_START = "2022-01-01"
+DEFAULT_END = "2025-01-01"
+
+# Zipf exponent of the installments-per-buyer distribution (lower = more skewed)
+BUYER_SKEW = 1.2
+# Invoices are split into monthly installments
+INSTALLMENTS_PER_INVOICE = 12
+# Share of rows violating a data-quality rule (negative amounts, bad zipcodes, ...)
+INVALID_ROW_RATE = 0.001
+
+COMPANY_SIZES = (["MICRO", "SMALL", "MEDIUM", "LARGE"], [0.55, 0.3, 0.1, 0.05])
+COMPANY_STATUSES = (["Ativa", "Baixada", "Suspensa", "Inapta"], [0.85, 0.08, 0.04, 0.03])
+LEGAL_NATURES = (
+    ["Sociedade Empresária Limitada", "Empresário (Individual)", "Sociedade Anônima Fechada", "Empresa Individual de Responsabilidade Limitada"],
+    [0.6, 0.25, 0.1, 0.05],
+)
+LOCATIONS = (
+    [("SP", "SÃO PAULO", "SAO PAULO"), ("RJ", "RIO DE JANEIRO", "RIO DE JANEIRO"), ("MG", "MINAS GERAIS", "BELO HORIZONTE"),
+     ("PR", "PARANÁ", "CURITIBA"), ("RS", "RIO GRANDE DO SUL", "PORTO ALEGRE"), ("SC", "SANTA CATARINA", "FLORIANOPOLIS"),
+     ("BA", "BAHIA", "SALVADOR"), ("GO", "GOIÁS", "GOIANIA")],
+    [0.35, 0.15, 0.12, 0.1, 0.1, 0.08, 0.05, 0.05],
+)
+
+
+def _rng(seed: int, chunk_index: int) -> np.random.Generator:
+    """Independent random stream per chunk, so any chunk can be regenerated on its own."""
+    return np.random.default_rng([seed, chunk_index])
+
+
+def _choice(rng: np.random.Generator, values_and_probs, size: int) -> np.ndarray:
+    values, probs = values_and_probs
+    return np.asarray(values, dtype=object)[rng.choice(len(values), size=size, p=probs)]
+
+
+def _digits(values: np.ndarray, width: int) -> pa.Array:
+    """Zero-padded digit strings (tax IDs, zipcodes, CNAE codes)."""
+    return pc.utf8_lpad(pc.cast(pa.array(values), pa.string()), width, "0")
+
+
+def _timestamps(seconds: np.ndarray) -> pa.Array:
+    return pa.array(seconds.astype("datetime64[s]").astype("datetime64[us]"))
+
+
+def _epoch_seconds(value: str) -> int:
+    return int(datetime.fromisoformat(value).timestamp())
+
+
+def tax_id_for(company_index: np.ndarray) -> pa.Array:
+    """CNPJ (14 digits) of the company with the given index."""
+    return _digits(company_index + 10_000_000_000_000, 14)
+
+
+def generate_cnpj_chunks(
+    num_rows: int,
+    chunk_rows: int = DEFAULT_CHUNK_ROWS,
+    seed: int = 42,
+    start: str = DEFAULT_START,
+    end: str = DEFAULT_END,
+) -> Iterator[pa.Table]:
+    """Yield the `business_case_cnpj_ws` table in chunks (one row per company)."""
+    start_s, end_s = _epoch_seconds(start), _epoch_seconds(end)
+    for chunk_index, offset in enumerate(range(0, num_rows, chunk_rows)):
+        size = min(chunk_rows, num_rows - offset)
+        rng = _rng(seed, chunk_index)
+
+        share_capital = np.round(rng.lognormal(11, 2, size), 2)
+        company_size = _choice(rng, COMPANY_SIZES, size)
+        company_status = _choice(rng, COMPANY_STATUSES, size)
+        location = _choice(rng, (list(range(len(LOCATIONS[0]))), LOCATIONS[1]), size).astype(int)
+        uf, state, city = (np.asarray([loc[i] for loc in LOCATIONS[0]], dtype=object)[location] for i in range(3))
+        zipcode = _digits(rng.integers(1_000_000, 99_999_999, size), 8)
+        created_at = rng.integers(start_s - 5 * 365 * 86400, end_s, size)
+        updated_at = np.minimum(created_at + rng.exponential(180 * 86400, size).astype(np.int64), end_s)
+
+        # A small share of companies fails the data-quality rules
+        invalid = rng.random(size) < INVALID_ROW_RATE
+        share_capital[invalid & (rng.random(size) < 0.5)] *= -1
+        zipcode = pc.if_else(pa.array(invalid & (rng.random(size) < 0.5)), pc.utf8_slice_codeunits(zipcode, 0, 5), zipcode)
+        main_cnae = pc.if_else(
+            pa.array(invalid & (rng.random(size) < 0.5)),
+            pa.scalar(None, pa.string()),
+            _digits(rng.integers(111_301, 9_900_000, size), 7),
+        )
+
+        yield pa.table({
+            "share_capital": share_capital,
+            "company_size": company_size,
+            "legal_nature": _choice(rng, LEGAL_NATURES, size),
+            "simples_option": rng.random(size) < 0.6,
+            "is_mei": (company_size == "MICRO") & (rng.random(size) < 0.5),
+            "is_main_company": rng.random(size) < 0.9,
+            "company_status": company_status,
+            "is_active": company_status == "Ativa",
+            "zipcode": zipcode,
+            "main_cnae": main_cnae,
+            "state": state,
+            "uf": uf,
+            "city": city,
+            "buyer_tax_id": tax_id_for(np.arange(offset, offset + size)),
+            "created_at": _timestamps(created_at),
+            "updated_at": _timestamps(updated_at),
+        })
+
+
+def generate_installments_chunks(
+    num_rows: int,
+    num_companies: int,
+    chunk_rows: int = DEFAULT_CHUNK_ROWS,
+    seed: int = 42,
+    start: str = DEFAULT_START,
+    end: str = DEFAULT_END,
+) -> Iterator[pa.Table]:
+    """Yield the `business_case_installments` table in chunks.
+
+    Buyers are Zipf-distributed over the `num_companies` CNPJ rows; the heaviest
+    buyers are spread over the tax ID range by a fixed permutation.
+    """
+    start_s, end_s = _epoch_seconds(start), _epoch_seconds(end)
+    buyer_order = np.random.default_rng(seed).permutation(num_companies)
+    # Keep the installments of an invoice in the same chunk
+    chunk_rows = -(-chunk_rows // INSTALLMENTS_PER_INVOICE) * INSTALLMENTS_PER_INVOICE
+    for chunk_index, offset in enumerate(range(0, num_rows, chunk_rows)):
+        size = min(chunk_rows, num_rows - offset)
+        rng = _rng(seed, 1_000_000 + chunk_index)
+
+        # Buyer and issue date are drawn per invoice, then repeated for each of its installments
+        row_index = np.arange(offset, offset + size)
+        invoice_index = row_index // INSTALLMENTS_PER_INVOICE
+        invoice = invoice_index - invoice_index[0]
+        num_invoices = invoice[-1] + 1
+        invoice_buyer = buyer_order[(rng.zipf(BUYER_SKEW, num_invoices) - 1) % num_companies]
+        # ~10% of buyers are branches of another (main) company
+        invoice_main_buyer = np.where(
+            rng.random(num_invoices) < 0.1, buyer_order[rng.integers(0, num_companies, num_invoices)], invoice_buyer
+        )
+        buyer, main_buyer = invoice_buyer[invoice], invoice_main_buyer[invoice]
+        invoice_issue = rng.integers(start_s, end_s, num_invoices)[invoice]
+
+        installment_number = row_index % INSTALLMENTS_PER_INVOICE
+        due = invoice_issue + (installment_number + 1) * 30 * 86400
+        paid_offset = rng.normal(2, 12, size).astype(np.int64) * 86400
+        paid = np.maximum(due + paid_offset, invoice_issue)
+        is_paid = (rng.random(size) < 0.75) & (paid <= end_s)
+
+        expected = rng.lognormal(11, 1.2, size).astype(np.int64)
+        original = np.where(rng.random(size) < 0.1, (expected * rng.uniform(1.0, 1.2, size)).astype(np.int64), expected)
+        paid_amount = np.where(rng.random(size) < 0.9, expected, (expected * rng.uniform(0.5, 1.1, size)).astype(np.int64))
+
+        # A small share of installments fails the data-quality rules
+        invalid = rng.random(size) < INVALID_ROW_RATE
+        expected[invalid] *= -1
+
+        yield pa.table({
+            "asset_id": pc.binary_join_element_wise("A", _digits(row_index, 12), ""),
+            "invoice_id": pc.binary_join_element_wise("INV", _digits(invoice_index, 11), ""),
+            "buyer_tax_id": tax_id_for(buyer),
+            "original_amount_in_cents": original,
+            "expected_amount_in_cents": expected,
+            "paid_amount_in_cents": pa.array(paid_amount, mask=~is_paid),
+            "due_date": _timestamps(due),
+            "paid_date": pa.array(paid.astype("datetime64[s]").astype("datetime64[us]"), mask=~is_paid),
+            "invoice_issue_date": _timestamps(invoice_issue),
+            "buyer_main_tax_id": tax_id_for(main_buyer),
+        })
+
+
+def write_parquet(chunks: Iterator[pa.Table], path: Path) -> int:
+    """Write the chunks to one Parquet file (one row group per chunk) and return the row count."""
+    writer: Optional[pq.ParquetWriter] = None
+    num_rows = 0
+    try:
+        for chunk in chunks:
+            if writer is None:
+                writer = pq.ParquetWriter(path, chunk.schema)
+            writer.write_table(chunk)
+            num_rows += chunk.num_rows
+    finally:
+        if writer is not None:
+            writer.close()
+    return num_rows
+
+
+def generate_dataset(
+    output_dir: Path,
+    installments_rows: int,
+    cnpj_rows: Optional[int] = None,
+    chunk_rows: int = DEFAULT_CHUNK_ROWS,
+    seed: int = 42,
+    start: str = DEFAULT_START,
+    end: str = DEFAULT_END,
+) -> dict:
+    """Write both tables to `output_dir` and return the Parquet path per table."""
+    cnpj_rows = cnpj_rows or max(installments_rows // 20, 1)
+    output_dir.mkdir(parents=True, exist_ok=True)
+    paths = {CNPJ_TABLE: output_dir / f"{CNPJ_TABLE}.parquet", INSTALLMENTS_TABLE: output_dir / f"{INSTALLMENTS_TABLE}.parquet"}
+    write_parquet(generate_cnpj_chunks(cnpj_rows, chunk_rows, seed, start, end), paths[CNPJ_TABLE])
+    write_parquet(
+        generate_installments_chunks(installments_rows, cnpj_rows, chunk_rows, seed, start, end), paths[INSTALLMENTS_TABLE]
+    )
+    return paths
+
+
+def cnpj_bronze_columns(table: pa.Table) -> pa.Table:
+    """Columns the silver/gold models expect on the bronze CNPJ table (standardized location, quality flag)."""
+    for column in ["state", "uf", "city"]:
+        table = table.append_column(f"standardized_{column}", pc.utf8_upper(pc.utf8_trim_whitespace(table[column])))
+    share_capital, zipcode = table["share_capital"], table["zipcode"]
+    invalid_capital = pc.fill_null(pc.less(share_capital, 0), True)
+    invalid_zipcode = pc.fill_null(pc.not_equal(pc.utf8_length(zipcode), 8), True)
+    data_quality_flag = pc.if_else(
+        invalid_capital, "INVALID_CAPITAL",
+        pc.if_else(invalid_zipcode, "INVALID_ZIPCODE", pc.if_else(pc.is_null(table["main_cnae"]), "MISSING_CNAE", "VALID")),
+    )
+    return table.append_column("data_quality_flag", data_quality_flag)
+
+
+def write_bronze(paths: dict, bronze_dir: Path, loaded_at: str) -> dict:
+    """Write the tables as dbt bronze sources: `<bronze_dir>/oltp_<table>/part-0.parquet` with `_loaded_at`."""
+    bronze_paths = {}
+    for table, path in paths.items():
+        bronze_path = bronze_dir / f"oltp_{table}" / "part-0.parquet"
+        bronze_path.parent.mkdir(parents=True, exist_ok=True)
+        loaded_at_value = pa.scalar(datetime.fromisoformat(loaded_at), pa.timestamp("us"))
+
+        def bronze_chunks():
+            for batch in pq.ParquetFile(path).iter_batches():
+                chunk = pa.Table.from_batches([batch])
+                if table == CNPJ_TABLE:
+                    chunk = cnpj_bronze_columns(chunk)
+                yield chunk.append_column("_loaded_at", pa.repeat(loaded_at_value, chunk.num_rows))
+
+        write_parquet(bronze_chunks(), bronze_path)
+        bronze_paths[table] = bronze_path
+    return bronze_paths
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--installments-rows", type=int, default=1_000_000)
+    parser.add_argument("--cnpj-rows", type=int, help="Number of companies (default: installments rows / 20)")
+    parser.add_argument("--chunk-rows", type=int, default=DEFAULT_CHUNK_ROWS)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--start", default=DEFAULT_START, help="First invoice issue date")
+    parser.add_argument("--end", default=DEFAULT_END, help="Last invoice issue date (the 'now' of the dataset)")
+    parser.add_argument("--output-dir", type=Path, default=Path("benchmark_data"))
+    parser.add_argument("--bronze-dir", type=Path, help="Also write the tables as dbt bronze sources here")
+    args = parser.parse_args()
+
+    paths = generate_dataset(
+        args.output_dir, args.installments_rows, args.cnpj_rows, args.chunk_rows, args.seed, args.start, args.end
+    )
+    for table, path in paths.items():
+        print(f"{table:<30} {pq.ParquetFile(path).metadata.num_rows:>14,} rows  {path}")
+    if args.bronze_dir:
+        for table, path in write_bronze(paths, args.bronze_dir, args.end).items():
+            print(f"{'oltp_' + table:<30} {pq.ParquetFile(path).metadata.num_rows:>14,} rows  {path}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,69 @@
+from pathlib import Path
+from typing import Callable, Iterator, Union
+
+import duckdb
+import pandas as pd
+import pytest
+
+from credix_pipeline.project import dbt_project
+from credix_pipeline.resources import PostgresResource
+from credix_pipeline.resources.local_gcp_resource import LocalGCPResource
+
+
+def pytest_configure(config):
+    """Parse the dbt project before collection when its manifest is missing (fresh checkout).
+
+    The asset modules load the manifest at import time; this runs the same `dbt deps` +
+    `dbt parse` as `dagster dev` (needs the adapter of the profile's target, not a connection).
+    """
+    if not dbt_project.manifest_path.exists():
+        dbt_project.preparer.prepare(dbt_project)
+
+
+class DuckDBPostgres(PostgresResource):
+    """PostgresResource serving the `oltp.<name>` tables from `<data_dir>/<name>.parquet` through DuckDB."""
+
+    data_dir: str = ""
+
+    def _connect(self) -> duckdb.DuckDBPyConnection:
+        connection = duckdb.connect()
+        connection.execute("CREATE SCHEMA oltp")
+        for path in Path(self.data_dir).glob("*.parquet"):
+            connection.execute(f"CREATE VIEW oltp.{path.stem} AS SELECT * FROM read_parquet('{path}')")
+        return connection
+
+    def execute_query(self, query: str) -> pd.DataFrame:
+        with self._connect() as connection:
+            return connection.execute(query).df()
+
+    def iter_query(self, query: str, chunk_rows: Union[int, Callable[[], int]]) -> Iterator[pd.DataFrame]:
+        next_rows = chunk_rows if callable(chunk_rows) else lambda: chunk_rows
+        with self._connect() as connection:
+            result = connection.execute(query)
+            columns = [column[0] for column in result.description]
+            empty = True
+            while True:
+                rows = result.fetchmany(next_rows())
+                if not rows:
+                    break
+                empty = False
+                yield pd.DataFrame.from_records(rows, columns=columns)
+            if empty:
+                yield pd.DataFrame(columns=columns)
+
+
+@pytest.fixture
+def oltp_dir(tmp_path) -> Path:
+    path = tmp_path / "oltp"
+    path.mkdir()
+    return path
+
+
+@pytest.fixture
+def postgres(oltp_dir) -> DuckDBPostgres:
+    return DuckDBPostgres(data_dir=str(oltp_dir))
+
+
+@pytest.fixture
+def gcp(tmp_path) -> LocalGCPResource:
+    return LocalGCPResource(root_dir=str(tmp_path / "gcp"))
@@ -0,0 +1,39 @@
+from datetime import date
+from pathlib import Path
+
+import jinja2
+
+DBT_PROJECT_DIR = Path(__file__).resolve().parents[2] / "dbt" / "business_case"
+
+
+def render(sql: str, as_of: date, this: str = "", now: str = "current_timestamp") -> str:
+    """Render dbt SQL for DuckDB, with CURRENT_DATE() pinned to `as_of` and the build time to `now`.
+
+    An incremental build is rendered when `this` (the model's existing table) is given.
+    """
+
+    class Dbt:
+        @staticmethod
+        def current_timestamp():
+            return now
+
+        @staticmethod
+        def type_string():
+            return "VARCHAR"
+
+    template = jinja2.Environment().from_string(sql)
+    return template.render(
+        config=lambda **kwargs: "",
+        target={"type": "duckdb"},
+        is_incremental=lambda: bool(this),
+        this=this,
+        source=lambda source_name, table_name: "bronze_installments",
+        ref=lambda model: model,
+        dbt=Dbt,
+        current_date=lambda: f"DATE '{as_of.isoformat()}'",
+        date_diff_days=lambda start_date, end_date: f"date_diff('day', {start_date}, {end_date})",
+    )
+
+
+def read_sql(relative_path: str) -> str:
+    return (DBT_PROJECT_DIR / relative_path).read_text()
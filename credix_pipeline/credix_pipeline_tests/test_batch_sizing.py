@@ -0,0 +1,37 @@
+from credix_pipeline.utils.batch_sizing import MAX_GROWTH, AdaptiveBatchSizer
+
+MB = 1024 ** 2
+
+
+def test_memory_ceiling_is_a_hard_limit():
+    """The batches held at once stay within the ceiling from the first measured batch on."""
+    sizer = AdaptiveBatchSizer(
+        initial_rows=100_000, min_rows=100, max_rows=1_000_000, memory_ceiling_bytes=10 * MB, batches_in_memory=4
+    )
+    sizer.observe(100_000, seconds=0.1, memory_bytes=100_000 * 1_000)
+
+    # Applied at once, not limited by the per-batch shrink bound
+    assert sizer.next_rows() * 1_000 * 4 <= 10 * MB
+
+    # Fast, small batches don't grow past it
+    for _ in range(20):
+        rows = sizer.next_rows()
+        sizer.observe(rows, seconds=0.001, memory_bytes=rows * 1_000)
+        assert sizer.next_rows() * 1_000 * 4 <= 10 * MB
+
+
+def test_memory_ceiling_follows_wider_rows():
+    sizer = AdaptiveBatchSizer(initial_rows=1_000, min_rows=10, memory_ceiling_bytes=10 * MB, smoothing=1.0)
+    sizer.observe(1_000, memory_bytes=1_000 * 100)
+    narrow_rows = sizer.next_rows()
+    sizer.observe(narrow_rows, memory_bytes=narrow_rows * 10_000)
+
+    assert sizer.next_rows() * 10_000 <= 10 * MB
+    assert sizer.next_rows() < narrow_rows
+
+
+def test_growth_is_bounded_per_batch():
+    sizer = AdaptiveBatchSizer(initial_rows=1_000, max_rows=1_000_000, target_output_bytes=128 * MB)
+    sizer.observe(1_000, seconds=0.01, output_bytes=1_000 * 10)
+
+    assert sizer.next_rows() == 1_000 * MAX_GROWTH
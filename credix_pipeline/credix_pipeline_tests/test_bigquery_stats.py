@@ -0,0 +1,46 @@
+from google.auth.credentials import AnonymousCredentials
+from google.cloud import bigquery
+
+from credix_pipeline.utils.bigquery_stats import BigQueryJobStats, job_stats, job_stats_from_resource
+
+# Builds job objects from resources offline
+CLIENT = bigquery.Client(project="project", credentials=AnonymousCredentials())
+
+
+def job_resource(job_id: str, statistics: dict) -> dict:
+    return {"jobReference": {"projectId": "project", "jobId": job_id, "location": "US"}, "statistics": statistics}
+
+
+def test_query_job_stats_match_its_resource():
+    resource = job_resource(
+        "query_1",
+        {
+            "creationTime": "1717243200000",
+            "startTime": "1717243201500",
+            "totalBytesProcessed": "2048",
+            "totalSlotMs": "350",
+            "query": {"totalBytesProcessed": "2048", "totalBytesBilled": "10485760", "totalSlotMs": "350", "cacheHit": False},
+        },
+    )
+    job = bigquery.QueryJob.from_api_repr(resource, client=CLIENT)
+
+    assert job_stats(job) == job_stats_from_resource(resource) == BigQueryJobStats(
+        job_id="query_1", bytes_processed=2048, bytes_billed=10485760, slot_ms=350, queue_seconds=1.5
+    )
+
+
+def test_load_job_stats_count_input_bytes_and_no_billing():
+    resource = job_resource(
+        "load_1",
+        {"creationTime": "1717243200000", "startTime": "1717243200250", "totalSlotMs": "90", "load": {"inputFileBytes": "4096"}},
+    )
+    resource["configuration"] = {"load": {"destinationTable": {"projectId": "project", "datasetId": "d", "tableId": "t"}}}
+    job = bigquery.LoadJob.from_api_repr(resource, client=CLIENT)
+
+    assert job_stats(job) == BigQueryJobStats(job_id="load_1", bytes_processed=4096, queue_seconds=0.25)
+
+
+def test_unreported_statistics_count_as_zero():
+    job = bigquery.QueryJob.from_api_repr(job_resource("query_2", {}), client=CLIENT)
+
+    assert job_stats(job) == BigQueryJobStats(job_id="query_2")
@@ -0,0 +1,139 @@
+from datetime import datetime, timedelta
+
+import pandas as pd
+import pytest
+from dagster import asset, materialize
+
+from credix_pipeline.assets.cdc_engine import BUCKET_NAME, CdcTable, build_cdc_table_assets, extract_table, stream_table
+from credix_pipeline.resources import MemoryBudgetResource
+from credix_pipeline.utils.batch_sizing import AdaptiveBatchSizer
+from credix_pipeline.utils.cdc_helpers import get_batch_boundary_key, get_batch_watermark
+from credix_pipeline.utils.data_quality import DataQualityRule
+
+ORDERS = CdcTable(
+    name="orders",
+    asset_prefix="orders",
+    group_name="orders_pipeline",
+    source_table="oltp.orders",
+    columns=["order_id", "amount_in_cents", "updated_at"],
+    key_columns=["order_id"],
+    watermark_columns=["updated_at"],
+    dbt_model="installments_clean",
+    timestamp_columns=["updated_at"],
+    quality_rules=[DataQualityRule("NEGATIVE_AMOUNT", "amount_in_cents", "non_negative", required=True)],
+)
+START = datetime(2024, 1, 1)
+
+
+def write_orders(oltp_dir, rows: int, distinct_timestamps: int) -> pd.DataFrame:
+    """`rows` orders spread over `distinct_timestamps` updated_at values (ties when fewer than rows)."""
+    orders = pd.DataFrame(
+        {
+            "order_id": [f"o{i:05d}" for i in range(rows)],
+            "amount_in_cents": [-1 if i % 100 == 0 else i for i in range(rows)],
+            "updated_at": [START + timedelta(minutes=i % distinct_timestamps) for i in range(rows)],
+        }
+    )
+    orders.to_parquet(oltp_dir / "orders.parquet")
+    return orders
+
+
+def bucket_files(gcp) -> list:
+    return sorted(uri for uri, _, _ in gcp.list_gcs_blobs(BUCKET_NAME, "business_case"))
+
+
+def small_chunks() -> AdaptiveBatchSizer:
+    return AdaptiveBatchSizer(initial_rows=100, min_rows=100, max_rows=100)
+
+
+def test_stream_lands_one_file_and_no_staging(oltp_dir, postgres, gcp):
+    write_orders(oltp_dir, 1_000, 1_000)
+
+    streamed = stream_table(ORDERS, postgres, gcp, "1900-01-01 00:00:00", small_chunks(), queue_size=2)
+
+    assert len(streamed.batch) == 1_000
+    assert streamed.landing["records_uploaded"] == 990
+    landed = [uri for uri in bucket_files(gcp) if "/landing/" in uri]
+    assert landed == [streamed.landing["gcs_uri"]]
+    assert [uri for uri in bucket_files(gcp) if "/staging/" in uri] == []
+
+
+class FailingPostgres:
+    """Wraps a postgres resource whose result stream breaks after `chunks` chunks."""
+
+    def __init__(self, postgres, chunks: int):
+        self.postgres, self.chunks = postgres, chunks
+
+    def iter_query(self, query, chunk_rows):
+        for i, df in enumerate(self.postgres.iter_query(query, chunk_rows)):
+            if i == self.chunks:
+                raise ConnectionError("server closed the connection unexpectedly")
+            yield df
+
+
+def test_extract_failure_leaves_no_landed_file(oltp_dir, postgres, gcp):
+    write_orders(oltp_dir, 1_000, 1_000)
+
+    with pytest.raises(ConnectionError):
+        stream_table(ORDERS, FailingPostgres(postgres, chunks=5), gcp, "1900-01-01 00:00:00", small_chunks(), queue_size=2)
+
+    # Neither a landing file nor a staged (or partial) upload is left behind
+    assert bucket_files(gcp) == []
+
+
+def test_transform_failure_leaves_no_landed_file(oltp_dir, postgres, gcp):
+    write_orders(oltp_dir, 1_000, 1_000)
+    broken = ORDERS._replace(quality_rules=[DataQualityRule("BROKEN", "amount_in_cents", "no_such_check")])
+
+    with pytest.raises(KeyError):
+        stream_table(broken, postgres, gcp, "1900-01-01 00:00:00", small_chunks(), queue_size=2)
+
+    assert bucket_files(gcp) == []
+
+
+def test_capped_extraction_splits_tie_groups_and_skips_no_rows(oltp_dir, postgres):
+    """250 rows share each watermark and the cap is 100: tie groups are split by key, and the runs cover every row once."""
+    orders = write_orders(oltp_dir, 1_000, 4)
+    watermark, boundary_key = "1900-01-01 00:00:00", None
+    extracted = []
+    for _ in range(3):
+        df, _ = extract_table(ORDERS, postgres, watermark, max_rows=100, last_processed_key=boundary_key)
+        assert len(df) == 100
+        extracted.extend(df["order_id"])
+        watermark = str(get_batch_watermark(df, ORDERS.watermark_columns))
+        boundary_key = get_batch_boundary_key(df, ORDERS.watermark_columns, ORDERS.key_columns)
+
+    # Without a cap (e.g. the budget was lifted) the run still resumes after the key inside the tie group
+    df, _ = extract_table(ORDERS, postgres, watermark, last_processed_key=boundary_key)
+    assert len(df) == 700
+    extracted.extend(df["order_id"])
+
+    assert sorted(extracted) == sorted(orders["order_id"])
+
+
+@pytest.mark.parametrize("budget_mb", [0, 1])
+def test_landing_over_budget_spills_and_cleans_up(tmp_path, oltp_dir, gcp, budget_mb):
+    """A batch that doesn't fit in the budget lands the same file through a spill file, which is removed."""
+    orders = write_orders(oltp_dir, 5_000, 5_000)
+    spill_dir = tmp_path / "spill"
+    spill_dir.mkdir()
+    gcs_parquet, _, _ = build_cdc_table_assets(ORDERS)
+
+    @asset(name=ORDERS.asset_name("raw_data"))
+    def orders_raw_data():
+        return orders
+
+    result = materialize(
+        [orders_raw_data, gcs_parquet],
+        resources={"gcp": gcp, "memory_budget": MemoryBudgetResource(budget_mb=budget_mb, spill_dir=str(spill_dir))},
+    )
+
+    assert result.success
+    metadata = {key: value.value for key, value in result.asset_materializations_for_node(gcs_parquet.op.name)[0].metadata.items()}
+    assert metadata["records_uploaded"] == 4_950
+    assert metadata.get("perf_memory_spilled", False) == bool(budget_mb)
+    assert list(spill_dir.iterdir()) == []
+    # Same content-addressed landing file (batch ID) in both modes
+    assert [uri.rsplit("/", 1)[-1] for uri in bucket_files(gcp) if "/landing/" in uri] == [metadata["gcs_uri"].rsplit("/", 1)[-1]]
+    landed = pd.read_parquet(gcp._uri_path(metadata["gcs_uri"]))
+    assert len(landed) == 4_950 and landed["order_id"].is_unique
@@ -0,0 +1,90 @@
+from datetime import date
+
+import duckdb
+import pandas as pd
+
+from .dbt_sql import read_sql, render
+from .test_risk_scoring import CNPJ_CLEAN_COLUMNS, installment
+
+AS_OF = date(2024, 6, 1)
+SUMMARY_MACRO = read_sql("macros/company_payment_summary.sql")
+
+
+def load_bronze(connection, rows: list, loaded_at: str):
+    """Bronze holds the latest version of every installment: merge `rows` on asset_id."""
+    connection.register("bronze_frame", pd.DataFrame(rows))
+    connection.execute("DELETE FROM bronze_installments WHERE asset_id IN (SELECT asset_id FROM bronze_frame)")
+    connection.execute(f"INSERT INTO bronze_installments BY NAME SELECT *, TIMESTAMP '{loaded_at}' AS _loaded_at FROM bronze_frame")
+    connection.unregister("bronze_frame")
+
+
+def build_incremental(connection, model: str, unique_key: str, sql: str):
+    """Write an incremental model's rows with delete+insert on `unique_key`, like the DuckDB target."""
+    connection.execute(f"CREATE TEMP TABLE batch AS {sql}")
+    connection.execute(f"DELETE FROM {model} WHERE {unique_key} IN (SELECT {unique_key} FROM batch)")
+    connection.execute(f"INSERT INTO {model} BY NAME SELECT * FROM batch")
+    connection.execute("DROP TABLE batch")
+
+
+def build(connection, now: str, incremental: bool = True):
+    """One dbt build of installments_clean and company_payment_summary at `now`."""
+    now = f"TIMESTAMP '{now}'"
+    silver_sql = read_sql("models/silver/installments_clean.sql")
+    gold_sql = SUMMARY_MACRO + "{{ company_payment_summary_sql(only_changed_keys=is_incremental()) }}"
+    if not incremental:
+        connection.execute(f"CREATE TABLE installments_clean AS {render(silver_sql, AS_OF, now=now)}")
+        connection.execute(f"CREATE TABLE company_payment_summary AS {render(gold_sql, AS_OF, now=now)}")
+        return
+    build_incremental(connection, "installments_clean", "asset_id", render(silver_sql, AS_OF, this="installments_clean", now=now))
+    build_incremental(
+        connection, "company_payment_summary", "buyer_tax_id", render(gold_sql, AS_OF, this="company_payment_summary", now=now)
+    )
+
+
+def mismatches(connection) -> list:
+    """Rows returned by the dbt reconciliation test (buyers that differ from a full rebuild)."""
+    test_sql = render(SUMMARY_MACRO + read_sql("tests/assert_company_payment_summary_matches_full_rebuild.sql"), AS_OF)
+    return connection.execute(test_sql).fetchall()
+
+
+def total_installments(connection) -> dict:
+    return dict(connection.execute("SELECT buyer_tax_id, total_installments FROM company_payment_summary").fetchall())
+
+
+def test_incremental_summary_follows_reassigned_installments():
+    with duckdb.connect() as connection:
+        # CNPJ rows that never change
+        columns = ", ".join(f"NULL::TIMESTAMP AS {column}" if column == "_loaded_at" else f"NULL AS {column}" for column in CNPJ_CLEAN_COLUMNS)
+        connection.execute(f"CREATE TABLE cnpj_ws_clean AS SELECT buyer_tax_id, {columns} FROM (VALUES ('b1'), ('b2'), ('b3')) AS t(buyer_tax_id)")
+
+        connection.register(
+            "first_frame",
+            pd.DataFrame(
+                [
+                    installment("x1", "b1", 1000, "2024-05-01", paid="2024-05-01"),
+                    installment("x2", "b1", 2000, "2024-07-01"),
+                    installment("x3", "b2", 3000, "2024-05-10"),
+                ]
+            ),
+        )
+        connection.execute("CREATE TABLE bronze_installments AS SELECT *, TIMESTAMP '2024-06-01 00:00:00' AS _loaded_at FROM first_frame")
+        build(connection, "2024-06-01 00:01:00", incremental=False)
+        assert total_installments(connection) == {"b1": 2, "b2": 1, "b3": 0}
+
+        # b1 loses both of its installments, one to b2 and one to b3
+        load_bronze(
+            connection,
+            [installment("x1", "b2", 1000, "2024-05-01", paid="2024-05-01"), installment("x2", "b3", 2000, "2024-07-01")],
+            "2024-06-01 00:05:00",
+        )
+        build(connection, "2024-06-01 00:06:00")
+        assert total_installments(connection) == {"b1": 0, "b2": 2, "b3": 1}
+        assert mismatches(connection) == []
+
+        # An unrelated change of a reassigned row, then a second reassignment
+        load_bronze(connection, [installment("x2", "b3", 2000, "2024-07-01", paid="2024-05-30")], "2024-06-01 00:10:00")
+        build(connection, "2024-06-01 00:11:00")
+        load_bronze(connection, [installment("x1", "b3", 1000, "2024-05-01", paid="2024-05-01")], "2024-06-01 00:15:00")
+        build(connection, "2024-06-01 00:16:00")
+        assert total_installments(connection) == {"b1": 0, "b2": 1, "b3": 2}
+        assert mismatches(connection) == []
@@ -0,0 +1,76 @@
+import shutil
+from pathlib import Path
+from types import SimpleNamespace
+
+import pytest
+from dagster import DagsterInstance, asset, materialize
+from dagster_dbt import DbtCliResource, get_asset_key_for_model
+
+from credix_pipeline.assets.dbt_assets import SLIM_SKIPPED_METADATA_KEY, dbt_medallion_models
+from credix_pipeline.assets.elementary_assets import get_models_materialized_since
+from credix_pipeline.project import dbt_project
+
+# Job name of `materialize`, which selects the slim state directory
+EPHEMERAL_JOB_NAME = "__ephemeral_asset_job__"
+
+
+class FinishedInvocation:
+    """A dbt invocation that printed nothing."""
+
+    def wait(self):
+        return self
+
+    def stream_raw_events(self):
+        return iter([])
+
+    def stream(self):
+        raise AssertionError("dbt build should not run when nothing changed")
+
+
+class NoChangeDbt(DbtCliResource):
+    """dbt CLI stand-in for a slim run with nothing changed: freshness results are written and `dbt ls` lists no model."""
+
+    def cli(self, args, *, target_path=None, **kwargs):
+        if list(args[:2]) == ["source", "freshness"]:
+            target_path.mkdir(parents=True, exist_ok=True)
+            (target_path / "sources.json").write_text("{}")
+        return FinishedInvocation()
+
+
+@pytest.fixture
+def slim_state():
+    """Artifacts of a previous successful build of the ephemeral job (removed afterwards, with the run's target dirs)."""
+    state_dir = Path(dbt_project.state_path) / EPHEMERAL_JOB_NAME
+    state_dir.mkdir(parents=True, exist_ok=True)
+    for artifact in ["manifest.json", "sources.json"]:
+        (state_dir / artifact).write_text("{}")
+    target_dir = Path(dbt_project.project_dir) / "target"
+    existing_targets = set(target_dir.glob("dagster-*"))
+    yield state_dir
+    shutil.rmtree(state_dir)
+    for path in set(target_dir.glob("dagster-*")) - existing_targets:
+        shutil.rmtree(path)
+
+
+def test_no_change_slim_run_still_unblocks_downstream_assets(slim_state, gcp):
+    """Nothing to build: every model gets a no-op materialization, so a checkpoint waiting on silver still runs."""
+
+    @asset(deps=[get_asset_key_for_model([dbt_medallion_models], "installments_clean")])
+    def installments_checkpoint():
+        return "checkpoint_complete"
+
+    instance = DagsterInstance.ephemeral()
+    result = materialize(
+        [dbt_medallion_models, installments_checkpoint],
+        resources={"dbt": NoChangeDbt(project_dir=str(dbt_project.project_dir)), "gcp": gcp},
+        instance=instance,
+    )
+
+    assert result.success
+    assert result.output_for_node("installments_checkpoint") == "checkpoint_complete"
+    materializations = result.asset_materializations_for_node(dbt_medallion_models.op.name)
+    assert {m.asset_key for m in materializations} == set(dbt_medallion_models.keys)
+    assert all(m.metadata[SLIM_SKIPPED_METADATA_KEY].value for m in materializations)
+
+    # The monitor doesn't count them as built models
+    assert get_models_materialized_since(SimpleNamespace(instance=instance), since=0.0) == []
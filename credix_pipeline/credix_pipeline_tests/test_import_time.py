@@ -0,0 +1,13 @@
+from credix_pipeline_benchmarks.import_time import LAZY_MODULES, measure_import_times
+
+MODULE = "credix_pipeline.definitions"
+# Generous for CI machines: the budget is about catching eager imports, not shaving milliseconds
+MAX_IMPORT_SECONDS = 10.0
+
+
+def test_definitions_import_is_lazy_and_within_budget():
+    """Loading the code location in a clean interpreter imports no heavy dependency and stays within the budget."""
+    import_times = measure_import_times(MODULE)
+
+    assert [name for name in LAZY_MODULES if name in import_times] == []
+    assert import_times[MODULE] / 1e6 <= MAX_IMPORT_SECONDS
@@ -0,0 +1,36 @@
+import threading
+import time
+
+from credix_pipeline.utils.instrumentation import PerformanceRecorder
+
+
+def wait_on(recorder: PerformanceRecorder, system: str, seconds: float, delay: float = 0.0):
+    time.sleep(delay)
+    with recorder.waiting(system):
+        time.sleep(seconds)
+
+
+def test_waits_of_concurrent_threads_count_their_union():
+    """Two threads waiting 0.2s each, overlapping by 0.1s: 0.3s of postgres wait, not 0.2s or 0.4s."""
+    recorder = PerformanceRecorder("test")
+    threads = [
+        threading.Thread(target=wait_on, args=(recorder, "postgres", 0.2)),
+        threading.Thread(target=wait_on, args=(recorder, "postgres", 0.2, 0.1)),
+    ]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert 0.28 <= recorder.wait_seconds["postgres"] < 0.38
+
+
+def test_nested_waits_in_a_thread_count_once():
+    recorder = PerformanceRecorder("test")
+    with recorder.waiting("gcs"):
+        wait_on(recorder, "gcs", 0.1)
+        wait_on(recorder, "bigquery", 0.05)
+
+    # The outer wait alone: 0.15s, not 0.25s
+    assert 0.15 <= recorder.wait_seconds["gcs"] < 0.2
+    assert 0.05 <= recorder.wait_seconds["bigquery"] < 0.1
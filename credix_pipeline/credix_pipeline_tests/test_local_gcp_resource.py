@@ -0,0 +1,137 @@
+import inspect
+from datetime import datetime
+from types import SimpleNamespace
+
+import pyarrow as pa
+import pyarrow.parquet as pq
+import pytest
+from dagster import DagsterInstance, asset, materialize
+
+from credix_pipeline.assets.cdc_engine import TEMP_DATASET, build_cdc_table_assets
+from credix_pipeline.assets.cdc_tables import INSTALLMENTS
+from credix_pipeline.resources.gcp_resource import GCPResource
+from credix_pipeline.resources.local_gcp_resource import LocalGCPResource
+
+BUCKET = "data_lake_credix"
+
+
+def land_batch(gcp: LocalGCPResource, name: str, rows: list) -> str:
+    path = gcp._blob_path(BUCKET, f"business_case/landing/{name}.parquet")
+    path.parent.mkdir(parents=True, exist_ok=True)
+    pq.write_table(pa.Table.from_pylist(rows), path)
+    return f"gs://{BUCKET}/business_case/landing/{name}.parquet"
+
+
+def test_keep_latest_rows_over_overlapping_batches(tmp_path):
+    """A pending file and the batch that re-extracted its range: the newest version of each key wins."""
+    gcp = LocalGCPResource(root_dir=str(tmp_path))
+    pending = land_batch(
+        gcp,
+        "installments_old",
+        [
+            {"asset_id": "a1", "invoice_issue_date": datetime(2024, 1, 1), "paid_date": None, "status": "PENDING"},
+            {"asset_id": "a2", "invoice_issue_date": datetime(2024, 1, 2), "paid_date": None, "status": "PENDING"},
+        ],
+    )
+    current = land_batch(
+        gcp,
+        "installments_new",
+        [
+            # Paid since the pending batch: newer watermark through paid_date
+            {"asset_id": "a1", "invoice_issue_date": datetime(2024, 1, 1), "paid_date": datetime(2024, 2, 1), "status": "PAID"},
+            {"asset_id": "a2", "invoice_issue_date": datetime(2024, 1, 2), "paid_date": None, "status": "PENDING"},
+            {"asset_id": "a3", "invoice_issue_date": datetime(2024, 1, 3), "paid_date": None, "status": "PENDING"},
+        ],
+    )
+
+    gcp.load_to_bigquery("business_case_temp", "installments", [pending, current])
+    gcp.keep_latest_rows("business_case_temp", "installments", ["asset_id"], ["invoice_issue_date", "paid_date"])
+
+    rows = pq.read_table(gcp._table_path("business_case_temp", "installments")).to_pylist()
+    assert sorted((row["asset_id"], row["status"]) for row in rows) == [("a1", "PAID"), ("a2", "PENDING"), ("a3", "PENDING")]
+
+
+def test_retry_of_archived_coalesced_batch_reuses_its_table(tmp_path):
+    """A retry after the archive step finds the batch archived and reports the coalesced table, not a per-file name."""
+    gcp = LocalGCPResource(root_dir=str(tmp_path))
+    pending = land_batch(
+        gcp,
+        "ingestion_dt=2024-01-01/installments_00000000000000aa",
+        [{"asset_id": "a1", "invoice_issue_date": datetime(2024, 1, 1), "paid_date": None}],
+    )
+    current = land_batch(
+        gcp,
+        "ingestion_dt=2024-01-02/installments_00000000000000bb",
+        [
+            {"asset_id": "a1", "invoice_issue_date": datetime(2024, 1, 1), "paid_date": datetime(2024, 2, 1)},
+            {"asset_id": "a2", "invoice_issue_date": datetime(2024, 1, 2), "paid_date": None},
+        ],
+    )
+    _, temp_table, _ = build_cdc_table_assets(INSTALLMENTS)
+    instance = DagsterInstance.ephemeral()
+
+    def load(gcs_uri: str) -> dict:
+        @asset(name=INSTALLMENTS.asset_name("gcs_parquet"))
+        def installments_gcs_parquet():
+            return gcs_uri
+
+        result = materialize([installments_gcs_parquet, temp_table], resources={"gcp": gcp}, instance=instance)
+        assert result.success
+        materialization = result.asset_materializations_for_node(temp_table.op.name)[0]
+        return {key: value.value for key, value in materialization.metadata.items()}
+
+    first = load(current)
+    assert first["coalesced_files"] == 2
+    assert gcp.list_gcs_blobs(BUCKET, "business_case/landing") == []
+
+    # The re-executed upload step finds the file in the archive
+    archived = current.replace(f"gs://{BUCKET}/business_case/landing/", f"gs://{BUCKET}_archive/business_case/archive/")
+    retry = load(archived)
+    assert retry["batch_reused"]
+    assert retry["temp_table_name"] == first["temp_table_name"]
+    assert gcp.table_exists(TEMP_DATASET, retry["temp_table_name"])
+    assert pending.rsplit("_", 1)[-1].removesuffix(".parquet") in retry["loaded_batch_ids"]
+
+
+def test_every_client_method_is_overridden():
+    """No GCPResource method that creates a GCS or BigQuery client is inherited by the local backend."""
+    client_methods = [
+        name
+        for name, method in vars(GCPResource).items()
+        if inspect.isfunction(method) and name not in ("get_storage_client", "get_bigquery_client")
+        and ("get_storage_client()" in inspect.getsource(method) or "get_bigquery_client()" in inspect.getsource(method))
+    ]
+    assert client_methods
+    assert [name for name in client_methods if name not in vars(LocalGCPResource)] == []
+
+
+class RecordingWriter:
+    def __init__(self):
+        self.calls = []
+
+    def write(self, chunk):
+        self.calls.append("write")
+
+    def close(self):
+        self.calls.append("close")
+
+    def terminate(self):
+        self.calls.append("terminate")
+
+
+def test_failed_stream_cancels_the_upload_session():
+    """A stream that raises cancels the resumable upload instead of finalizing a partial object."""
+    writer = RecordingWriter()
+
+    class StubGCPResource(GCPResource):
+        def get_storage_client(self):
+            blob = SimpleNamespace(open=lambda *args, **kwargs: writer)
+            return SimpleNamespace(bucket=lambda name: SimpleNamespace(blob=lambda name: blob))
+
+    def chunks():
+        yield b"rows"
+        raise RuntimeError("extraction failed")
+
+    with pytest.raises(RuntimeError, match="extraction failed"):
+        StubGCPResource().upload_stream_to_gcs(BUCKET, "business_case/staging/batch.parquet", chunks())
+    assert writer.calls == ["write", "terminate"]
@@ -0,0 +1,117 @@
+from datetime import date
+
+import duckdb
+import pandas as pd
+import pytest
+
+from credix_pipeline.utils.risk_scoring import RiskScoringEngine
+
+from .dbt_sql import read_sql, render
+
+CNPJ_CLEAN_COLUMNS = [
+    "share_capital", "company_size", "legal_nature", "simples_option", "is_mei", "is_main_company", "company_status",
+    "is_active", "zipcode", "main_cnae", "standardized_state", "standardized_uf", "standardized_city",
+    "data_quality_flag", "created_at", "updated_at", "_loaded_at",
+]
+COMPARED_FIELDS = [
+    "total_installments", "paid_installments", "overdue_installments", "pending_installments",
+    "total_original_amount", "total_expected_amount", "total_paid_amount", "total_overdue_amount",
+    "payment_completion_rate", "overdue_rate", "payment_tier", "risk_score",
+]
+
+
+def gold_scores(bronze: pd.DataFrame, as_of: date) -> dict:
+    """company_payment_summary rows per buyer, built from `bronze` with the dbt SQL of installments_clean and the gold macro."""
+    silver_sql = render(read_sql("models/silver/installments_clean.sql"), as_of)
+    macro = read_sql("macros/company_payment_summary.sql")
+    gold_sql = render(macro + "{{ company_payment_summary_sql() }}", as_of)
+
+    with duckdb.connect() as connection:
+        connection.register("bronze_frame", bronze)
+        connection.execute("CREATE TABLE bronze_installments AS SELECT *, current_timestamp AS _loaded_at FROM bronze_frame")
+        connection.execute(f"CREATE TABLE installments_clean AS {silver_sql}")
+        columns = ", ".join(f"NULL AS {column}" for column in CNPJ_CLEAN_COLUMNS)
+        connection.execute(
+            f"CREATE TABLE cnpj_ws_clean AS SELECT DISTINCT buyer_tax_id, {columns} FROM bronze_installments WHERE buyer_tax_id IS NOT NULL"
+        )
+        gold = connection.execute(gold_sql).df()
+    return {row["buyer_tax_id"]: row for row in gold.to_dict("records")}
+
+
+def installment(asset_id, buyer, expected, due, paid=None, paid_amount=None, original=None):
+    return {
+        "asset_id": asset_id,
+        "invoice_id": f"inv_{asset_id}",
+        "buyer_tax_id": buyer,
+        "original_amount_in_cents": expected if original is None else original,
+        "expected_amount_in_cents": expected,
+        "paid_amount_in_cents": paid_amount if paid_amount is not None else (expected if paid else None),
+        "due_date": pd.Timestamp(due),
+        "paid_date": pd.Timestamp(paid) if paid else pd.NaT,
+        "invoice_issue_date": pd.Timestamp("2024-01-01"),
+        "buyer_main_tax_id": buyer,
+    }
+
+
+FIRST_BATCH = [
+    # Always pays early
+    installment("a0", "buyer_excellent", 50000, "2024-03-01", paid="2024-02-25"),
+    installment("a10", "buyer_excellent", 50000, "2024-04-01", paid="2024-04-01"),
+    # Early and on-time payer, with a pending installment
+    installment("a1", "buyer_good", 10000, "2024-03-10", paid="2024-03-08"),
+    installment("a2", "buyer_good", 20050, "2024-04-10", paid="2024-04-12"),
+    installment("a3", "buyer_good", 5000, "2024-06-20"),
+    # Late payer with an overdue installment
+    installment("a4", "buyer_late", 7500, "2024-02-01", paid="2024-03-15", paid_amount=7000),
+    installment("a5", "buyer_late", 12345, "2024-04-01"),
+    installment("a6", "buyer_late", 999, "2024-06-12"),
+    # Only pending installments, both due between the two scoring dates
+    installment("a7", "buyer_pending", 3000, "2024-06-05"),
+    installment("a8", "buyer_pending", 4000, "2024-06-08"),
+    # Fails the installments_clean filters
+    installment("a9", "buyer_good", -100, "2024-05-01"),
+]
+# A later CDC batch: a8 gets paid, a5 is re-sent unchanged
+SECOND_BATCH = [
+    installment("a8", "buyer_pending", 4000, "2024-06-08", paid="2024-05-30"),
+    installment("a5", "buyer_late", 12345, "2024-04-01"),
+]
+
+
+def assert_matches_gold(engine: RiskScoringEngine, bronze: pd.DataFrame):
+    gold = gold_scores(bronze, engine.as_of)
+    assert sorted(gold) == ["buyer_excellent", "buyer_good", "buyer_late", "buyer_pending"]
+    for buyer_tax_id, expected in gold.items():
+        scored = engine.score(buyer_tax_id)._asdict()
+        for field in COMPARED_FIELDS:
+            assert scored[field] == pytest.approx(expected[field]), (buyer_tax_id, field)
+
+
+def test_scores_match_the_gold_model_as_the_date_advances():
+    engine = RiskScoringEngine(as_of=date(2024, 6, 1))
+    engine.apply_batch(pd.DataFrame(FIRST_BATCH))
+    engine.apply_batch(pd.DataFrame(SECOND_BATCH))
+
+    # Bronze holds the latest version of every installment
+    bronze = pd.DataFrame(FIRST_BATCH + SECOND_BATCH).drop_duplicates("asset_id", keep="last")
+    assert_matches_gold(engine, bronze)
+    assert engine.score("buyer_excellent").payment_tier == "EXCELLENT"
+    assert engine.score("buyer_pending").pending_installments == 1
+
+    # a7 (due 2024-06-05) and a6 (due 2024-06-12) become OVERDUE, like the daily status refresh
+    engine.advance_to(date(2024, 6, 15))
+    assert_matches_gold(engine, bronze)
+    assert engine.score("buyer_pending").overdue_installments == 1
+    assert engine.score("buyer_late").overdue_installments == 2
+
+
+def test_snapshot_round_trip(tmp_path):
+    engine = RiskScoringEngine(as_of=date(2024, 6, 1))
+    engine.apply_batch(pd.DataFrame(FIRST_BATCH))
+    engine.snapshot(str(tmp_path / "scores.npz"))
+
+    restored = RiskScoringEngine.restore(str(tmp_path / "scores.npz"))
+    assert restored.as_of == engine.as_of
+    assert [restored.score(buyer) for buyer in ["buyer_good", "buyer_late", "buyer_pending"]] == [
+        engine.score(buyer) for buyer in ["buyer_good", "buyer_late", "buyer_pending"]
+    ]
@@ -2,7 +2,9 @@ from setuptools import find_packages, setup
 
 setup(
     name="credix_pipeline",
-    packages=find_packages(exclude=["credix_pipeline_tests"]),
+    packages=find_packages(exclude=["credix_pipeline_tests", "credix_pipeline_benchmarks"]),
+    # dbt project packaged by `dagster-dbt project prepare-and-package` (includes the prepared manifest)
+    package_data={"credix_pipeline": ["dbt-project/**/*"]},
     install_requires=[
         "dagster",
         "dagster-webserver",
@@ -16,5 +18,5 @@ setup(
         "google-cloud-storage",
         "google-cloud-bigquery"
     ],
-    extras_require={"dev": ["dagster-webserver", "pytest"]},
+    extras_require={"dev": ["dagster-webserver", "pytest"], "local": ["duckdb", "dbt-duckdb"]},
 )
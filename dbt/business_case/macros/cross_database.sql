@@ -0,0 +1,34 @@
+{#-
+  Date helpers whose SQL differs between BigQuery (dev/prod targets) and DuckDB (local target).
+
+  The BigQuery implementations render exactly the SQL the models used before, so partition
+  pruning on due_date is unchanged. Timestamps use dbt's own cross-database current_timestamp().
+-#}
+
+{#- Current date (UTC on BigQuery, session time zone on DuckDB) -#}
+{% macro current_date() %}
+  {{- return(adapter.dispatch('current_date', 'business_case')()) -}}
+{% endmacro %}
+
+{% macro default__current_date() -%}
+  current_date
+{%- endmacro %}
+
+{% macro bigquery__current_date() -%}
+  CURRENT_DATE()
+{%- endmacro %}
+
+
+{#- Number of days from start_date to end_date (negative if end_date is earlier) -#}
+{% macro date_diff_days(start_date, end_date) %}
+  {{- return(adapter.dispatch('date_diff_days', 'business_case')(start_date, end_date)) -}}
+{% endmacro %}
+
+{% macro default__date_diff_days(start_date, end_date) -%}
+  date_diff('day', {{ start_date }}, {{ end_date }})
+{%- endmacro %}
+
+{% macro bigquery__date_diff_days(start_date, end_date) -%}
+  DATE_DIFF({{ end_date }}, {{ start_date }}, DAY)
+{%- endmacro %}
+
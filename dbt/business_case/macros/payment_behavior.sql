@@ -0,0 +1,16 @@
+{#-
+  Granular payment behavior of an installment, from its payment_status and days_from_due_date.
+  Shared by payment_analytics_detailed and the daily refresh of unpaid installments.
+-#}
+{% macro payment_behavior(payment_status, days_from_due_date) %}
+    case
+      when {{ payment_status }} = 'PAID' and {{ days_from_due_date }} <= 0 then 'EARLY_PAYMENT'
+      when {{ payment_status }} = 'PAID' and {{ days_from_due_date }} between 1 and 5 then 'ON_TIME_PAYMENT'
+      when {{ payment_status }} = 'PAID' and {{ days_from_due_date }} between 6 and 30 then 'LATE_PAYMENT'
+      when {{ payment_status }} = 'PAID' and {{ days_from_due_date }} > 30 then 'VERY_LATE_PAYMENT'
+      when {{ payment_status }} = 'OVERDUE' and {{ days_from_due_date }} between 1 and 30 then 'RECENTLY_OVERDUE'
+      when {{ payment_status }} = 'OVERDUE' and {{ days_from_due_date }} > 30 then 'SEVERELY_OVERDUE'
+      when {{ payment_status }} = 'OVERDUE' then 'OVERDUE'
+      else 'PENDING'
+    end
+{%- endmacro %}
@@ -0,0 +1,52 @@
+{#-
+  Daily refresh of the CURRENT_DATE()-dependent columns of installments_clean.
+
+  Only unpaid rows change from one day to the next (PENDING -> OVERDUE, days_from_due_date),
+  so only those are rewritten. _loaded_at is only bumped when payment_status changes: the
+  day count moves every day for every unpaid row, and bumping it would make the incremental
+  gold models treat most rows and buyers as changed daily. The day count (and the
+  payment_behavior derived from it) is instead updated in place in payment_analytics_detailed,
+  without touching its change timestamps; payment_status changes reach it through the bumped
+  _loaded_at. company_payment_summary only reads the day count of paid installments.
+
+  Usage: dbt run-operation refresh_installments_payment_status
+-#}
+{% macro refresh_installments_payment_status() %}
+
+  {% set payment_status %}CASE WHEN due_date < {{ current_date() }} THEN 'OVERDUE' ELSE 'PENDING' END{% endset %}
+  {% set days_from_due_date = date_diff_days('due_date', current_date()) %}
+
+  {% set refresh_sql %}
+    UPDATE {{ ref('installments_clean') }}
+    SET
+      payment_status = {{ payment_status }},
+      days_from_due_date = {{ days_from_due_date }},
+      _loaded_at = CASE
+        WHEN payment_status IS DISTINCT FROM {{ payment_status }} THEN {{ dbt.current_timestamp() }}
+        ELSE _loaded_at
+      END
+    WHERE paid_date IS NULL
+      AND (
+        days_from_due_date IS DISTINCT FROM {{ days_from_due_date }}
+        OR payment_status IS DISTINCT FROM {{ payment_status }}
+      )
+  {% endset %}
+
+  {% do run_query(refresh_sql) %}
+  {{ log("Refreshed payment status of unpaid installments in " ~ ref('installments_clean'), info=True) }}
+
+  {% set analytics = ref('payment_analytics_detailed') %}
+  {% if adapter.get_relation(database=analytics.database, schema=analytics.schema, identifier=analytics.identifier) %}
+    {% set analytics_sql %}
+      UPDATE {{ analytics }}
+      SET
+        days_from_due_date = {{ days_from_due_date }},
+        payment_behavior = {{ payment_behavior('payment_status', days_from_due_date) }}
+      WHERE paid_date IS NULL
+        AND days_from_due_date IS DISTINCT FROM {{ days_from_due_date }}
+    {% endset %}
+    {% do run_query(analytics_sql) %}
+    {{ log("Refreshed days from due date of unpaid installments in " ~ analytics, info=True) }}
+  {% endif %}
+
+{% endmacro %}
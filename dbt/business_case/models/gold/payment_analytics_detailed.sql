@@ -1,15 +1,32 @@
+{#-
+  Existing tables need a one-off `dbt build --full-refresh -s payment_analytics_detailed` for the
+  _company_loaded_at column and the partitioning / clustering below (on_schema_change is 'ignore').
+-#}
 {{
   config(
     meta={'dagster': {'group': 'gold_layer'}},
     materialized='incremental',
     unique_key='asset_id',
-    incremental_strategy='merge',
+    incremental_strategy='merge' if target.type == 'bigquery' else 'delete+insert',
+    partition_by={'field': 'due_date', 'data_type': 'date', 'granularity': 'month'},
+    cluster_by=['primary_tax_id', 'asset_id'],
     schema='gold',
     description='Transaction-level payment analytics enriched with company information'
   )
 }}
 
+{% if is_incremental() %}
+with changed_companies as (
+  -- Late-arriving dimension: companies whose CNPJ row changed since their rows were last enriched
+  select buyer_tax_id
+  from {{ ref('cnpj_ws_clean') }}
+  where _loaded_at > (select coalesce(max(_company_loaded_at), cast('1900-01-01' as timestamp)) from {{ this }})
+),
+
+payment_data as (
+{% else %}
 with payment_data as (
+{% endif %}
   select
     asset_id,
     invoice_id,
@@ -37,7 +54,10 @@ with payment_data as (
   from {{ ref('installments_clean') }}
   
   {% if is_incremental() %}
+    -- New/changed installments, plus already enriched ones of changed companies (re-merged on asset_id)
     where _loaded_at > (select max(_loaded_at) from {{ this }})
+      or buyer_tax_id in (select buyer_tax_id from changed_companies)
+      or (buyer_tax_id is null and buyer_main_tax_id in (select buyer_tax_id from changed_companies))
   {% endif %}
 ),
 
@@ -59,7 +79,8 @@ company_context as (
     standardized_city as city,
     data_quality_flag as company_data_quality,
     created_at,
-    updated_at
+    updated_at,
+    _loaded_at as _company_loaded_at
   from {{ ref('cnpj_ws_clean') }}
   where buyer_tax_id is not null
 ),
@@ -85,21 +106,13 @@ enriched_payments as (
     c.company_data_quality,
     c.created_at,
     c.updated_at,
+    c._company_loaded_at,
 
     -- Derived metrics
     (p.paid_amount - p.expected_amount) as payment_variance,
 
     -- Payment behavior (granular)
-    case
-      when p.payment_status = 'PAID' and p.days_from_due_date <= 0 then 'EARLY_PAYMENT'
-      when p.payment_status = 'PAID' and p.days_from_due_date between 1 and 5 then 'ON_TIME_PAYMENT'
-      when p.payment_status = 'PAID' and p.days_from_due_date between 6 and 30 then 'LATE_PAYMENT'
-      when p.payment_status = 'PAID' and p.days_from_due_date > 30 then 'VERY_LATE_PAYMENT'
-      when p.payment_status = 'OVERDUE' and p.days_from_due_date between 1 and 30 then 'RECENTLY_OVERDUE'
-      when p.payment_status = 'OVERDUE' and p.days_from_due_date > 30 then 'SEVERELY_OVERDUE'
-      when p.payment_status = 'OVERDUE' then 'OVERDUE'
-      else 'PENDING'
-    end as payment_behavior,
+    {{ payment_behavior('p.payment_status', 'p.days_from_due_date') }} as payment_behavior,
 
     -- Payment amount categories
     case
@@ -209,6 +222,7 @@ select
   created_at,
   updated_at,
   _loaded_at,
-  current_timestamp() as processed_at
+  _company_loaded_at,
+  {{ dbt.current_timestamp() }} as processed_at
 
 from enriched_payments
@@ -4,8 +4,9 @@
 {{ config(
     materialized='table',
     schema='silver',
+    cluster_by=['buyer_tax_id'],
     meta={'dagster': {'group': 'cnpj_pipeline'}},
-    catalog_name = 'datastream-destination-biglake-credix'
+    catalog_name = 'datastream-destination-biglake-credix' if target.type == 'bigquery' else none
 
 ) }}
 
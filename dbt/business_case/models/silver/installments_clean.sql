@@ -1,54 +1,114 @@
+{#-
+  Incremental on the bronze load watermark (_bronze_loaded_at): each run only reads the bronze rows
+  loaded since the last run and merges them on asset_id. Silver is partitioned by due_date (monthly)
+  and clustered by buyer_tax_id, asset_id. The merge updates a row in place, so an installment whose
+  due_date moved to another month leaves its old partition (rebuilding only the batch's partitions
+  would keep the old copy there).
+
+  _previous_tax_id is the buyer (buyer_tax_id, else buyer_main_tax_id) the installment had before
+  its buyer last changed, so the incremental company_payment_summary also recomputes the buyer it
+  was moved away from. It is kept across later changes of the row.
+
+  _loaded_at is the row's change timestamp: merged rows that didn't change (same bronze version and
+  payment_status) keep their previous _loaded_at, so the incremental gold models, which watermark
+  on it, only pick up changed rows.
+
+  payment_status / days_from_due_date depend on CURRENT_DATE() for unpaid rows; outside of the
+  batch they are refreshed once a day by the refresh_installments_payment_status operation.
+
+  On the DuckDB (local) target, which has no merge, the same rows are written with delete+insert
+  on asset_id.
+-#}
 {{
   config(
     materialized='incremental',
     unique_key='asset_id',
-    incremental_strategy='merge',
+    incremental_strategy='merge' if target.type == 'bigquery' else 'delete+insert',
+    partition_by={'field': 'due_date', 'data_type': 'date', 'granularity': 'month'},
+    cluster_by=['buyer_tax_id', 'asset_id'],
     meta={'dagster': {'group': 'installments_pipeline'}}
   )
 }}
 
+WITH installments AS (
+  SELECT
+    asset_id,
+    invoice_id,
+    buyer_tax_id,
+    buyer_main_tax_id,
+
+    -- Convert amounts from cents to currency
+    round(original_amount_in_cents / 100.0, 2) as original_amount,
+    round(expected_amount_in_cents / 100.0, 2) as expected_amount,
+    round(paid_amount_in_cents / 100.0, 2) as paid_amount,
+
+    -- Date fields
+    CAST(due_date AS DATE) as due_date,
+    CAST(paid_date AS DATE) as paid_date,
+    CAST(invoice_issue_date AS DATE) as invoice_issue_date,
+
+    -- Calculate payment status
+    CASE
+      WHEN paid_date IS NOT NULL THEN 'PAID'
+      WHEN CAST(due_date AS DATE) < {{ current_date() }} THEN 'OVERDUE'
+      ELSE 'PENDING'
+    END as payment_status,
+
+    -- Calculate days from due date
+    CASE
+      WHEN paid_date IS NOT NULL THEN {{ date_diff_days('CAST(due_date AS DATE)', 'CAST(paid_date AS DATE)') }}
+      ELSE {{ date_diff_days('CAST(due_date AS DATE)', current_date()) }}
+    END as days_from_due_date,
+    _loaded_at as _bronze_loaded_at
+
+  FROM {{ source('bronze', 'oltp_business_case_installments') }}
+  WHERE
+    asset_id IS NOT NULL
+    AND buyer_tax_id IS NOT NULL
+    AND expected_amount_in_cents IS NOT NULL
+    AND due_date IS NOT NULL
+    -- sanity checks for negative values
+    AND (original_amount_in_cents IS NULL OR original_amount_in_cents >= 0)
+    AND expected_amount_in_cents >= 0
+    AND (paid_amount_in_cents IS NULL OR paid_amount_in_cents >= 0)
+
+  {% if is_incremental() %}
+    -- Only rows loaded into bronze since the last run
+    AND _loaded_at > (SELECT COALESCE(MAX(_bronze_loaded_at), CAST('1900-01-01' AS TIMESTAMP)) FROM {{ this }})
+  {% endif %}
+)
+
 SELECT
-  asset_id,
-  invoice_id,
-  buyer_tax_id,
-  buyer_main_tax_id,
-  
-  -- Convert amounts from cents to currency
-  round(original_amount_in_cents / 100.0, 2) as original_amount,
-  round(expected_amount_in_cents / 100.0, 2) as expected_amount,
-  round(paid_amount_in_cents / 100.0, 2) as paid_amount,
-  
-  -- Date fields
-  CAST(due_date AS DATE) as due_date,
-  CAST(paid_date AS DATE) as paid_date,
-  CAST(invoice_issue_date AS DATE) as invoice_issue_date,
-
-  -- Calculate payment status
+  installments.*,
+{% if is_incremental() %}
+  -- Unchanged rows keep their change timestamp; new or changed ones get this run's
   CASE
-    WHEN paid_date IS NOT NULL THEN 'PAID'
-    WHEN CAST(due_date AS DATE) < CURRENT_DATE() THEN 'OVERDUE'
-    ELSE 'PENDING'
-  END as payment_status,
-  
-  -- Calculate days from due date
+    WHEN previous._bronze_loaded_at = installments._bronze_loaded_at
+      AND previous.payment_status = installments.payment_status
+    THEN previous._loaded_at
+    ELSE {{ dbt.current_timestamp() }}
+  END as _loaded_at,
+  -- Buyer the installment was moved away from, so company_payment_summary also recomputes that buyer
   CASE
-    WHEN paid_date IS NOT NULL THEN DATE_DIFF(CAST(paid_date AS DATE), CAST(due_date AS DATE), DAY)
-    ELSE DATE_DIFF(CURRENT_DATE(), CAST(due_date AS DATE), DAY)
-  END as days_from_due_date,
-  CURRENT_TIMESTAMP() as _loaded_at
-
-
-FROM product-reliability-analyzer.business_case_bronze.oltp_business_case_installments
-WHERE
-  asset_id IS NOT NULL
-  AND buyer_tax_id IS NOT NULL
-  AND expected_amount_in_cents IS NOT NULL
-  AND due_date IS NOT NULL
-  -- sanity checks for negative values
-  AND (original_amount_in_cents IS NULL OR original_amount_in_cents >= 0)
-  AND expected_amount_in_cents >= 0
-  AND (paid_amount_in_cents IS NULL OR paid_amount_in_cents >= 0)
-
--- {% if is_incremental() %}
---   WHERE _loaded_at > (SELECT MAX(_loaded_at) FROM {{ this }})
--- {% endif %}
+    WHEN previous.tax_id IS DISTINCT FROM COALESCE(installments.buyer_tax_id, installments.buyer_main_tax_id)
+    THEN previous.tax_id
+    ELSE previous._previous_tax_id
+  END as _previous_tax_id
+FROM installments
+LEFT JOIN (
+  -- Only the compared columns are read from the current table
+  SELECT
+    asset_id,
+    _bronze_loaded_at,
+    payment_status,
+    _loaded_at,
+    COALESCE(buyer_tax_id, buyer_main_tax_id) as tax_id,
+    _previous_tax_id
+  FROM {{ this }}
+) AS previous
+  ON previous.asset_id = installments.asset_id
+{% else %}
+  {{ dbt.current_timestamp() }} as _loaded_at,
+  CAST(NULL AS {{ dbt.type_string() }}) as _previous_tax_id
+FROM installments
+{% endif %}
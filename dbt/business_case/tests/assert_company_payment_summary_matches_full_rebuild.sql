@@ -0,0 +1,36 @@
+-- Reconciliation: the incrementally maintained company_payment_summary must match a full rebuild.
+-- Returns the buyers that are missing on either side or whose metrics differ (amounts within 0.01).
+-- A buyer that an installment was reassigned away from shows up here if it still counts it;
+-- credix_pipeline_tests/test_company_payment_summary.py runs this test after reassignments on DuckDB.
+
+with full_rebuild as (
+  {{ company_payment_summary_sql(only_changed_keys=false) }}
+),
+
+incremental as (
+  select * from {{ ref('company_payment_summary') }}
+)
+
+select
+  coalesce(f.buyer_tax_id, i.buyer_tax_id) as buyer_tax_id,
+  f.buyer_tax_id is null as missing_in_full_rebuild,
+  i.buyer_tax_id is null as missing_in_incremental
+from full_rebuild f
+full outer join incremental i on f.buyer_tax_id = i.buyer_tax_id
+where f.buyer_tax_id is null
+  or i.buyer_tax_id is null
+  or f.total_installments != i.total_installments
+  or f.paid_installments != i.paid_installments
+  or f.overdue_installments != i.overdue_installments
+  or f.pending_installments != i.pending_installments
+  or abs(f.total_original_amount - i.total_original_amount) > 0.01
+  or abs(f.total_expected_amount - i.total_expected_amount) > 0.01
+  or abs(f.total_paid_amount - i.total_paid_amount) > 0.01
+  or abs(f.total_overdue_amount - i.total_overdue_amount) > 0.01
+  or abs(f.payment_completion_rate - i.payment_completion_rate) > 0.01
+  or abs(f.overdue_rate - i.overdue_rate) > 0.01
+  or abs(f.avg_payment_days - i.avg_payment_days) > 0.01
+  or abs(f.risk_score - i.risk_score) > 0.01
+  or f.payment_tier != i.payment_tier
+  or f.company_status is distinct from i.company_status
+  or f.latest_due_date is distinct from i.latest_due_date
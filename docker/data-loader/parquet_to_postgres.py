@@ -6,10 +6,23 @@ import logging
 from pathlib import Path
 import time
 
+from batch_sizing import AdaptiveBatchSizer
+
 
 logging.basicConfig(level=logging.INFO, format="%(asctime)s - %(levelname)s - %(message)s")
 logger = logging.getLogger(__name__)
 
+# Insert batches start at `batch_size` rows and adapt to keep the p95 insert time and the
+# in-memory size of a batch under these targets (whatever the width of the table)
+TARGET_BATCH_SECONDS = float(os.getenv("LOADER_TARGET_BATCH_SECONDS", "2"))
+MEMORY_CEILING_MB = int(os.getenv("LOADER_MEMORY_CEILING_MB", "256"))
+
+# Btree indexes on the CDC watermark columns probed every minute by the installments change sensor
+# (MAX(...) per column and the OR backlog count), so the probes don't scan the whole table
+WATERMARK_INDEXES = {
+    "business_case_installments": ["invoice_issue_date", "paid_date"],
+}
+
 def wait_for_postgres(host, port, user, password, database, max_retries=30):
     """Wait for PostgreSQL to be ready."""
     for i in range(max_retries):
@@ -65,7 +78,7 @@ dtype_mapping = {
 }
 
 def load_parquet_to_postgres(parquet_file_path, table_name, schema="oltp", batch_size=20000):
-    """Load a parquet file into a PostgreSQL table using psycopg2 in batches."""
+    """Load a parquet file into a PostgreSQL table using psycopg2 in adaptively sized batches."""
     try:
         logger.info(f"📂 Loading {parquet_file_path} into {schema}.{table_name}")
 
@@ -93,17 +106,41 @@ def load_parquet_to_postgres(parquet_file_path, table_name, schema="oltp", batch
         insert_stmt = f'INSERT INTO "{schema}"."{table_name}" ({cols}) VALUES %s'
         logger.info(f"📝 Insert statement template: {insert_stmt}")
 
-        data = [tuple(x) for x in df.to_numpy()]
-        total_rows = len(data)
-
-        for i in range(0, total_rows, batch_size):
-            batch = data[i:i+batch_size]
+        total_rows = len(df)
+        sizer = AdaptiveBatchSizer(
+            initial_rows=batch_size,
+            target_latency_seconds=TARGET_BATCH_SECONDS,
+            memory_ceiling_bytes=MEMORY_CEILING_MB * 1024 ** 2,
+        )
+
+        # Rows are converted to tuples one batch at a time, not for the whole file up front
+        offset = 0
+        batch_number = 0
+        while offset < total_rows:
+            batch_df = df.iloc[offset:offset + sizer.next_rows()]
+            batch = [tuple(x) for x in batch_df.to_numpy()]
+            batch_number += 1
             try:
-                extras.execute_values(cur, insert_stmt, batch, page_size=batch_size)
-                logger.info(f"➡️ Inserted {min(i+batch_size, total_rows)}/{total_rows} rows")
+                start = time.perf_counter()
+                extras.execute_values(cur, insert_stmt, batch, page_size=len(batch))
+                sizer.observe(
+                    len(batch),
+                    seconds=time.perf_counter() - start,
+                    memory_bytes=int(batch_df.memory_usage(index=False, deep=True).sum()),
+                )
+                logger.info(f"➡️ Inserted {offset + len(batch)}/{total_rows} rows (next batch: {sizer.next_rows()} rows)")
             except Exception as e:
-                logger.error(f"❌ Error inserting batch {i//batch_size+1}: {e}")
+                logger.error(f"❌ Error inserting batch {batch_number}: {e}")
                 logger.debug(f"Batch data: {batch[:5]} ...")
+            offset += len(batch)
+
+        # Created after the inserts so the load doesn't maintain them row by row
+        for col in WATERMARK_INDEXES.get(table_name, []):
+            index_stmt = f'CREATE INDEX IF NOT EXISTS "{table_name}_{col}_idx" ON "{schema}"."{table_name}" ("{col}");'
+            logger.info(f"🛠️ Running CREATE INDEX: {index_stmt}")
+            cur.execute(index_stmt)
+        if table_name in WATERMARK_INDEXES:
+            cur.execute(f'ANALYZE "{schema}"."{table_name}";')
 
         conn.commit()
         logger.info(f"✅ Finished inserting {total_rows} rows into {schema}.{table_name}")
@@ -6,6 +6,8 @@ resource "google_bigquery_table" "business_case_cnpj_ws" {
   
   deletion_protection = false
 
+  clustering = ["buyer_tax_id"]
+
   schema = jsonencode([
     {
       "name": "share_capital",
@@ -117,6 +119,15 @@ resource "google_bigquery_table" "business_case_installments" {
   
   deletion_protection = false
 
+  # Same layout as silver installments_clean (monthly due_date partitions).
+  # No require_partition_filter: the bronze merge reads the whole batch.
+  time_partitioning {
+    type  = "MONTH"
+    field = "due_date"
+  }
+
+  clustering = ["buyer_tax_id", "asset_id"]
+
   schema = jsonencode([
     {
       name = "asset_id"